@@ -5,3 +5,11 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.accounts'
 
+    def ready(self):
+        from django.conf import settings
+        from django.db.models.signals import post_delete, post_save
+
+        from .authentication import invalidate_user_state
+
+        post_save.connect(invalidate_user_state, sender=settings.AUTH_USER_MODEL, dispatch_uid="jwt-user-state:save")
+        post_delete.connect(invalidate_user_state, sender=settings.AUTH_USER_MODEL, dispatch_uid="jwt-user-state:delete")
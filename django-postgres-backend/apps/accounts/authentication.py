@@ -0,0 +1,100 @@
+"""JWT authentication that trusts the claims LoginView signs into the token.
+
+Tokens issued by LoginView carry the user's username, staff/superuser flags, default location and
+license expiry. For those tokens the user is built from the claims (an instance with every other
+field deferred, so it still works as a foreign key and loads extra fields on access) and only a
+small per-process revocation cache is consulted. Other tokens fall back to the usual user lookup.
+"""
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+CLAIMS_VERSION = 1
+CLAIMED_FIELDS = ("username", "is_staff", "is_superuser")
+
+# user id -> ((is_active, is_staff, is_superuser, password) or None, monotonic deadline)
+_user_states: dict = {}
+
+
+def add_login_claims(token, user, *, location_id=None, license_obj=None) -> None:
+    """Sign the fast-path claims into a refresh token; access tokens derived from it inherit them."""
+    token["cv"] = CLAIMS_VERSION
+    token["username"] = user.get_username()
+    token["is_staff"] = bool(user.is_staff)
+    token["is_superuser"] = bool(user.is_superuser)
+    token["location_id"] = location_id
+    token["license_valid_to"] = license_obj.valid_to.isoformat() if license_obj else None
+
+
+def invalidate_user_state(sender=None, instance=None, **kwargs) -> None:
+    """Drop the cached revocation state; connected to user saves and deletes."""
+    if instance is None:
+        _user_states.clear()
+    else:
+        _user_states.pop(instance.pk, None)
+
+
+def _user_state(user_model, user_id):
+    entry = _user_states.get(user_id)
+    now = time.monotonic()
+    if entry is not None and now < entry[1]:
+        return entry[0]
+    state = (
+        user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+        .values_list("is_active", "is_staff", "is_superuser", "password")
+        .first()
+    )
+    # Rows read inside a transaction may be rolled back, so only cache committed reads
+    if not connection.in_atomic_block:
+        _user_states[user_id] = (state, now + float(getattr(settings, "JWT_REVOCATION_CACHE_SECONDS", 30)))
+    return state
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if validated_token.get("cv") != CLAIMS_VERSION:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        state = _user_state(self.user_model, user_id)
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        is_active, is_staff, is_superuser, password = state
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if (is_staff, is_superuser) != (validated_token.get("is_staff"), validated_token.get("is_superuser")):
+            raise AuthenticationFailed(_("User permissions have changed."), code="permissions_changed")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        claimed = {
+            api_settings.USER_ID_FIELD: user_id,
+            "is_active": True,
+            **{field: validated_token.get(field) for field in CLAIMED_FIELDS},
+        }
+        fields = self.user_model._meta.concrete_fields
+        return self.user_model.from_db(
+            "default",
+            [f.attname for f in fields if f.attname in claimed],
+            [claimed[f.attname] for f in fields if f.attname in claimed],
+        )
+
+
+def claimed_location_id(request):
+    """Default location signed into the request's token, if any."""
+    token = getattr(request, "auth", None)
+    getter = getattr(token, "get", None)
+    return getter("location_id") if getter else None
@@ -3,9 +3,12 @@ from unittest.mock import patch
 
 from django.contrib.auth.models import User
 from rest_framework import status
-from rest_framework.test import APIClient, APITestCase
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
 
 from core.models import SystemLicense
+from core.permissions import HasActiveSystemLicense
+from apps.accounts.authentication import ClaimsJWTAuthentication
 from apps.accounts.models import UserDevice
 
 
@@ -115,3 +118,25 @@ class AuthFlowTests(APITestCase):
         )
         self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(resp.data.get("detail"), "No account exists for this email.")
+
+    def test_login_token_authenticates_from_claims(self):
+        access = self._login().data["access"]
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        auth = ClaimsJWTAuthentication()
+
+        # Only the revocation check hits the DB (and is cached outside transactions)
+        with self.assertNumQueries(1):
+            user, token = auth.authenticate(request)
+        self.assertEqual((user.pk, user.username, user.is_staff), (self.user.pk, "demo", False))
+        self.assertEqual(token["license_valid_to"], self.license.valid_to.isoformat())
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            auth.authenticate(request)
+
+    def test_stale_license_claim_does_not_deny_after_renewal(self):
+        # A refreshed token keeps the end date signed at login, even after the license is renewed
+        request = APIRequestFactory().get("/")
+        request.auth = {"license_valid_to": (date.today() - timedelta(days=1)).isoformat()}
+        self.assertTrue(HasActiveSystemLicense().has_permission(request, None))
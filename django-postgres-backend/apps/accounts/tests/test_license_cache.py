@@ -0,0 +1,26 @@
+from datetime import date, timedelta
+
+from django.test import TransactionTestCase
+
+from core.models import SystemLicense, invalidate_license_cache, license_is_active
+
+
+class LicenseCacheTests(TransactionTestCase):
+    def tearDown(self):
+        invalidate_license_cache()
+
+    def test_license_check_is_cached_until_license_changes(self):
+        today = date.today()
+        lic = SystemLicense.objects.create(
+            license_key="CACHE-KEY",
+            status=SystemLicense.Status.ACTIVE,
+            valid_from=today - timedelta(days=1),
+            valid_to=today + timedelta(days=30),
+        )
+        self.assertTrue(license_is_active())
+        with self.assertNumQueries(0):
+            self.assertTrue(license_is_active())
+
+        lic.status = SystemLicense.Status.SUSPENDED
+        lic.save()
+        self.assertFalse(license_is_active())
@@ -14,6 +14,8 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from core.models import get_current_license
+from apps.locations.models import Location
+from .authentication import add_login_claims
 from .models import PasswordResetOTP, UserDevice
 from .serializers import (
     OTPRequestSerializer,
@@ -101,6 +103,8 @@ class LoginView(APIView):
         device.save(update_fields=["device_id", "user_agent", "last_login_at"])
 
         refresh = RefreshToken.for_user(user)
+        default_location = Location.objects.order_by("id").values_list("id", flat=True).first()
+        add_login_claims(refresh, user, location_id=default_location, license_obj=license_obj)
         payload = {
             "access": str(refresh.access_token),
             "refresh": str(refresh),
@@ -3,6 +3,8 @@ from decimal import Decimal
 from django.db import models
 from django.utils import timezone
 
+from core.mastercache import uoms
+
 
 class ProductCategory(models.Model):
     name = models.CharField(max_length=120, unique=True)
@@ -159,18 +161,12 @@ class Product(models.Model):
         if self.base_uom_id and getattr(self.base_uom, "name", None):
             self.base_unit = self.base_uom.name
         elif not self.base_uom_id and self.base_unit:
-            try:
-                self.base_uom = Uom.objects.get(name__iexact=self.base_unit)
-            except Uom.DoesNotExist:
-                pass
+            self.base_uom = _uom_by_name(self.base_unit) or self.base_uom
 
         if self.selling_uom_id and getattr(self.selling_uom, "name", None):
             self.pack_unit = self.selling_uom.name
         elif not self.selling_uom_id and self.pack_unit:
-            try:
-                self.selling_uom = Uom.objects.get(name__iexact=self.pack_unit)
-            except Uom.DoesNotExist:
-                pass
+            self.selling_uom = _uom_by_name(self.pack_unit) or self.selling_uom
 
         super().save(*args, **kwargs)
 
@@ -213,6 +209,10 @@ class Uom(models.Model):
         return self.name
 
 
+def _uom_by_name(name: str):
+    return uoms.lookup("name_ci", name.lower())
+
+
 class VendorProductCode(models.Model):
     vendor = models.ForeignKey('procurement.Vendor', on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -263,6 +263,11 @@ class BatchLot(models.Model):
         return f"{self.product_id}:{self.batch_no}"
 
     def save(self, *args, **kwargs):
+        self.prepare_save()
+        super().save(*args, **kwargs)
+
+    def prepare_save(self):
+        """Status and value checks applied by save(); call it before bulk_create/bulk_update."""
         if self.expiry_date and self.expiry_date < timezone.now().date():
             self.status = BatchLot.Status.EXPIRED
         if self.initial_quantity is not None and self.initial_quantity < 0:
@@ -273,5 +278,4 @@ class BatchLot(models.Model):
             raise ValueError("purchase_price must be >= 0")
         if self.purchase_price_per_base is not None and self.purchase_price_per_base < 0:
             raise ValueError("purchase_price_per_base must be >= 0")
-        super().save(*args, **kwargs)
 
@@ -3,17 +3,20 @@ from __future__ import annotations
 from decimal import Decimal
 from typing import Union
 
+from core.loaders import identity_map
+
 from .models import BatchLot, Product
 
 
 def packs_to_base(product_id: int, qty_packs: Decimal) -> Decimal:
-    p = Product.objects.get(id=product_id)
+    p = identity_map().get(Product, product_id)
     return (Decimal(qty_packs) or Decimal("0")) * (p.units_per_pack or Decimal("0"))
 
 
 def product_snapshot(product_id: int, batch_lot_id: int) -> dict:
-    p = Product.objects.get(id=product_id)
-    lot = BatchLot.objects.get(id=batch_lot_id)
+    imap = identity_map()
+    p = imap.get(Product, product_id)
+    lot = imap.get(BatchLot, batch_lot_id)
     return {
         "product_name": p.name,
         "generic_name": p.generic_name,
@@ -0,0 +1,203 @@
+"""Bulk product matching for purchase imports and GRN commits.
+
+A ``ProductMatcher`` resolves many incoming lines against the catalogue with a handful of
+queries instead of one or two per line. ``prime`` loads, for all pending keys at once,
+products by id, by product code and by the vendor's product codes. The active catalogue's
+normalized names (and, for fuzzy matching, a trigram index of them) are loaded once, on
+the first name lookup. Lines are then matched in memory with the precedence product id >
+product code > vendor code > exact normalized name > fuzzy name (only when a threshold is
+given). Every result records how it was matched so callers can return diagnostics.
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Iterable, Optional
+
+from django.db.models.functions import Lower
+
+from .models import Product, VendorProductCode
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_DIGIT_ALPHA = re.compile(r"(?<=\d)(?=[a-z])|(?<=[a-z])(?=\d)")
+# At most this many candidates (those sharing the most trigrams) are scored per fuzzy lookup
+FUZZY_CANDIDATES = 200
+
+
+def normalize_name(name: str) -> str:
+    """'Paracetamol-500MG  Tab.' -> 'paracetamol 500 mg tab'"""
+    text = _NON_ALNUM.sub(" ", (name or "").lower())
+    return " ".join(_DIGIT_ALPHA.sub(" ", text).split())
+
+
+def _trigrams(norm: str) -> set[str]:
+    padded = f" {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class Match:
+    product: Optional[Product]
+    # product_id, code, vendor_code, name, fuzzy, ambiguous or none
+    method: str
+    key: str = ""
+    score: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "method": self.method,
+            "product_id": self.product.id if self.product else None,
+            "score": round(self.score, 3) if self.score is not None else None,
+        }
+
+
+class ProductMatcher:
+    def __init__(self, vendor_id: Optional[int] = None, *, fuzzy_threshold: Optional[float] = None):
+        self.vendor_id = vendor_id
+        self.fuzzy_threshold = fuzzy_threshold
+        self._by_id: dict[int, Optional[Product]] = {}
+        self._by_code: dict[str, Optional[Product]] = {}
+        self._by_vendor_code: dict[str, Optional[Product]] = {}
+        self._names: Optional[dict[str, list[int]]] = None
+        self._trigrams: dict[str, set[str]] = defaultdict(set)
+        self._name_products: dict[int, Product] = {}
+
+    # -- loading ---------------------------------------------------------------------------
+
+    def prime(self, *, product_ids: Iterable = (), codes: Iterable[str] = ()) -> None:
+        """Load every not yet seen product id and code (product code, then vendor code)."""
+        ids = {int(i) for i in product_ids if i} - self._by_id.keys()
+        if ids:
+            found = Product.objects.in_bulk(ids)
+            for pk in ids:
+                self._by_id[pk] = found.get(pk)
+
+        pending = {(c or "").strip().lower() for c in codes} - {""} - self._by_code.keys()
+        if pending:
+            for product in (
+                Product.objects.annotate(code_lower=Lower("code")).filter(code_lower__in=pending).order_by("id")
+            ):
+                self._by_code.setdefault(product.code_lower, product)
+            for code in pending:
+                self._by_code.setdefault(code, None)
+        unmatched = {c for c in pending if self._by_code[c] is None} - self._by_vendor_code.keys()
+        if unmatched and self.vendor_id:
+            mappings = (
+                VendorProductCode.objects.select_related("product")
+                .annotate(code_lower=Lower("vendor_code"))
+                .filter(vendor_id=self.vendor_id, code_lower__in=unmatched)
+                .order_by("id")
+            )
+            for vp in mappings:
+                self._by_vendor_code.setdefault(vp.code_lower, vp.product)
+        for code in unmatched:
+            self._by_vendor_code.setdefault(code, None)
+
+    def clear_codes(self) -> None:
+        """Drop the id/code lookups (not the name index) to bound memory between batches."""
+        self._by_id.clear()
+        self._by_code.clear()
+        self._by_vendor_code.clear()
+
+    def _load_names(self) -> dict[str, list[int]]:
+        if self._names is None:
+            self._names = defaultdict(list)
+            for product in Product.objects.filter(is_active=True).only("id", "name", "code").order_by("id"):
+                norm = normalize_name(product.name)
+                if not norm:
+                    continue
+                self._names[norm].append(product.id)
+                self._name_products[product.id] = product
+                if self.fuzzy_threshold is not None:
+                    for gram in _trigrams(norm):
+                        self._trigrams[gram].add(norm)
+        return self._names
+
+    # -- matching --------------------------------------------------------------------------
+
+    def _by_name(self, name: str) -> Match:
+        norm = normalize_name(name)
+        if not norm:
+            return Match(None, "none", name)
+        names = self._load_names()
+        ids = names.get(norm)
+        if ids:
+            if len(ids) > 1:
+                return Match(None, "ambiguous", name)
+            return Match(self._name_products[ids[0]], "name", name, 1.0)
+        if self.fuzzy_threshold is None:
+            return Match(None, "none", name)
+
+        shared = Counter(cand for gram in _trigrams(norm) for cand in self._trigrams.get(gram, ()))
+        best, best_score = None, 0.0
+        for cand, _ in shared.most_common(FUZZY_CANDIDATES):
+            score = SequenceMatcher(None, norm, cand).ratio()
+            if score > best_score:
+                best, best_score = cand, score
+        if best is None or best_score < self.fuzzy_threshold:
+            return Match(None, "none", name, best_score or None)
+        if len(names[best]) > 1:
+            return Match(None, "ambiguous", name, best_score)
+        return Match(self._name_products[names[best][0]], "fuzzy", name, best_score)
+
+    def match(self, *, product_id=None, code: str = "", name: str = "") -> Match:
+        """Match one line; call ``prime`` (or ``match_many``) first to batch the queries."""
+        if product_id:
+            self.prime(product_ids=[product_id])
+            product = self._by_id.get(int(product_id))
+            return Match(product, "product_id" if product else "none", str(product_id))
+        code_key = (code or "").strip().lower()
+        if code_key:
+            self.prime(codes=[code_key])
+            if self._by_code.get(code_key):
+                return Match(self._by_code[code_key], "code", code)
+            if self._by_vendor_code.get(code_key):
+                return Match(self._by_vendor_code[code_key], "vendor_code", code)
+        if name:
+            return self._by_name(name)
+        return Match(None, "none", code or "")
+
+    def match_many(self, lines: list[dict]) -> list[Match]:
+        """Match dicts with optional ``product_id``, ``code`` and ``name`` keys, in order."""
+        self.prime(
+            product_ids=[ln.get("product_id") for ln in lines],
+            codes=[ln.get("code") or "" for ln in lines if not ln.get("product_id")],
+        )
+        return [self.match(product_id=ln.get("product_id"), code=ln.get("code") or "", name=ln.get("name") or "") for ln in lines]
+
+
+class MatchDiagnostics:
+    """Counts per match method plus the first ``limit`` unmatched, ambiguous and fuzzy lines.
+
+    Accumulates over batches, so a long import does not keep every ``Match`` around.
+    """
+
+    def __init__(self, limit: int = 50):
+        self.limit = limit
+        self.by_method: Counter = Counter()
+        self.samples: dict[str, list] = {"none": [], "ambiguous": [], "fuzzy": []}
+
+    def add(self, matches: Iterable[Match]) -> "MatchDiagnostics":
+        for m in matches:
+            self.by_method[m.method] += 1
+            sample = self.samples.get(m.method)
+            if sample is not None and len(sample) < self.limit:
+                sample.append(m.as_dict() if m.method == "fuzzy" else m.key)
+        return self
+
+    @property
+    def matched(self) -> int:
+        return sum(n for method, n in self.by_method.items() if method not in ("none", "ambiguous"))
+
+    def as_dict(self) -> dict:
+        return {
+            "total": sum(self.by_method.values()),
+            "matched": self.matched,
+            "by_method": dict(self.by_method),
+            "unmatched": self.samples["none"],
+            "ambiguous": self.samples["ambiguous"],
+            "fuzzy": self.samples["fuzzy"],
+        }
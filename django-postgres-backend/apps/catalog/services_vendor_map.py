@@ -1,19 +1,47 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Iterable, Optional
+
+from django.db.models.functions import Lower
+
+from core.loaders import identity_map
 from .models import Product
 from .models import VendorProductCode
 
 
+def products_by_vendor_codes(vendor_id: int, vendor_codes: Iterable[str]) -> dict[str, Product]:
+    """Resolve many codes at once: ``{lower-cased code: Product}`` for the codes that match.
+
+    Same precedence as ``product_by_vendor_code`` (product.code first, then the vendor's
+    mapping) in two queries overall; results are memoised in the identity map so later
+    single lookups in the same request are free.
+    """
+    imap = identity_map()
+    codes = {(c or "").strip().lower() for c in vendor_codes} - {""}
+    pending = [code for _, code in imap.missing_memos(VendorProductCode, [(vendor_id, c) for c in codes])]
+    if pending:
+        by_code = {
+            p.code_lower: p
+            for p in Product.objects.annotate(code_lower=Lower("code")).filter(code_lower__in=pending).order_by("id")
+        }
+        unmatched = [c for c in pending if c not in by_code]
+        if unmatched:
+            mappings = (
+                VendorProductCode.objects.select_related("product")
+                .annotate(code_lower=Lower("vendor_code"))
+                .filter(vendor_id=vendor_id, code_lower__in=unmatched)
+                .order_by("id")
+            )
+            for vp in mappings:
+                by_code.setdefault(vp.code_lower, vp.product)
+        for code in pending:
+            imap.set_memo(VendorProductCode, (vendor_id, code), by_code.get(code))
+    result = {code: imap.memoised(VendorProductCode, (vendor_id, code)) for code in codes}
+    return {code: product for code, product in result.items() if product is not None}
+
+
 def product_by_vendor_code(vendor_id: int, vendor_code: str) -> Optional[Product]:
     code = (vendor_code or "").strip()
     if not code:
         return None
-    # First try product.code
-    p = Product.objects.filter(code__iexact=code).first()
-    if p:
-        return p
-    # Then mapping
-    vp = VendorProductCode.objects.filter(vendor_id=vendor_id, vendor_code__iexact=code).first()
-    return vp.product if vp else None
-
+    return products_by_vendor_codes(vendor_id, [code]).get(code.lower())
@@ -0,0 +1,35 @@
+from django.test import TransactionTestCase
+
+from apps.catalog.models import ProductCategory, Uom
+from core import mastercache
+from core.versions import bump
+
+
+class MasterCacheTests(TransactionTestCase):
+    def tearDown(self):
+        for table in mastercache.master_tables().values():
+            table.invalidate()
+        mastercache.expire_master_check()
+
+    def test_lookups_are_served_from_memory_until_a_write(self):
+        tab = Uom.objects.create(name="TAB")
+        assert mastercache.uoms.lookup("name_ci", "tab") == tab
+        with self.assertNumQueries(0):
+            assert mastercache.uoms.lookup("name_ci", "tab").pk == tab.pk
+            assert mastercache.uoms.get(tab.pk).name == "TAB"
+
+        tab.name = "TABLET"
+        tab.save()
+        assert mastercache.uoms.lookup("name_ci", "tab") is None
+        assert mastercache.uoms.lookup("name_ci", "tablet").pk == tab.pk
+
+    def test_other_process_write_is_seen_after_version_check(self):
+        cat = ProductCategory.objects.create(name="Tablet")
+        assert mastercache.categories.lookup("name", "Tablet").pk == cat.pk
+        # A write elsewhere only bumps the shared version stamp
+        ProductCategory.objects.filter(pk=cat.pk).update(name="Capsule")
+        bump("category")
+        assert mastercache.categories.lookup("name", "Tablet").pk == cat.pk
+        mastercache.expire_master_check()
+        assert mastercache.categories.lookup("name", "Tablet") is None
+        assert mastercache.categories.lookup("name", "Capsule").pk == cat.pk
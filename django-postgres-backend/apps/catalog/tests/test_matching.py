@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.catalog.models import Product, ProductCategory, VendorProductCode
+from apps.catalog.services_matching import MatchDiagnostics, ProductMatcher, normalize_name
+from apps.procurement.models import Vendor
+
+
+class ProductMatcherTests(TestCase):
+    def setUp(self):
+        self.vendor = Vendor.objects.create(name="Cipla")
+        cat = ProductCategory.objects.create(name="Cat")
+
+        def product(code, name):
+            return Product.objects.create(code=code, name=name, category=cat, mrp=Decimal("10.00"), units_per_pack=Decimal("10.000"))
+
+        self.para = product("PARA500", "Paracetamol 500mg Tablet")
+        self.azi = product("AZI250", "Azithromycin 250 mg Capsule")
+        self.cetz = product("CETZ10", "Cetirizine 10mg Tab")
+        VendorProductCode.objects.create(vendor=self.vendor, product=self.azi, vendor_code="CIP-AZI")
+
+    def test_bulk_match_precedence_and_diagnostics(self):
+        lines = [
+            {"product_id": self.cetz.id},
+            {"code": "para500"},
+            {"code": "cip-azi"},
+            {"code": "UNKNOWN", "name": "PARACETAMOL-500 MG tablet"},
+            {"name": "Cetrizine 10mg Tablet"},
+            {"name": "Ibuprofen"},
+        ]
+        matcher = ProductMatcher(self.vendor.id, fuzzy_threshold=0.8)
+        # ids, product codes, vendor codes, then the name index
+        with self.assertNumQueries(4):
+            matches = matcher.match_many(lines)
+        assert [m.method for m in matches] == ["product_id", "code", "vendor_code", "name", "fuzzy", "none"]
+        assert [m.product for m in matches[:5]] == [self.cetz, self.para, self.azi, self.para, self.cetz]
+
+        summary = MatchDiagnostics().add(matches).as_dict()
+        assert summary["total"] == 6 and summary["matched"] == 5
+        assert summary["unmatched"] == ["Ibuprofen"]
+        assert summary["fuzzy"][0]["product_id"] == self.cetz.id
+
+        # Without a threshold names only match exactly (after normalization)
+        assert ProductMatcher(self.vendor.id).match(name="Cetrizine 10mg Tablet").method == "none"
+        assert normalize_name("Paracetamol-500MG  Tab.") == "paracetamol 500 mg tab"
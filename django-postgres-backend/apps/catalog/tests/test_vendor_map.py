@@ -1,7 +1,11 @@
+from decimal import Decimal
+
 from django.test import TestCase
 from apps.catalog.models import Product, ProductCategory, VendorProductCode
 from apps.procurement.models import Vendor
-from apps.catalog.services_vendor_map import product_by_vendor_code
+from apps.catalog.services import packs_to_base
+from apps.catalog.services_vendor_map import product_by_vendor_code, products_by_vendor_codes
+from core.loaders import identity_scope
 
 
 class VendorMapTests(TestCase):
@@ -24,3 +28,24 @@ class VendorMapTests(TestCase):
         VendorProductCode.objects.create(vendor=self.vendor, product=p2, vendor_code="V-001")
         assert product_by_vendor_code(self.vendor.id, "V-001").id == p2.id
 
+
+class IdentityMapTests(TestCase):
+    def setUp(self):
+        self.vendor = Vendor.objects.create(name="ACME")
+        self.p = Product.objects.create(
+            code="ABC123", name="P", category=ProductCategory.objects.create(name="C"),
+            mrp=Decimal("1.00"), base_unit="U", pack_unit="U", units_per_pack=Decimal("10"),
+        )
+        VendorProductCode.objects.create(vendor=self.vendor, product=self.p, vendor_code="V-9")
+
+    def test_identity_scope_batches_and_dedupes(self):
+        with identity_scope():
+            with self.assertNumQueries(2):
+                found = products_by_vendor_codes(self.vendor.id, ["ABC123", "v-9", "missing"])
+            assert set(found) == {"abc123", "v-9"}
+            with self.assertNumQueries(0):
+                assert product_by_vendor_code(self.vendor.id, "V-9") is found["abc123"]
+                assert product_by_vendor_code(self.vendor.id, "missing") is None
+                assert packs_to_base(self.p.id, 3) == Decimal("30")
+        with self.assertNumQueries(1):
+            packs_to_base(self.p.id, 3)
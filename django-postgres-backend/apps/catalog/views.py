@@ -12,6 +12,7 @@ from .serializers import (
 )
 from apps.procurement.models import Vendor
 from apps.procurement.serializers import VendorSerializer
+from core.mastercache import MasterListMixin, categories, medicine_forms, uoms
 
 
 class HealthView(APIView):
@@ -21,8 +22,9 @@ class HealthView(APIView):
         return Response({"ok": True})
 
 
-class ProductCategoryViewSet(viewsets.ModelViewSet):
+class ProductCategoryViewSet(MasterListMixin, viewsets.ModelViewSet):
     queryset = ProductCategory.objects.all()
+    master_table = categories
     serializer_class = ProductCategorySerializer
     ordering_fields = ["name", "created_at"]
 
@@ -96,8 +98,9 @@ class VendorViewSet(viewsets.ModelViewSet):
     serializer_class = VendorSerializer
 
 
-class MedicineFormViewSet(viewsets.ModelViewSet):
+class MedicineFormViewSet(MasterListMixin, viewsets.ModelViewSet):
     queryset = MedicineForm.objects.all()
+    master_table = medicine_forms
     serializer_class = MedicineFormSerializer
 
     def get_queryset(self):
@@ -114,8 +117,9 @@ class MedicineFormViewSet(viewsets.ModelViewSet):
         return qs
 
 
-class UomViewSet(viewsets.ModelViewSet):
+class UomViewSet(MasterListMixin, viewsets.ModelViewSet):
     queryset = Uom.objects.all()
+    master_table = uoms
     serializer_class = UomSerializer
 
     def get_queryset(self):
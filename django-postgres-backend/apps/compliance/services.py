@@ -2,22 +2,32 @@ from django.db import transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from decimal import Decimal
+
+from core.loaders import identity_map
 from .models import Prescription, H1RegisterEntry, NDPSDailyEntry
 
 
-def ensure_prescription_for_invoice(invoice):
+def _invoice_lines(invoice, lines=None, *relations):
+    """Invoice lines with the given relations served from the request's identity map."""
+    lines = list(invoice.lines.all() if lines is None else lines)
+    identity_map().attach(lines, *relations)
+    return lines
+
+
+def ensure_prescription_for_invoice(invoice, lines=None):
     """Validates that a prescription exists for H1/NDPS lines."""
-    requires_rx = any(l.product.schedule in {"H1", "NDPS"} for l in invoice.lines.all())
+    lines = _invoice_lines(invoice, lines, "product")
+    requires_rx = any(l.product.schedule in {"H1", "NDPS"} for l in lines)
     if requires_rx and not hasattr(invoice, "prescription"):
         raise ValidationError(f"Prescription required for invoice {invoice.invoice_no} (H1/NDPS items present).")
     return True
 
 
 @transaction.atomic
-def create_compliance_entries(invoice):
+def create_compliance_entries(invoice, lines=None):
     prescription = getattr(invoice, "prescription", None)
 
-    for line in invoice.lines.all():
+    for line in _invoice_lines(invoice, lines, "product", "batch_lot"):
         schedule = getattr(line.product, "schedule", None)
 
         # H1 register
@@ -12,6 +12,7 @@ from apps.inventory.models import InventoryMovement, RackLocation
 from apps.locations.models import Location
 from apps.procurement.models import Purchase
 from apps.sales.models import SalesInvoice
+from core.versions import bump
 
 
 class DashboardAPITests(APITestCase):
@@ -116,3 +117,33 @@ class DashboardAPITests(APITestCase):
         self.client.force_authenticate(user=None)
         resp = self.client.get("/api/v1/dashboard/summary/")
         self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_summary_supports_conditional_get(self):
+        url = f"/api/v1/dashboard/summary/?location_id={self.location.id}"
+        with self.captureOnCommitCallbacks(execute=True):
+            bump(f"location:{self.location.id}")
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        etag = first["ETag"]
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached["ETag"], etag)
+        # Last-Modified has one-second resolution, so If-Modified-Since alone is not trusted
+        dated = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(dated.status_code, status.HTTP_200_OK)
+
+        # Versions are bumped when the writing transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            InventoryMovement.objects.create(
+                location=self.location,
+                batch_lot=self.batch,
+                qty_change_base=Decimal("-2.000"),
+                reason=InventoryMovement.Reason.SALE,
+                ref_doc_type="TEST",
+                ref_doc_id=2,
+            )
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed["ETag"], etag)
@@ -5,7 +5,7 @@ from decimal import Decimal
 
 from dateutil.relativedelta import relativedelta
 from django.db import models
-from django.db.models import Sum
+from django.db.models import F, Sum
 from django.db.models.functions import TruncMonth, Coalesce, Cast
 from django.utils import timezone
 from rest_framework import permissions, status
@@ -13,11 +13,13 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema, OpenApiTypes, OpenApiParameter
 
+from apps.accounts.authentication import claimed_location_id
 from apps.catalog.models import Product
 from apps.inventory import services as inventory_services
 from apps.locations.models import Location
 from apps.procurement.models import Purchase
-from apps.sales.models import SalesInvoice
+from apps.sales.models import SalesInvoice, SalesLine
+from core.versions import conditional_get, location_scopes
 
 
 class BaseDashboardView(APIView):
@@ -33,6 +35,9 @@ class BaseDashboardView(APIView):
         profile = getattr(request.user, "profile", None)
         if profile and getattr(profile, "location_id", None):
             return profile.location_id
+        claimed = claimed_location_id(request)
+        if claimed:
+            return claimed
         first = Location.objects.order_by("id").first()
         return first.id if first else None
 
@@ -51,6 +56,7 @@ class DashboardSummaryView(BaseDashboardView):
         ],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes("customer", all_locations=True))
     def get(self, request):
         try:
             location_id = self._resolve_location_id(request)
@@ -87,21 +93,18 @@ class DashboardSummaryView(BaseDashboardView):
         today_sales_amount = today_qs.aggregate(total=Sum("net_total")).get("total") or Decimal("0")
         today_sales_count = today_qs.count()
         
-        # Calculate today's profit: (selling_price - cost_price) * quantity for each line
-        today_profit = Decimal("0")
-        today_invoice_ids = today_qs.values_list("id", flat=True)
-        if today_invoice_ids:
-            from apps.sales.models import SalesLine
-            today_lines = SalesLine.objects.filter(
-                sale_invoice_id__in=today_invoice_ids
-            ).select_related("batch_lot")
-            
-            for line in today_lines:
-                selling_price = Decimal(line.rate_per_base)
-                cost_price = Decimal(line.batch_lot.purchase_price_per_base or 0)
-                quantity = Decimal(line.qty_base)
-                line_profit = (selling_price - cost_price) * quantity
-                today_profit += line_profit
+        # Today's profit: selling value less the COGS fixed on each line at posting
+        today_profit = (
+            SalesLine.objects.filter(sale_invoice__in=today_qs)
+            .aggregate(
+                profit=Sum(
+                    F("qty_base") * F("rate_per_base") - F("cogs_amount"),
+                    output_field=models.DecimalField(max_digits=20, decimal_places=4),
+                )
+            )
+            .get("profit")
+            or Decimal("0")
+        )
         
         # Calculate profit margin percentage
         profit_margin = None
@@ -187,6 +190,7 @@ class MonthlyChartView(BaseDashboardView):
         ],
         responses={200: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         try:
             location_id = self._resolve_location_id(request)
@@ -266,6 +270,7 @@ class InventoryStatusView(BaseDashboardView):
         parameters=[OpenApiParameter("location_id", OpenApiTypes.INT, OpenApiParameter.QUERY)],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         try:
             location_id = self._resolve_location_id(request)
@@ -284,6 +289,7 @@ class RecentSalesView(BaseDashboardView):
         parameters=[OpenApiParameter("location_id", OpenApiTypes.INT, OpenApiParameter.QUERY)],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes("customer"))
     def get(self, request):
         try:
             location_id = self._resolve_location_id(request)
@@ -307,6 +313,7 @@ class LowStockListView(BaseDashboardView):
         ],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         try:
             location_id = self._resolve_location_id(request)
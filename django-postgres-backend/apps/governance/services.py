@@ -7,16 +7,7 @@ from .models import AuditLog, SystemEvent
 from .middleware import get_request_id
 
 
-@transaction.atomic
-def audit(
-    actor,
-    table: str,
-    row_id: int,
-    action: str,
-    before: dict | None = None,
-    after: dict | None = None,
-    meta: dict | None = None,
-) -> None:
+def _audit_row(actor, table: str, row_id, action: str, before, after, meta) -> AuditLog:
     actor_ref = None
     try:
         from apps.accounts.models import User as AccountsUser  # type: ignore
@@ -24,7 +15,7 @@ def audit(
             actor_ref = actor
     except Exception:
         actor_ref = None
-    AuditLog.objects.create(
+    return AuditLog(
         actor_user=actor_ref if getattr(actor_ref, "id", None) else None,
         action=action,
         table_name=table,
@@ -36,6 +27,26 @@ def audit(
     )
 
 
+@transaction.atomic
+def audit(
+    actor,
+    table: str,
+    row_id: int,
+    action: str,
+    before: dict | None = None,
+    after: dict | None = None,
+    meta: dict | None = None,
+) -> None:
+    _audit_row(actor, table, row_id, action, before, after, meta).save()
+
+
+def audit_many(actor, table: str, entries, meta: dict | None = None) -> None:
+    """Write several audit rows in one insert; ``entries`` yields (row_id, action, before, after)."""
+    rows = [_audit_row(actor, table, row_id, action, before, after, meta) for row_id, action, before, after in entries]
+    if rows:
+        AuditLog.objects.bulk_create(rows)
+
+
 def emit_event(code: str, payload: dict) -> None:
     SystemEvent.objects.create(code=code, payload=payload or {})
 
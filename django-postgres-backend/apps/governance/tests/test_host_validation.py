@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from core.hosts import HostMatcher
+
+HOSTS = ["api.example.com", ".example.org", "*.azurewebsites.net", "[::1]"]
+NETWORKS = ["169.254.0.0/16"]
+
+
+class HostMatcherTests(SimpleTestCase):
+    def test_names_wildcards_and_ranges(self):
+        match = HostMatcher(HOSTS, NETWORKS)
+        assert match("API.example.com")
+        assert match("example.org") and match("shop.example.org")
+        # As in Django, "*.domain" is not a wildcard
+        assert not match("pharma.azurewebsites.net") and not match("other-tenant.azurewebsites.net")
+        assert match("169.254.130.7") and match("169.254.1.1")
+        assert match("[::1]")
+        assert not match("169.255.0.1")
+        assert not match("evil.com") and not match("example.com.evil.com")
+
+    @override_settings(ALLOWED_HOSTS=["pharma.azurewebsites.net"], ALLOWED_HOST_NETWORKS=NETWORKS)
+    def test_probe_ips_are_accepted_without_growing_allowed_hosts(self):
+        before = list(settings.ALLOWED_HOSTS)
+        for i in range(1, 20):
+            # CommonMiddleware calls request.get_host(), so Django's own check must pass too
+            resp = self.client.get("/api/health/", HTTP_HOST=f"169.254.130.{i}")
+            self.assertEqual(resp.status_code, 200)
+        self.assertEqual(settings.ALLOWED_HOSTS, before)
+
+        self.assertEqual(self.client.get("/api/health/", HTTP_HOST="pharma.azurewebsites.net:443").status_code, 200)
+        self.assertEqual(self.client.get("/api/health/", HTTP_HOST="other.azurewebsites.net").status_code, 400)
+        self.assertEqual(self.client.get("/api/health/", HTTP_HOST="evil.com").status_code, 400)
@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from core.querystats import registry
+
+
+class QueryStatsTests(APITestCase):
+    def setUp(self):
+        registry.reset()
+        self.admin = get_user_model().objects.create_user(username="ops", password="pass123", is_staff=True)
+
+    @override_settings(QUERY_STATS_ENABLED=True, QUERY_STATS_HEADER=True)
+    def test_records_per_view_and_reports_to_admins(self):
+        resp = self.client.get("/api/health/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("X-Query-Count", resp)
+        self.assertIn("Server-Timing", resp)
+
+        self.client.force_authenticate(self.admin)
+        stats = self.client.get("/api/_query-stats")
+        self.assertEqual(stats.status_code, 200)
+        health = [row for row in stats.data["views"] if row["view"] == "GET api_health"]
+        self.assertEqual(health[0]["requests"], 1)
+
+    def test_disabled_by_default_and_admin_only(self):
+        resp = self.client.get("/api/health/")
+        self.assertNotIn("X-Query-Count", resp)
+        self.assertEqual(registry.snapshot(), [])
+
+        user = get_user_model().objects.create_user(username="clerk", password="pass123")
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get("/api/_query-stats").status_code, 403)
@@ -0,0 +1,44 @@
+import gzip
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from core import schema
+
+
+class SchemaCacheTests(APITestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(OPENAPI_SCHEMA_CACHE_DIR=Path(self.tmp.name))
+        override.enable()
+        self.addCleanup(override.disable)
+        schema._memory = None
+        self.addCleanup(setattr, schema, "_memory", None)
+
+    def test_serves_prebuilt_bytes_with_etag_and_rebuilds_on_version_mismatch(self):
+        schema.build_schema_cache()
+        meta_path = Path(self.tmp.name) / "meta.json"
+
+        resp = self.client.get("/api/schema/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertTrue(gzip.decompress(resp.content).startswith(b"openapi:"))
+
+        again = self.client.get("/api/schema/", HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+        as_json = self.client.get("/api/schema/?format=json")
+        self.assertEqual(json.loads(as_json.content)["info"]["title"], "Pharmacy ERP API")
+        self.assertNotEqual(as_json["ETag"], resp["ETag"])
+
+        # Files written by other code are ignored and replaced
+        meta = json.loads(meta_path.read_bytes())
+        meta["version"] = "stale"
+        meta_path.write_text(json.dumps(meta))
+        schema._memory = None
+        self.assertEqual(self.client.get("/api/schema/").status_code, 200)
+        self.assertEqual(json.loads(meta_path.read_bytes())["version"], schema.schema_version())
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import InventoryMovement
+from .models import InventoryMovement, CostLayer
 
 
 @admin.register(InventoryMovement)
@@ -7,3 +7,9 @@ class InventoryMovementAdmin(admin.ModelAdmin):
     list_display = ("id", "location", "batch_lot", "qty_change_base", "reason", "created_at")
     list_filter = ("reason", "location")
 
+
+
+@admin.register(CostLayer)
+class CostLayerAdmin(admin.ModelAdmin):
+    list_display = ("id", "batch_lot", "location", "qty_base_received", "qty_base_remaining", "unit_cost_per_base", "created_at")
+    list_filter = ("location",)
@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-19 03:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_add_missing_packaging_fields'),
+        ('locations', '0001_initial'),
+        ('inventory', '0006_racklocation_current_capacity_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CostLayer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('qty_base_received', models.DecimalField(decimal_places=3, max_digits=14)),
+                ('qty_base_remaining', models.DecimalField(decimal_places=3, max_digits=14)),
+                ('unit_cost_per_base', models.DecimalField(decimal_places=6, max_digits=14)),
+                ('ref_doc_type', models.CharField(blank=True, max_length=32)),
+                ('ref_doc_id', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('batch_lot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_layers', to='catalog.batchlot')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='locations.location')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='costlayer',
+            index=models.Index(fields=['batch_lot', 'created_at'], name='idx_costlayer_batch_dt'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_costlayer'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['location', 'reason', 'created_at'], name='idx_move_loc_reason_dt'),
+        ),
+    ]
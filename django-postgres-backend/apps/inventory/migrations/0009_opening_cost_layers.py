@@ -0,0 +1,66 @@
+# Generated by Django 4.2 on 2026-10-19 05:20
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Min, Sum
+from django.utils import timezone
+
+OPENING = "OPENING"
+
+
+def backfill_opening_layers(apps, schema_editor):
+    # Stock on hand that no open layer covers gets one layer at the batch's current price,
+    # dated before every real layer so FIFO draws it down first
+    CostLayer = apps.get_model("inventory", "CostLayer")
+    InventoryMovement = apps.get_model("inventory", "InventoryMovement")
+    BatchLot = apps.get_model("catalog", "BatchLot")
+
+    on_hand = {
+        (row["location_id"], row["batch_lot_id"]): row["qty"]
+        for row in InventoryMovement.objects.values("location_id", "batch_lot_id")
+        .annotate(qty=Sum("qty_change_base"))
+        .filter(qty__gt=0)
+    }
+    layered = {
+        (row["location_id"], row["batch_lot_id"]): row["qty"]
+        for row in CostLayer.objects.filter(qty_base_remaining__gt=0)
+        .values("location_id", "batch_lot_id")
+        .annotate(qty=Sum("qty_base_remaining"))
+    }
+    prices = dict(
+        BatchLot.objects.filter(id__in={batch_id for _, batch_id in on_hand}).values_list("id", "purchase_price_per_base")
+    )
+    started = timezone.now()
+    layers = []
+    for (location_id, batch_id), qty in on_hand.items():
+        uncovered = qty - (layered.get((location_id, batch_id)) or Decimal("0"))
+        if uncovered > 0:
+            layers.append(CostLayer(
+                location_id=location_id,
+                batch_lot_id=batch_id,
+                qty_base_received=uncovered,
+                qty_base_remaining=uncovered,
+                unit_cost_per_base=prices.get(batch_id) or Decimal("0"),
+                ref_doc_type=OPENING,
+            ))
+    if not layers:
+        return
+    first = CostLayer.objects.aggregate(first=Min("created_at"))["first"]
+    CostLayer.objects.bulk_create(layers, batch_size=1000)
+    # created_at is auto_now_add, so the date is set afterwards
+    CostLayer.objects.filter(ref_doc_type=OPENING, created_at__gte=started).update(
+        created_at=min(first or started, started) - timedelta(seconds=1)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_movement_reason_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_opening_layers, migrations.RunPython.noop),
+    ]
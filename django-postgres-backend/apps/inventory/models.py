@@ -24,6 +24,7 @@ class InventoryMovement(models.Model):
         indexes = [
             models.Index(fields=["location", "batch_lot", "created_at"], name="idx_move_loc_batch_dt"),
             models.Index(fields=["ref_doc_type", "ref_doc_id"], name="idx_move_refdoc"),
+            models.Index(fields=["location", "reason", "created_at"], name="idx_move_loc_reason_dt"),
         ]
 
 class BatchStock(models.Model):
@@ -43,6 +44,27 @@ class BatchStock(models.Model):
 
 
 
+class CostLayer(models.Model):
+    """Quantity received into a batch at a specific cost, consumed by sales (FIFO or weighted average)."""
+
+    batch_lot = models.ForeignKey('catalog.BatchLot', on_delete=models.CASCADE, related_name='cost_layers')
+    location = models.ForeignKey('locations.Location', on_delete=models.CASCADE)
+    qty_base_received = models.DecimalField(max_digits=14, decimal_places=3)
+    qty_base_remaining = models.DecimalField(max_digits=14, decimal_places=3)
+    unit_cost_per_base = models.DecimalField(max_digits=14, decimal_places=6)
+    ref_doc_type = models.CharField(max_length=32, blank=True)
+    ref_doc_id = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["batch_lot", "created_at"], name="idx_costlayer_batch_dt"),
+        ]
+
+    def __str__(self):
+        return f"{self.batch_lot_id}: {self.qty_base_remaining}/{self.qty_base_received} @ {self.unit_cost_per_base}"
+
+
 class RackRule(models.Model):
     location = models.ForeignKey('locations.Location', on_delete=models.CASCADE)
     manufacturer_name = models.CharField(max_length=200)
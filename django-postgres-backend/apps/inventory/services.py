@@ -1,15 +1,16 @@
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from datetime import date as _date, timedelta
 
 from django.db import transaction
 from django.db.models import Sum, F
 from rest_framework.exceptions import ValidationError
 
-from .models import InventoryMovement
+from .models import InventoryMovement, CostLayer
 from apps.catalog.models import BatchLot, Product
 from apps.locations.models import Location
 from apps.settingsx.services import get_setting
 from apps.settingsx.utils import get_stock_thresholds
+from core.versions import bump
 
 
 def stock_on_hand(location_id: int, batch_lot_id: int) -> Decimal:
@@ -492,6 +493,10 @@ def write_movement(
         ref_doc_id=doc_id,
     )
 
+    # === Draw stock leaving the batch out of its cost layers ===
+    if mov.qty_change_base < 0:
+        consume_cost_layers(batch.id, -mov.qty_change_base)
+
     # === Audit logging (safe) ===
     try:
         from apps.governance.services import audit
@@ -516,6 +521,188 @@ def write_movement(
     return mov.id
 
 
+def write_movements(
+    location_id: int,
+    rows,
+    *,
+    reason: str,
+    ref_doc: tuple[str, int],
+    actor=None,
+) -> list[int]:
+    """``write_movement`` for many ``(batch_lot_id, qty_change_base)`` rows of one document.
+
+    The movements are inserted in one statement, with the audit trail and the location's
+    change version written in bulk. When any row is outbound (stock check and
+    cost-layer consumption, which depend on row order) every row goes through
+    ``write_movement`` instead. Returns the movement ids in row order.
+    """
+    rows = [(batch_lot_id, Decimal(qty)) for batch_lot_id, qty in rows]
+    if not rows:
+        return []
+    if any(qty < 0 for _, qty in rows):
+        return [
+            write_movement(location_id, batch_lot_id, qty, reason=reason, ref_doc=ref_doc, actor=actor)
+            for batch_lot_id, qty in rows
+        ]
+    try:
+        location = Location.objects.select_for_update().get(id=location_id)
+    except Location.DoesNotExist:
+        raise ValidationError({
+            "location_id": f"Invalid location_id '{location_id}'. Location does not exist."
+        })
+    batch_ids = {batch_lot_id for batch_lot_id, _ in rows}
+    locked = set(BatchLot.objects.select_for_update().filter(id__in=batch_ids).values_list("id", flat=True))
+    if batch_ids - locked:
+        raise ValidationError({
+            "batch_lot_id": f"Invalid batch_lot_id '{min(batch_ids - locked)}'. Batch lot does not exist."
+        })
+    doc_type, doc_id = ref_doc
+    doc_id = int(doc_id) if doc_id is not None else None
+
+    movements = InventoryMovement.objects.bulk_create([
+        InventoryMovement(
+            location=location, batch_lot_id=batch_lot_id, qty_change_base=qty,
+            reason=reason, ref_doc_type=doc_type, ref_doc_id=doc_id,
+        )
+        for batch_lot_id, qty in rows
+    ])
+
+    bump(f"location:{location_id}")
+
+    try:
+        from apps.governance.services import audit_many
+        audit_many(
+            actor,
+            "inventory_inventorymovement",
+            (
+                (mov.id, "CREATE", None, {
+                    "location_id": location.id,
+                    "batch_lot_id": mov.batch_lot_id,
+                    "qty_change_base": str(mov.qty_change_base),
+                    "reason": reason,
+                    "ref_doc_type": mov.ref_doc_type,
+                    "ref_doc_id": mov.ref_doc_id,
+                })
+                for mov in movements
+            ),
+        )
+    except Exception:
+        pass
+    return [mov.id for mov in movements]
+
+
+COSTING_METHODS = {"FIFO", "WAVG"}
+COST_PER_BASE_QUANT = Decimal("0.000001")
+COGS_QUANT = Decimal("0.0001")
+QTY_QUANT = Decimal("0.001")
+
+
+def costing_method() -> str:
+    method = (get_setting("INVENTORY_COSTING_METHOD", "FIFO") or "FIFO").strip().upper()
+    return method if method in COSTING_METHODS else "FIFO"
+
+
+def record_cost_layer(
+    *,
+    location_id: int,
+    batch_lot_id: int,
+    qty_base: Decimal,
+    unit_cost_per_base: Decimal,
+    ref_doc: tuple[str, int],
+) -> CostLayer | None:
+    qty_base = Decimal(qty_base or 0)
+    if qty_base <= 0:
+        return None
+    doc_type, doc_id = ref_doc
+    return CostLayer.objects.create(
+        location_id=location_id,
+        batch_lot_id=batch_lot_id,
+        qty_base_received=qty_base,
+        qty_base_remaining=qty_base,
+        unit_cost_per_base=Decimal(unit_cost_per_base or 0).quantize(COST_PER_BASE_QUANT, rounding=ROUND_HALF_UP),
+        ref_doc_type=doc_type,
+        ref_doc_id=doc_id,
+    )
+
+
+def record_cost_layers(rows, *, location_id: int, ref_doc: tuple[str, int]) -> list[CostLayer]:
+    """``record_cost_layer`` for many ``(batch_lot_id, qty_base, unit_cost_per_base)`` rows, in one insert."""
+    doc_type, doc_id = ref_doc
+    layers = [
+        CostLayer(
+            location_id=location_id,
+            batch_lot_id=batch_lot_id,
+            qty_base_received=Decimal(qty_base),
+            qty_base_remaining=Decimal(qty_base),
+            unit_cost_per_base=Decimal(unit_cost_per_base or 0).quantize(COST_PER_BASE_QUANT, rounding=ROUND_HALF_UP),
+            ref_doc_type=doc_type,
+            ref_doc_id=doc_id,
+        )
+        for batch_lot_id, qty_base, unit_cost_per_base in rows
+        if Decimal(qty_base or 0) > 0
+    ]
+    return CostLayer.objects.bulk_create(layers)
+
+
+@transaction.atomic
+def consume_cost_layers(batch_lot_id: int, qty_base: Decimal, *, method: str | None = None) -> tuple[Decimal, Decimal]:
+    """
+    Draw qty_base out of the batch's open cost layers.
+    Returns (cogs_amount, cost_per_base). Quantity not covered by layers
+    (stock that predates layering or came in by adjustment) is costed at the
+    batch purchase price.
+    """
+    qty_base = Decimal(qty_base or 0)
+    if qty_base <= 0:
+        return Decimal("0"), Decimal("0")
+    method = method or costing_method()
+    layers = list(
+        CostLayer.objects.select_for_update()
+        .filter(batch_lot_id=batch_lot_id, qty_base_remaining__gt=0)
+        .order_by("created_at", "id")
+    )
+
+    cost = Decimal("0")
+    remaining = qty_base
+    if layers and method == "WAVG":
+        open_qty = sum((l.qty_base_remaining for l in layers), Decimal("0"))
+        open_value = sum((l.qty_base_remaining * l.unit_cost_per_base for l in layers), Decimal("0"))
+        take = min(remaining, open_qty)
+        cost += take * (open_value / open_qty)
+        # Draw every layer down proportionally so the average stays put
+        left = take
+        for idx, layer in enumerate(layers):
+            if idx == len(layers) - 1:
+                part = left
+            else:
+                part = (layer.qty_base_remaining * take / open_qty).quantize(QTY_QUANT, rounding=ROUND_HALF_UP)
+            part = min(part, layer.qty_base_remaining, left)
+            layer.qty_base_remaining -= part
+            left -= part
+        remaining -= take
+    elif layers:
+        for layer in layers:
+            if remaining <= 0:
+                break
+            take = min(remaining, layer.qty_base_remaining)
+            cost += take * layer.unit_cost_per_base
+            layer.qty_base_remaining -= take
+            remaining -= take
+    if layers:
+        CostLayer.objects.bulk_update(layers, ["qty_base_remaining"])
+
+    if remaining > 0:
+        fallback = (
+            BatchLot.objects.filter(id=batch_lot_id).values_list("purchase_price_per_base", flat=True).first()
+            or Decimal("0")
+        )
+        cost += remaining * fallback
+
+    cogs = cost.quantize(COGS_QUANT, rounding=ROUND_HALF_UP)
+    per_base = (cost / qty_base).quantize(COST_PER_BASE_QUANT, rounding=ROUND_HALF_UP)
+    return cogs, per_base
+
+
 # Helper functions used by views
 def stock_summary(location_id=None, product_id=None, batch_lot_id=None):
     qs = InventoryMovement.objects.all()
@@ -0,0 +1,122 @@
+from decimal import Decimal
+from datetime import date, timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.catalog.models import Product, Uom, BatchLot
+from apps.customers.models import Customer
+from apps.inventory.models import CostLayer, InventoryMovement
+from apps.inventory.services import consume_cost_layers
+from apps.locations.models import Location
+from apps.procurement.models import Vendor, PurchaseOrder, PurchaseOrderLine, GoodsReceipt, GoodsReceiptLine
+from apps.procurement.services import post_goods_receipt
+from apps.sales.models import SalesInvoice, SalesLine
+from apps.sales.services import post_invoice
+from apps.settingsx.services import set_setting
+
+
+class CostLayerTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username="costuser", password="pass123", is_staff=True)
+        self.location = Location.objects.create(code="LOC1", name="Main")
+        self.vendor = Vendor.objects.create(name="Acme")
+        self.uom = Uom.objects.create(name="TAB")
+        self.product = Product.objects.create(
+            code="P001",
+            name="Paracetamol",
+            mrp=Decimal("50.00"),
+            base_unit="TAB",
+            pack_unit="TAB",
+            units_per_pack=Decimal("1.000"),
+            base_uom=self.uom,
+            selling_uom=self.uom,
+        )
+        self.po = PurchaseOrder.objects.create(
+            vendor=self.vendor, location=self.location, po_number="PO-1", status=PurchaseOrder.Status.OPEN
+        )
+        self.pol = PurchaseOrderLine.objects.create(
+            po=self.po, product=self.product, qty_packs_ordered=100, expected_unit_cost=Decimal("5.00")
+        )
+
+    def _receive(self, qty, unit_cost):
+        grn = GoodsReceipt.objects.create(po=self.po, location=self.location)
+        GoodsReceiptLine.objects.create(
+            grn=grn,
+            po_line=self.pol,
+            product=self.product,
+            batch_no="B1",
+            expiry_date=date.today() + timedelta(days=365),
+            qty_packs_received=qty,
+            qty_base_received=Decimal(qty),
+            unit_cost=Decimal(unit_cost),
+            mrp=Decimal("50.00"),
+        )
+        post_goods_receipt(grn.id, actor=self.user)
+        return BatchLot.objects.get(product=self.product, batch_no="B1")
+
+    def test_each_receipt_keeps_its_own_cost(self):
+        self._receive(10, "4.00")
+        batch = self._receive(10, "6.00")
+        costs = list(CostLayer.objects.filter(batch_lot=batch).order_by("id").values_list("unit_cost_per_base", flat=True))
+        self.assertEqual(costs, [Decimal("4.000000"), Decimal("6.000000")])
+
+    def test_fifo_consumes_oldest_layer_first(self):
+        self._receive(10, "4.00")
+        batch = self._receive(10, "6.00")
+        cogs, per_base = consume_cost_layers(batch.id, Decimal("15"), method="FIFO")
+        self.assertEqual(cogs, Decimal("70.0000"))
+        self.assertEqual(per_base, Decimal("4.666667"))
+        remaining = CostLayer.objects.filter(batch_lot=batch).order_by("id").values_list("qty_base_remaining", flat=True)
+        self.assertEqual(list(remaining), [Decimal("0.000"), Decimal("5.000")])
+
+    def test_stock_on_hand_before_layering_is_consumed_first(self):
+        batch = BatchLot.objects.create(
+            product=self.product, batch_no="B1", expiry_date=date.today() + timedelta(days=365),
+            purchase_price_per_base=Decimal("4.000000"),
+        )
+        InventoryMovement.objects.create(location=self.location, batch_lot=batch, qty_change_base=Decimal("10"), reason="PURCHASE")
+        import_module("apps.inventory.migrations.0009_opening_cost_layers").backfill_opening_layers(apps, None)
+        self._receive(10, "6.00")
+        cogs, _ = consume_cost_layers(batch.id, Decimal("15"), method="FIFO")
+        self.assertEqual(cogs, Decimal("70.0000"))
+        opening = CostLayer.objects.get(batch_lot=batch, ref_doc_type="OPENING")
+        self.assertEqual((opening.qty_base_remaining, opening.unit_cost_per_base), (Decimal("0.000"), Decimal("4.000000")))
+
+    def test_weighted_average_keeps_average_cost(self):
+        self._receive(10, "4.00")
+        batch = self._receive(30, "6.00")
+        cogs, per_base = consume_cost_layers(batch.id, Decimal("20"), method="WAVG")
+        self.assertEqual(per_base, Decimal("5.500000"))
+        self.assertEqual(cogs, Decimal("110.0000"))
+        cogs, per_base = consume_cost_layers(batch.id, Decimal("20"), method="WAVG")
+        self.assertEqual(per_base, Decimal("5.500000"))
+
+    def test_post_invoice_stores_cogs_on_line(self):
+        set_setting("INVENTORY_COSTING_METHOD", "FIFO")
+        self._receive(10, "4.00")
+        batch = self._receive(10, "6.00")
+        customer = Customer.objects.create(name="Walk-in", code="CUST-1")
+        inv = SalesInvoice.objects.create(
+            invoice_no="INV-1",
+            location=self.location,
+            customer=customer,
+            created_by=self.user,
+            invoice_date=timezone.now(),
+        )
+        line = SalesLine.objects.create(
+            sale_invoice=inv,
+            product=self.product,
+            batch_lot=batch,
+            qty_base=Decimal("12"),
+            sold_uom="BASE",
+            rate_per_base=Decimal("10.00"),
+        )
+        post_invoice(self.user, inv.id)
+        line.refresh_from_db()
+        self.assertEqual(line.cogs_amount, Decimal("52.0000"))
+        self.assertEqual(line.cost_per_base, Decimal("4.333333"))
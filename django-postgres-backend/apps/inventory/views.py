@@ -20,6 +20,7 @@ from .services import (
 )
 from .models import RackLocation, InventoryMovement
 from apps.locations.models import Location
+from apps.accounts.authentication import claimed_location_id
 from .serializers import (
     RackLocationSerializer,
     AddMedicineRequestSerializer,
@@ -37,6 +38,8 @@ from apps.transfers.models import TransferLine
 from apps.procurement.models import VendorReturn, PurchaseOrderLine, GoodsReceiptLine
 from apps.compliance.models import H1RegisterEntry, NDPSDailyEntry, RecallEvent
 from core.permissions import HasActiveSystemLicense
+from core.mastercache import MasterListMixin, rack_locations
+from core.versions import conditional_get, location_scopes
 
 
 LICENSED_PERMISSIONS = [permissions.IsAuthenticated, HasActiveSystemLicense]
@@ -61,6 +64,7 @@ class BatchesListView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         status_f = request.query_params.get("status")
         product_id = request.query_params.get("product_id")
@@ -91,6 +95,7 @@ class StockOnHandView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         location_id = request.query_params.get("location_id")
         batch_lot_id = request.query_params.get("batch_lot_id")
@@ -166,6 +171,7 @@ class LowStockView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         location_id = request.query_params.get("location_id")
         if not location_id:
@@ -222,6 +228,7 @@ class ExpiringView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         window = request.query_params.get("window")
         days = None
@@ -245,13 +252,14 @@ class ExpiryAlertsView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         location_id = request.query_params.get("location_id")
         bucket = (request.query_params.get("bucket") or "all").lower()
 
         try:
-            from apps.settingsx.models import AlertThresholds
-            thr = AlertThresholds.objects.first()
+            from apps.settingsx.services import get_alert_thresholds
+            thr = get_alert_thresholds()
             crit_days = thr.critical_expiry_days if thr else int(get_setting("ALERT_EXPIRY_CRITICAL_DAYS", "30") or 30)
             warn_days = thr.warning_expiry_days if thr else int(get_setting("ALERT_EXPIRY_WARNING_DAYS", "60") or 60)
         except Exception:
@@ -299,6 +307,7 @@ class InventoryStatsView(APIView):
         parameters=[OpenApiParameter("location_id", OpenApiTypes.INT, OpenApiParameter.QUERY, required=True)],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         location_id = request.query_params.get("location_id")
         if not location_id:
@@ -317,6 +326,7 @@ class StockSummaryView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         location_id = request.query_params.get("location_id")
         product_id = request.query_params.get("product_id")
@@ -335,6 +345,9 @@ class MedicineViewMixin:
         profile = getattr(request.user, "profile", None)
         if profile and getattr(profile, "location_id", None):
             return profile.location_id
+        claimed = claimed_location_id(request)
+        if claimed:
+            return claimed
         first = Location.objects.order_by("id").first()
         return first.id if first else None
 
@@ -907,6 +920,7 @@ class MedicinesListView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         location_id = request.query_params.get("location_id")
         if not location_id:
@@ -1016,6 +1030,7 @@ class GlobalMedicinesView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         def _int_or_none(value):
             try:
@@ -1033,8 +1048,9 @@ class GlobalMedicinesView(APIView):
         return Response(data)
 
 
-class RackLocationViewSet(viewsets.ModelViewSet):
+class RackLocationViewSet(MasterListMixin, viewsets.ModelViewSet):
     queryset = RackLocation.objects.all()
+    master_table = rack_locations
     serializer_class = RackLocationSerializer
 
     def get_queryset(self):
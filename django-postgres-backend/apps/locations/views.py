@@ -3,6 +3,7 @@ from rest_framework.views import APIView
 from rest_framework import viewsets, permissions
 from .models import Location
 from .serializers import LocationSerializer
+from core.mastercache import MasterListMixin, locations
 
 
 class HealthView(APIView):
@@ -12,7 +13,8 @@ class HealthView(APIView):
         return Response({"ok": True})
 
 
-class LocationViewSet(viewsets.ModelViewSet):
+class LocationViewSet(MasterListMixin, viewsets.ModelViewSet):
     queryset = Location.objects.all()
+    master_table = locations
     serializer_class = LocationSerializer
 
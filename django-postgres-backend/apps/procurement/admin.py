@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Vendor, Purchase, PurchaseLine, PurchasePayment, PurchaseDocument, VendorReturn,
-    PurchaseOrder, PurchaseOrderLine, GoodsReceipt, GoodsReceiptLine,
+    PurchaseOrder, PurchaseOrderLine, GoodsReceipt, GoodsReceiptLine, PurchaseFact, BatchSource,
 )
 
 admin.site.register(Vendor)
@@ -14,4 +14,5 @@ admin.site.register(PurchaseOrder)
 admin.site.register(PurchaseOrderLine)
 admin.site.register(GoodsReceipt)
 admin.site.register(GoodsReceiptLine)
-
+admin.site.register(PurchaseFact)
+admin.site.register(BatchSource)
@@ -0,0 +1,288 @@
+"""Background purchase file imports.
+
+``PurchaseImportView`` spools the upload to ``IMPORT_SPOOL_DIR`` (moving Django's own
+temporary upload file when there is one, so large files are never held in memory),
+records it on an ``ImportJob`` and returns straight away;
+the job is parsed and turned into a PO on a small per-process thread pool
+(``IMPORT_JOB_WORKERS`` threads, so a burst of uploads queues instead of tying up
+request workers). Progress counters (pages parsed, then items found and matched per
+batch) are written to the job row as the import advances and polled through
+``GET /procurement/import-jobs/<id>/``. Jobs left QUEUED by a restart are picked up again
+by ``manage.py run_import_jobs``.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from itertools import islice
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+
+from apps.catalog.services_matching import MatchDiagnostics, ProductMatcher
+from apps.settingsx.services import next_doc_number
+
+from .models import ImportJob, PurchaseOrder, PurchaseOrderLine
+from .services_vendor_stats import apply_po, snapshot_po
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_TYPES = ("pdf", "csv", "xlsx", "xls")
+NO_ITEMS = "No items found in file"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class ImportFailed(Exception):
+    """Parsing failed with a message that can be shown to the user as is."""
+
+
+def max_upload_bytes() -> int:
+    return getattr(settings, "IMPORT_MAX_UPLOAD_MB", 50) * 1024 * 1024
+
+
+def spool_upload(upload, file_type: str) -> str:
+    """Write an UploadedFile to the spool directory without reading it into memory."""
+    spool_dir = settings.IMPORT_SPOOL_DIR
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, f"{uuid.uuid4().hex}.{file_type}")
+    if hasattr(upload, "temporary_file_path"):
+        file_move_safe(upload.temporary_file_path(), path)
+    else:
+        with open(path, "wb") as out:
+            for chunk in upload.chunks():
+                out.write(chunk)
+    return path
+
+
+def _discard_upload(path: str) -> None:
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, getattr(settings, "IMPORT_JOB_WORKERS", 2)),
+                    thread_name_prefix="import-job",
+                )
+    return _executor
+
+
+def submit(job_id: int) -> None:
+    """Queue the job once the transaction that created it commits."""
+    if getattr(settings, "IMPORT_JOBS_INLINE", False):
+        transaction.on_commit(lambda: run_import_job(job_id))
+    else:
+        transaction.on_commit(lambda: _pool().submit(_run_in_thread, job_id))
+
+
+def _run_in_thread(job_id: int) -> None:
+    close_old_connections()
+    try:
+        run_import_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def iter_purchase_items(file_type: str, stream, progress=None):
+    """Yield item dicts from a binary purchase file stream as it is parsed.
+
+    CSV and Excel rows are read lazily; PDFs are parsed page by page first. Failures are
+    raised as ImportFailed with a message for the user.
+    """
+    try:
+        if file_type == "pdf":
+            from .utils_pdf import extract_purchase_items_from_pdf
+
+            yield from extract_purchase_items_from_pdf(stream, progress=progress) or []
+        elif file_type == "csv":
+            from .utils import iter_items_from_csv
+
+            yield from iter_items_from_csv(stream)
+        else:
+            from .utils import iter_items_from_excel
+
+            yield from iter_items_from_excel(stream)
+    except ImportError as exc:
+        logger.error("Missing Python dependency for %s file: %s", file_type, exc, exc_info=True)
+        missing = str(exc).split("'")[1] if "'" in str(exc) else "unknown"
+        raise ImportFailed(
+            f"Failed to process {file_type.upper()} file. Required Python library '{missing}' is not installed on the server."
+        ) from exc
+    except Exception as exc:
+        logger.error("Error processing %s file: %s", file_type, exc, exc_info=True)
+        msg = str(exc).lower()
+        if file_type == "pdf" and ("pdftoppm" in msg or "poppler" in msg or "command not found" in msg):
+            raise ImportFailed(
+                "PDF processing failed. The server is missing required system libraries (poppler-utils). "
+                "Please contact the administrator or use CSV format instead."
+            ) from exc
+        raise ImportFailed(
+            f"Failed to process {file_type.upper()} file: {exc}. Please check the file format and ensure it's valid."
+        ) from exc
+
+
+def _int(value) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _decimal(value, default: Decimal) -> Decimal:
+    try:
+        return Decimal(str(value))
+    except Exception:
+        return default
+
+
+def _progress_writer(job_id: int):
+    """Return ``(write, close)``: ``write(**counters)`` updates the job row where pollers can see it.
+
+    The PO is built in one transaction, and an update made on its connection only shows once
+    it commits. The updates are therefore sent from a thread of their own, which has its own
+    connection and autocommits each one. A failed update is logged and skipped.
+    """
+    sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix="import-progress")
+
+    def write(**counters):
+        try:
+            sender.submit(ImportJob.objects.filter(pk=job_id).update, **counters).result()
+        except Exception:
+            logger.warning("Could not record progress of import job %s", job_id, exc_info=True)
+
+    def close():
+        sender.submit(connections.close_all).result()
+        sender.shutdown()
+
+    return write, close
+
+
+def create_po_from_items(
+    *, vendor, location, items, batch_size: int = 1000, progress=None
+) -> tuple[PurchaseOrder, MatchDiagnostics]:
+    """Create an OPEN PO with one line per item; returns (po, match diagnostics).
+
+    ``items`` may be a lazy iterator: it is consumed ``batch_size`` items at a time, each
+    batch matched to products (code, then the vendor's codes; by name only with
+    IMPORT_MATCH_BY_NAME) in a few queries and inserted in one statement. The line always
+    keeps the file's item name as ``requested_name``. ``progress(items_found, lines_matched)``
+    is called after each batch is matched when given. Raises ImportFailed when there are
+    no items.
+    """
+    items = iter(items)
+    batch = list(islice(items, batch_size))
+    if not batch:
+        raise ImportFailed(NO_ITEMS)
+
+    by_name = getattr(settings, "IMPORT_MATCH_BY_NAME", False)
+    matcher = ProductMatcher(vendor.id, fuzzy_threshold=getattr(settings, "IMPORT_FUZZY_THRESHOLD", None))
+    diagnostics = MatchDiagnostics()
+    found = 0
+    total = Decimal("0.00")
+    with transaction.atomic():
+        po = PurchaseOrder.objects.create(
+            vendor=vendor,
+            location=location,
+            po_number=next_doc_number("PO"),
+            order_date=timezone.now().date(),
+            status="OPEN",
+            net_total=0,
+        )
+        while batch:
+            matches = matcher.match_many([
+                {"code": it.get("product_code") or "", "name": (it.get("name") or "") if by_name else ""} for it in batch
+            ])
+            diagnostics.add(matches)
+            found += len(batch)
+            if progress:
+                progress(found, diagnostics.matched)
+            lines = []
+            for it, match in zip(batch, matches):
+                product = match.product
+                qty = _int(it.get("qty") or "0")
+                rate = _decimal(it.get("rate") or "0", Decimal("0.00"))
+                total += _decimal(it.get("net_value") or "0", rate * qty)
+                line = PurchaseOrderLine(
+                    po=po,
+                    product=product,
+                    requested_name=(it.get("name") or "").strip(),
+                    qty_packs_ordered=qty,
+                    expected_unit_cost=rate,
+                    gst_percent_override=None,
+                )
+                line.prepare_save()
+                lines.append(line)
+            PurchaseOrderLine.objects.bulk_create(lines)
+            matcher.clear_codes()
+            batch = list(islice(items, batch_size))
+        po.net_total = total
+        po.save(update_fields=["net_total"])
+        apply_po(snapshot_po(po))
+    return po, diagnostics
+
+
+def run_import_job(job_id: int) -> ImportJob | None:
+    """Process a QUEUED job; returns it in DONE/FAILED, or None if another worker claimed it."""
+    claimed = ImportJob.objects.filter(pk=job_id, status=ImportJob.Status.QUEUED).update(
+        status=ImportJob.Status.RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    job = ImportJob.objects.select_related("vendor", "location").get(pk=job_id)
+
+    write_progress, close_progress = _progress_writer(job_id)
+
+    def pages(parsed, total):
+        write_progress(pages_parsed=parsed, pages_total=total)
+
+    def lines(found, matched):
+        write_progress(items_found=found, lines_matched=matched)
+
+    try:
+        try:
+            stream = open(job.upload_path, "rb")
+        except OSError as exc:
+            raise ImportFailed("The uploaded file is no longer available. Please upload it again.") from exc
+        with stream:
+            job.po, diagnostics = create_po_from_items(
+                vendor=job.vendor,
+                location=job.location,
+                items=iter_purchase_items(job.file_type, stream, progress=pages),
+                progress=lines,
+            )
+        job.match_summary = diagnostics.as_dict()
+        job.items_found = job.lines_created = job.match_summary["total"]
+        job.lines_matched = job.match_summary["matched"]
+        job.status = ImportJob.Status.DONE
+    except ImportFailed as exc:
+        job.status, job.error = ImportJob.Status.FAILED, str(exc)
+    except Exception as exc:
+        logger.exception("Import job %s failed", job_id)
+        job.status = ImportJob.Status.FAILED
+        job.error = f"Failed to import file: {exc} (Error type: {type(exc).__name__}). Please check server logs for more details."
+    finally:
+        close_progress()
+
+    _discard_upload(job.upload_path)
+    job.upload_path = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        "status", "error", "upload_path", "items_found", "po", "lines_matched", "lines_created", "match_summary",
+        "finished_at",
+    ])
+    return job
@@ -1,53 +1,192 @@
 from __future__ import annotations
 
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from typing import Any
 
-def parse_grn_pdf(file_obj) -> dict:
+DEFAULT_OCR_DPI = 200
+
+# One OCR process pool per server process, created on first use and shared by all requests
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+# Per-process cache of OCR pool workers: the PDF last read, so its pages don't re-read the file
+_worker_file: tuple[str, bytes] = ("", b"")
+
+
+def _pytesseract():
+    """Import pytesseract on first OCR use, pointing it at the default install on Windows."""
+    import pytesseract  # type: ignore
+
+    # On Linux/Azure, tesseract should be installed and available in PATH
+    if os.name == "nt":
+        tesseract_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+        if os.path.exists(tesseract_path):
+            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    return pytesseract
+
+
+def _render_page(data: bytes, number: int, dpi: int):
+    """Rasterize one page (1-based) so only a single page image is held at a time."""
+    try:
+        from pdf2image import convert_from_bytes  # type: ignore
+
+        return convert_from_bytes(data, dpi=dpi, first_page=number, last_page=number)[0]
+    except Exception:
+        # Try fitz (PyMuPDF) as alternate path
+        import fitz  # type: ignore
+        import PIL.Image as Image  # type: ignore
+
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            pix = doc[number - 1].get_pixmap(dpi=dpi)
+            return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+
+def ocr_page(data: bytes, number: int, dpi: int = DEFAULT_OCR_DPI) -> str:
+    image = _render_page(data, number, dpi)
+    try:
+        return _pytesseract().image_to_string(image)
+    finally:
+        image.close()
+
+
+def _ocr_file_page(path: str, number: int, dpi: int) -> str:
+    global _worker_file
+    if _worker_file[0] != path:
+        with open(path, "rb") as fh:
+            _worker_file = (path, fh.read())
+    return ocr_page(_worker_file[1], number, dpi)
+
+
+def _ocr_pool() -> ProcessPoolExecutor:
+    """The shared pool of GRN_OCR_WORKERS processes (default: one per core)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: the caller may be a threaded server process, which is not safe to fork
+                _pool = ProcessPoolExecutor(
+                    max_workers=_ocr_settings()[1] or os.cpu_count() or 1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def _page_count(data: bytes) -> int:
+    try:
+        from pdf2image import pdfinfo_from_bytes  # type: ignore
+
+        return int(pdfinfo_from_bytes(data)["Pages"])
+    except Exception:
+        import fitz  # type: ignore
+
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            return doc.page_count
+
+
+def ocr_pages(data: bytes, numbers: list[int], *, dpi: int = DEFAULT_OCR_DPI, workers: int | None = None) -> list[str]:
+    """OCR the given pages, returned in the order given, on the shared OCR process pool.
+
+    At most ``workers`` pages (default: the pool size) of this call are in flight at once,
+    so concurrent uploads share the pool instead of each starting processes. The PDF is
+    handed to the workers as a temporary file. With a single worker or page the OCR runs
+    in this process.
+    """
+    workers = min(workers or _ocr_settings()[1] or os.cpu_count() or 1, len(numbers))
+    if workers <= 1:
+        return [ocr_page(data, n, dpi) for n in numbers]
+    pool = _ocr_pool()
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as fh:
+        fh.write(data)
+    texts: list[str] = [""] * len(numbers)
+    queue = iter(enumerate(numbers))
+    pending = {}
+    try:
+
+        def submit_next() -> None:
+            nxt = next(queue, None)
+            if nxt is not None:
+                pending[pool.submit(_ocr_file_page, fh.name, nxt[1], dpi)] = nxt[0]
+
+        for _ in range(workers):
+            submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                texts[pending.pop(future)] = future.result()
+                submit_next()
+        return texts
+    except BrokenProcessPool:
+        _reset_pool()
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+        os.remove(fh.name)
+
+
+def _ocr_settings() -> tuple[int, int | None]:
+    from django.conf import settings
+
+    return getattr(settings, "GRN_OCR_DPI", DEFAULT_OCR_DPI), getattr(settings, "GRN_OCR_WORKERS", None)
+
+
+def parse_grn_pdf(file_obj, *, dpi: int | None = None, workers: int | None = None) -> dict:
+    """Extract the text of a GRN PDF, OCR-ing only pages without a text layer.
+
+    Pages are returned in document order. ``dpi`` defaults to the GRN_OCR_DPI setting;
+    ``workers`` caps the pages OCR-ed at once (see ``ocr_pages``).
+    """
     meta: dict[str, Any] = {"ocr_used": False}
-    text = ""
+    if hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    data = file_obj.read()
+
+    page_texts: list[str] = []
     try:
+        import io
+
         import pdfplumber  # type: ignore
-        with pdfplumber.open(file_obj) as pdf:
+        with pdfplumber.open(io.BytesIO(data)) as pdf:
             for page in pdf.pages:
-                text += page.extract_text() or ""
+                page_texts.append(page.extract_text() or "")
     except Exception:
-        text = ""
+        page_texts = []
 
-    if text and text.strip():
-        return {"ok": True, "meta": meta, "raw_text": text}
+    missing = [i for i, txt in enumerate(page_texts, start=1) if not txt.strip()]
+    if page_texts and not missing:
+        return {"ok": True, "meta": meta, "raw_text": "".join(page_texts)}
 
     # Fallback OCR if available
     import shutil
     if not shutil.which("tesseract"):
+        if any(txt.strip() for txt in page_texts):
+            return {"ok": True, "meta": meta, "raw_text": "".join(page_texts)}
         return {"ok": False, "code": "UNSUPPORTED_SCAN", "meta": meta}
 
     try:
+        if not page_texts:
+            page_texts = [""] * _page_count(data)
+            missing = list(range(1, len(page_texts) + 1))
+        default_dpi = _ocr_settings()[0]
         meta["ocr_used"] = True
-        # Try pdf2image first
-        text_parts: list[str] = []
-        try:
-            from pdf2image import convert_from_bytes  # type: ignore
-            data = file_obj.read()
-            pages = convert_from_bytes(data)
-            import pytesseract  # type: ignore
-            for img in pages:
-                text_parts.append(pytesseract.image_to_string(img))
-            text = "\n".join(text_parts)
-        except Exception:
-            # Try fitz (PyMuPDF) as alternate path
-            import fitz  # type: ignore
-            import pytesseract  # type: ignore
-            doc = fitz.open(stream=file_obj.read(), filetype="pdf")
-            for page in doc:
-                pix = page.get_pixmap()
-                import PIL.Image as Image  # type: ignore
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                text_parts.append(pytesseract.image_to_string(img))
-            text = "\n".join(text_parts)
+        meta["ocr_pages"] = len(missing)
+        for number, txt in zip(missing, ocr_pages(data, missing, dpi=dpi or default_dpi, workers=workers)):
+            page_texts[number - 1] = txt
+        text = "\n".join(page_texts)
         if text.strip():
             return {"ok": True, "meta": meta, "raw_text": text}
     except Exception:
         return {"ok": False, "code": "UNSUPPORTED_SCAN", "meta": meta}
 
     return {"ok": False, "code": "UNSUPPORTED_SCAN", "meta": meta}
-
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.procurement.services import rebuild_purchase_facts
+
+
+class Command(BaseCommand):
+    help = "Rebuild the purchase fact table from all posted GRN lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = rebuild_purchase_facts(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purchase facts rebuilt: {written} rows"))
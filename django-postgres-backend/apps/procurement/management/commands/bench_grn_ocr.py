@@ -0,0 +1,55 @@
+import io
+import os
+import shutil
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.procurement.importers_pdf import parse_grn_pdf
+
+
+def scanned_invoice(pages: int) -> bytes:
+    """An image-only (no text layer) invoice PDF, like a scanner produces."""
+    from PIL import Image, ImageDraw
+
+    images = []
+    for number in range(1, pages + 1):
+        img = Image.new("RGB", (1654, 2339), "white")  # A4 at 200 dpi
+        draw = ImageDraw.Draw(img)
+        draw.text((120, 100), f"TAX INVOICE  No. INV-2024-{number:04d}  Page {number}/{pages}", fill="black")
+        for row in range(40):
+            y = 220 + row * 50
+            draw.text((120, y), f"{row + 1:3d}  PARACETAMOL 500MG TAB  B{number}{row:03d}  12/27  10x10  {row + 3}  45.50  12%", fill="black")
+        images.append(img)
+    buf = io.BytesIO()
+    images[0].save(buf, format="PDF", save_all=True, append_images=images[1:], resolution=200)
+    return buf.getvalue()
+
+
+class Command(BaseCommand):
+    help = "Time parse_grn_pdf OCR on a scanned invoice: one process vs. a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", help="PDF to parse (default: a generated scanned invoice)")
+        parser.add_argument("--pages", type=int, default=20, help="Pages of the generated invoice")
+        parser.add_argument("--dpi", type=int, default=200)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        if not shutil.which("tesseract"):
+            raise CommandError("tesseract is not installed; OCR cannot be benchmarked")
+        if options["file"]:
+            with open(options["file"], "rb") as fh:
+                data = fh.read()
+        else:
+            data = scanned_invoice(options["pages"])
+
+        for workers in (1, options["workers"]):
+            start = time.perf_counter()
+            result = parse_grn_pdf(io.BytesIO(data), dpi=options["dpi"], workers=workers)
+            elapsed = time.perf_counter() - start
+            pages = result["meta"].get("ocr_pages", 0)
+            self.stdout.write(
+                f"workers={workers:<3} ok={result['ok']!s:<5} OCR pages={pages:<3} "
+                f"{elapsed:7.2f} s  ({pages / elapsed if elapsed else 0:.2f} pages/s)"
+            )
@@ -0,0 +1,73 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand
+
+from apps.catalog.models import BatchLot, Product, Uom
+from apps.locations.models import Location
+from apps.procurement.models import GoodsReceipt, GoodsReceiptLine, PurchaseOrder, PurchaseOrderLine, Vendor
+from apps.procurement.services import post_goods_receipt
+
+
+class Rollback(Exception):
+    pass
+
+
+def build_grn(lines: int, existing_ratio: float = 0.5) -> int:
+    """A distributor-sized GRN: one line per product, part of the batches already on file."""
+    tag = f"BENCH{time.time_ns()}"
+    location = Location.objects.create(code=tag[-12:], name="Bench")
+    vendor = Vendor.objects.create(name=tag)
+    tab = Uom.objects.get_or_create(name="TAB")[0]
+    products = Product.objects.bulk_create([
+        Product(
+            code=f"{tag}-{i}", name=f"Bench product {i}", mrp=Decimal("50.00"), base_unit="TAB", pack_unit="STRIP",
+            units_per_pack=Decimal("10.000"), base_uom=tab, selling_uom=tab, manufacturer=f"Maker {i % 7}",
+        )
+        for i in range(lines)
+    ])
+    expiry = date.today() + timedelta(days=400)
+    BatchLot.objects.bulk_create([
+        BatchLot(product=p, batch_no=f"B{i}", expiry_date=expiry) for i, p in enumerate(products) if i < lines * existing_ratio
+    ])
+    po = PurchaseOrder.objects.create(vendor=vendor, location=location, po_number=tag, status=PurchaseOrder.Status.OPEN)
+    po_lines = PurchaseOrderLine.objects.bulk_create([
+        PurchaseOrderLine(po=po, product=p, qty_packs_ordered=20, expected_unit_cost=Decimal("30.00")) for p in products
+    ])
+    grn = GoodsReceipt.objects.create(po=po, location=location, status=GoodsReceipt.Status.DRAFT)
+    GoodsReceiptLine.objects.bulk_create([
+        GoodsReceiptLine(
+            grn=grn, po_line=pol, product=pol.product, batch_no=f"B{i}", expiry_date=expiry,
+            qty_packs_received=10 + i % 5, qty_base_received=Decimal("0"), unit_cost=Decimal("30.00") + i % 3,
+            mrp=Decimal("55.00"),
+        )
+        for i, pol in enumerate(po_lines)
+    ])
+    return grn.id
+
+
+class Command(BaseCommand):
+    help = "Time post_goods_receipt on a generated GRN (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, default=200)
+        parser.add_argument("--runs", type=int, default=3)
+
+    def handle(self, *args, **options):
+        for run in range(1, options["runs"] + 1):
+            try:
+                with transaction.atomic():
+                    grn_id = build_grn(options["lines"])
+                    queries = []
+                    with connection.execute_wrapper(lambda execute, sql, *a: queries.append(sql) or execute(sql, *a)):
+                        start = time.perf_counter()
+                        post_goods_receipt(grn_id, None)
+                        elapsed = time.perf_counter() - start
+                    raise Rollback
+            except Rollback:
+                pass
+            self.stdout.write(
+                f"run {run}: {options['lines']} lines posted in {elapsed * 1000:8.1f} ms, {len(queries)} queries"
+            )
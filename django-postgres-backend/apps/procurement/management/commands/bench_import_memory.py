@@ -0,0 +1,52 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from apps.procurement.import_jobs import iter_purchase_items, spool_upload
+
+ROW = "PRD{n:07d},PARACETAMOL 500MG TABLET STRIP OF 10 - BATCH {n},{qty},{rate}.50,0\n"
+
+
+def write_csv(fh, size_bytes: int) -> int:
+    rows = 0
+    fh.write(b"CODE,ITEM NAME,QTY,RATE,NET VALUE\n")
+    while fh.tell() < size_bytes:
+        fh.write(ROW.format(n=rows, qty=rows % 50 + 1, rate=rows % 300 + 10).encode())
+        rows += 1
+    fh.flush()
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Measure peak Python memory of spooling and parsing a large CSV purchase upload"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size-mb", type=int, default=50)
+
+    def handle(self, *args, **options):
+        size = options["size_mb"] * 1024 * 1024
+        with tempfile.TemporaryDirectory() as tmp, override_settings(IMPORT_SPOOL_DIR=os.path.join(tmp, "spool")):
+            upload = TemporaryUploadedFile("big.csv", "text/csv", size, "utf-8")
+            rows = write_csv(upload.file, size)
+            actual = os.path.getsize(upload.temporary_file_path())
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            path = spool_upload(upload, "csv")
+            upload.close()
+            spooled = tracemalloc.get_traced_memory()[1]
+            with open(path, "rb") as fh:
+                count = sum(1 for _ in iter_purchase_items("csv", fh))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            mb = 1024 * 1024
+            self.stdout.write(f"file: {actual / mb:.1f} MB, {rows} rows -> {count} items in {elapsed:.2f} s")
+            self.stdout.write(f"peak while spooling: {spooled / mb:.2f} MB")
+            self.stdout.write(f"peak spool + parse: {peak / mb:.1f} MB ({peak / actual:.2f}x file size)")
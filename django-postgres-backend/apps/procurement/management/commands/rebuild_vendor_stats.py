@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.procurement.services_vendor_stats import rebuild_vendor_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the vendor analytics rollup (VendorStats, VendorItem) from all POs and posted GRNs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vendor", type=int, action="append", dest="vendor_ids", help="Only this vendor id (repeatable)")
+
+    def handle(self, *args, **options):
+        written = rebuild_vendor_stats(vendor_ids=options["vendor_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Vendor stats rebuilt for {written} vendors"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.procurement.services import reconcile_po_receipts
+
+
+class Command(BaseCommand):
+    help = "Recompute PO line received/pending quantities and PO receipt status from posted GRN lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--po", type=int, action="append", dest="po_ids", help="Only this PO id (repeatable)")
+
+    def handle(self, *args, **options):
+        changed = reconcile_po_receipts(po_ids=options["po_ids"])
+        self.stdout.write(self.style.SUCCESS(
+            f"PO receipts reconciled: {changed['lines']} lines and {changed['pos']} purchase orders corrected"
+        ))
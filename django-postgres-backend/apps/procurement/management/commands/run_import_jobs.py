@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from apps.procurement.import_jobs import run_import_job
+from apps.procurement.models import ImportJob
+
+
+class Command(BaseCommand):
+    help = "Process purchase import jobs still QUEUED (e.g. left behind by a restart)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requeue-running", action="store_true", help="Also retry jobs stuck in RUNNING")
+
+    def handle(self, *args, **options):
+        if options["requeue_running"]:
+            ImportJob.objects.filter(status=ImportJob.Status.RUNNING).update(status=ImportJob.Status.QUEUED)
+        ids = list(ImportJob.objects.filter(status=ImportJob.Status.QUEUED).order_by("created_at").values_list("id", flat=True))
+        done = failed = 0
+        for job_id in ids:
+            job = run_import_job(job_id)
+            if job is None:
+                continue
+            if job.status == ImportJob.Status.DONE:
+                done += 1
+            else:
+                failed += 1
+                self.stderr.write(f"Job {job_id}: {job.error}")
+        self.stdout.write(self.style.SUCCESS(f"Import jobs processed: {done} done, {failed} failed"))
@@ -0,0 +1,58 @@
+# Generated by Django 4.2 on 2026-10-19 03:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_add_missing_packaging_fields'),
+        ('locations', '0001_initial'),
+        ('procurement', '0009_add_category_to_purchase_order_line'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('qty_packs', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('qty_base', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('line_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='goodsreceipt',
+            index=models.Index(fields=['status', 'received_at'], name='idx_grn_status_received'),
+        ),
+        migrations.AddField(
+            model_name='purchasefact',
+            name='location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='locations.location'),
+        ),
+        migrations.AddField(
+            model_name='purchasefact',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='catalog.product'),
+        ),
+        migrations.AddField(
+            model_name='purchasefact',
+            name='vendor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='procurement.vendor'),
+        ),
+        migrations.AddIndex(
+            model_name='purchasefact',
+            index=models.Index(fields=['day', 'location'], name='idx_purchasefact_day_loc'),
+        ),
+        migrations.AddIndex(
+            model_name='purchasefact',
+            index=models.Index(fields=['vendor', 'day'], name='idx_purchasefact_vendor_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='purchasefact',
+            constraint=models.UniqueConstraint(fields=('location', 'day', 'vendor', 'product'), name='uq_purchasefact_grain'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2 on 2026-10-19 03:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_batch_sources(apps, schema_editor):
+    # Replay posted receipts oldest first so the latest receipt of a batch at a location wins
+    BatchLot = apps.get_model("catalog", "BatchLot")
+    BatchSource = apps.get_model("procurement", "BatchSource")
+    GoodsReceiptLine = apps.get_model("procurement", "GoodsReceiptLine")
+    PurchaseLine = apps.get_model("procurement", "PurchaseLine")
+
+    receipts = []
+    for row in PurchaseLine.objects.filter(received_base_qty__gt=0).values(
+        "product_id", "batch_no", "purchase__location_id", "purchase__vendor_id", "purchase__created_at"
+    ):
+        receipts.append((
+            row["purchase__created_at"], row["product_id"], row["batch_no"], row["purchase__location_id"],
+            {"vendor_id": row["purchase__vendor_id"], "grn_id": None, "po_id": None,
+             "received_at": row["purchase__created_at"]},
+        ))
+    for row in GoodsReceiptLine.objects.filter(grn__status="POSTED", product__isnull=False).values(
+        "product_id", "batch_no", "grn_id", "grn__location_id", "grn__po_id", "grn__po__vendor_id",
+        "grn__received_at", "grn__created_at",
+    ):
+        received_at = row["grn__received_at"] or row["grn__created_at"]
+        receipts.append((
+            received_at, row["product_id"], row["batch_no"], row["grn__location_id"],
+            {"vendor_id": row["grn__po__vendor_id"], "grn_id": row["grn_id"], "po_id": row["grn__po_id"],
+             "received_at": received_at},
+        ))
+    if not receipts:
+        return
+
+    batch_ids = {
+        (b["product_id"], b["batch_no"]): b["id"]
+        for b in BatchLot.objects.filter(product_id__in={r[1] for r in receipts}).values("id", "product_id", "batch_no")
+    }
+    latest = {}
+    for _ts, product_id, batch_no, location_id, fields in sorted(receipts, key=lambda r: r[0]):
+        batch_id = batch_ids.get((product_id, batch_no))
+        if batch_id and fields["vendor_id"]:
+            latest[(batch_id, location_id)] = fields
+    BatchSource.objects.bulk_create(
+        [BatchSource(batch_lot_id=b, location_id=loc, **fields) for (b, loc), fields in latest.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0001_initial'),
+        ('catalog', '0010_add_missing_packaging_fields'),
+        ('procurement', '0010_purchasefact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('received_at', models.DateTimeField(blank=True, null=True)),
+                ('batch_lot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sources', to='catalog.batchlot')),
+                ('grn', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='procurement.goodsreceipt')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='locations.location')),
+                ('po', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='procurement.purchaseorder')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='procurement.vendor')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='batchsource',
+            index=models.Index(fields=['vendor', 'location'], name='idx_batchsource_vendor_loc'),
+        ),
+        migrations.AddConstraint(
+            model_name='batchsource',
+            constraint=models.UniqueConstraint(fields=('batch_lot', 'location'), name='uq_batchsource_batch_loc'),
+        ),
+        migrations.RunPython(backfill_batch_sources, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-19 03:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procurement', '0012_importjob'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='importjob',
+            name='payload',
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='file_size',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='upload_path',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
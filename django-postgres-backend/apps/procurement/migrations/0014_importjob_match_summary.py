@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 03:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procurement', '0013_importjob_spooled_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='match_summary',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
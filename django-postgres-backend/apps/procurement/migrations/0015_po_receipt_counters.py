@@ -0,0 +1,55 @@
+# Generated by Django 4.2 on 2026-10-19 04:04
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_receipt_counters(apps, schema_editor):
+    # Same numbers as services.reconcile_po_receipts, without touching PO statuses
+    GoodsReceiptLine = apps.get_model("procurement", "GoodsReceiptLine")
+    PurchaseOrder = apps.get_model("procurement", "PurchaseOrder")
+    PurchaseOrderLine = apps.get_model("procurement", "PurchaseOrderLine")
+
+    received = dict(
+        GoodsReceiptLine.objects.filter(grn__status="POSTED")
+        .values("po_line_id")
+        .annotate(total=Sum("qty_packs_received"))
+        .values_list("po_line_id", "total")
+    )
+    lines, done = [], {}
+    for pol in PurchaseOrderLine.objects.only("id", "po_id", "qty_packs_ordered").iterator():
+        pol.qty_packs_received = received.get(pol.id) or 0
+        pol.qty_packs_pending = max((pol.qty_packs_ordered or 0) - pol.qty_packs_received, 0)
+        lines.append(pol)
+        done[pol.po_id] = done.get(pol.po_id, 0) + (pol.qty_packs_pending == 0)
+    PurchaseOrderLine.objects.bulk_update(lines, ["qty_packs_received", "qty_packs_pending"], batch_size=1000)
+    pos = list(PurchaseOrder.objects.filter(id__in=done).only("id"))
+    for po in pos:
+        po.lines_received = done[po.id]
+    PurchaseOrder.objects.bulk_update(pos, ["lines_received"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procurement', '0014_importjob_match_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='lines_received',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='purchaseorderline',
+            name='qty_packs_pending',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='purchaseorderline',
+            name='qty_packs_received',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_receipt_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2 on 2026-10-19 04:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_vendor_stats(apps, schema_editor):
+    from apps.procurement.services_vendor_stats import rebuild_vendor_stats
+
+    rebuild_vendor_stats(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procurement', '0015_po_receipt_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('ordered_lines', models.PositiveIntegerField(default=0)),
+                ('last_po_price', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True)),
+                ('last_po_date', models.DateField(blank=True, null=True)),
+                ('received_lines', models.PositiveIntegerField(default=0)),
+                ('last_grn_price', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True)),
+                ('last_grn_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VendorStats',
+            fields=[
+                ('vendor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='procurement.vendor')),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('order_value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['vendor', '-order_date'], name='idx_po_vendor_orderdate'),
+        ),
+        migrations.AddField(
+            model_name='vendoritem',
+            name='vendor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='procurement.vendor'),
+        ),
+        migrations.AddIndex(
+            model_name='vendoritem',
+            index=models.Index(fields=['vendor', '-last_grn_at'], name='idx_vendoritem_vendor_grn'),
+        ),
+        migrations.AddIndex(
+            model_name='vendoritem',
+            index=models.Index(fields=['vendor', '-last_po_date'], name='idx_vendoritem_vendor_po'),
+        ),
+        migrations.AddConstraint(
+            model_name='vendoritem',
+            constraint=models.UniqueConstraint(fields=('vendor', 'name'), name='uq_vendoritem_vendor_name'),
+        ),
+        migrations.RunPython(backfill_vendor_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procurement', '0016_vendor_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='lead_time_days',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-19 04:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def clear_created_by(apps, schema_editor):
+    # The ids pointed at accounts.User, a different table; they cannot be carried over
+    apps.get_model("procurement", "ImportJob").objects.update(created_by=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('procurement', '0017_vendor_lead_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_created_by, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='importjob',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -25,6 +25,8 @@ class Vendor(models.Model):
     ifsc = models.CharField(max_length=32, blank=True)
     notes = models.TextField(blank=True)
     rating = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True)
+    # Days from order to delivery, used by reorder suggestions (REORDER_LEAD_TIME_DAYS when empty)
+    lead_time_days = models.PositiveIntegerField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
 
     def __str__(self) -> str:
@@ -154,11 +156,14 @@ class PurchaseOrder(models.Model):
     gross_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     tax_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     net_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Lines with nothing left to receive, kept by post_goods_receipt
+    lines_received = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
             models.Index(fields=["status", "order_date"], name="idx_po_status_orderdate"),
+            models.Index(fields=["vendor", "-order_date"], name="idx_po_vendor_orderdate"),
         ]
 
 
@@ -171,6 +176,17 @@ class PurchaseOrderLine(models.Model):
     expected_unit_cost = models.DecimalField(max_digits=14, decimal_places=2)
     gst_percent_override = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     category = models.CharField(max_length=64, blank=True, help_text="Category ID from frontend (e.g., 'tablet', 'capsule', 'syrup')")
+    # Packs received by posted GRNs and still to come, kept by post_goods_receipt
+    qty_packs_received = models.IntegerField(default=0)
+    qty_packs_pending = models.IntegerField(default=0)
+
+    def save(self, *args, **kwargs):
+        self.prepare_save()
+        super().save(*args, **kwargs)
+
+    def prepare_save(self):
+        """Derive qty_packs_pending as save() does; call it before bulk_create/bulk_update."""
+        self.qty_packs_pending = max((self.qty_packs_ordered or 0) - (self.qty_packs_received or 0), 0)
 
 
 class GoodsReceipt(models.Model):
@@ -189,6 +205,11 @@ class GoodsReceipt(models.Model):
     status = models.CharField(max_length=16, choices=Status.choices, default=Status.DRAFT)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "received_at"], name="idx_grn_status_received"),
+        ]
+
 
 class GoodsReceiptLine(models.Model):
     grn = models.ForeignKey(GoodsReceipt, on_delete=models.CASCADE, related_name='lines')
@@ -205,3 +226,122 @@ class GoodsReceiptLine(models.Model):
     rack_no = models.CharField(max_length=64, blank=True)
     new_product_payload = models.JSONField(blank=True, null=True)
 
+
+
+class PurchaseFact(models.Model):
+    """Daily received purchase totals per location, vendor and product, maintained when GRNs are posted."""
+
+    location = models.ForeignKey('locations.Location', on_delete=models.CASCADE)
+    day = models.DateField()
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE)
+    product = models.ForeignKey('catalog.Product', on_delete=models.CASCADE)
+    qty_packs = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    qty_base = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    line_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["location", "day", "vendor", "product"], name="uq_purchasefact_grain"),
+        ]
+        indexes = [
+            models.Index(fields=["day", "location"], name="idx_purchasefact_day_loc"),
+            models.Index(fields=["vendor", "day"], name="idx_purchasefact_vendor_day"),
+        ]
+
+
+class VendorStats(models.Model):
+    """Order totals of a vendor, kept by services_vendor_stats as POs are created, changed and deleted."""
+
+    vendor = models.OneToOneField(Vendor, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    order_count = models.PositiveIntegerField(default=0)
+    order_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    # Distinct item names on the vendor's PO lines
+    item_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class VendorItem(models.Model):
+    """An item name ordered from or received by a vendor, with its latest PO and GRN prices."""
+
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='items')
+    name = models.CharField(max_length=200)
+    ordered_lines = models.PositiveIntegerField(default=0)
+    last_po_price = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    last_po_date = models.DateField(null=True, blank=True)
+    received_lines = models.PositiveIntegerField(default=0)
+    last_grn_price = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    last_grn_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["vendor", "name"], name="uq_vendoritem_vendor_name"),
+        ]
+        indexes = [
+            models.Index(fields=["vendor", "-last_grn_at"], name="idx_vendoritem_vendor_grn"),
+            models.Index(fields=["vendor", "-last_po_date"], name="idx_vendoritem_vendor_po"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} @ vendor {self.vendor_id}"
+
+
+class BatchSource(models.Model):
+    """Latest posted receipt of a batch at a location: the vendor, GRN and PO it came from."""
+
+    batch_lot = models.ForeignKey('catalog.BatchLot', on_delete=models.CASCADE, related_name='sources')
+    location = models.ForeignKey('locations.Location', on_delete=models.CASCADE)
+    vendor = models.ForeignKey(Vendor, on_delete=models.PROTECT)
+    grn = models.ForeignKey(GoodsReceipt, on_delete=models.SET_NULL, null=True, blank=True)
+    po = models.ForeignKey(PurchaseOrder, on_delete=models.SET_NULL, null=True, blank=True)
+    received_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["batch_lot", "location"], name="uq_batchsource_batch_loc"),
+        ]
+        indexes = [
+            models.Index(fields=["vendor", "location"], name="idx_batchsource_vendor_loc"),
+        ]
+
+    def __str__(self):
+        return f"{self.batch_lot_id}@{self.location_id} <- vendor {self.vendor_id}"
+
+
+class ImportJob(models.Model):
+    """A purchase file upload parsed into a PO in the background (see import_jobs)."""
+
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", "Queued"
+        RUNNING = "RUNNING", "Running"
+        DONE = "DONE", "Done"
+        FAILED = "FAILED", "Failed"
+
+    vendor = models.ForeignKey(Vendor, on_delete=models.PROTECT)
+    location = models.ForeignKey('locations.Location', on_delete=models.PROTECT)
+    # The uploading login user; only they (and staff) can read the job
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="import_jobs")
+    file_name = models.CharField(max_length=255, blank=True)
+    file_type = models.CharField(max_length=8)
+    file_size = models.PositiveBigIntegerField(default=0)
+    # Spooled upload (under IMPORT_SPOOL_DIR) until the job finishes; removed afterwards
+    upload_path = models.CharField(max_length=500, blank=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED, db_index=True)
+    pages_total = models.PositiveIntegerField(default=0)
+    pages_parsed = models.PositiveIntegerField(default=0)
+    items_found = models.PositiveIntegerField(default=0)
+    lines_matched = models.PositiveIntegerField(default=0)
+    lines_created = models.PositiveIntegerField(default=0)
+    # catalog.services_matching.MatchDiagnostics of the created lines
+    match_summary = models.JSONField(default=dict, blank=True)
+    po = models.ForeignKey(PurchaseOrder, on_delete=models.SET_NULL, null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"], name="idx_importjob_status_created")]
+
+    def __str__(self):
+        return f"ImportJob {self.id} {self.file_name} [{self.status}]"
@@ -3,9 +3,10 @@ from django.db import transaction
 from decimal import Decimal
 from apps.catalog.models import Product
 from .services_pricing import compute_po_line_totals
+from .services_vendor_stats import apply_po, snapshot_po
 from .models import (
     Vendor, Purchase, PurchaseLine, PurchasePayment, PurchaseDocument, VendorReturn,
-    PurchaseOrder, PurchaseOrderLine, GoodsReceipt, GoodsReceiptLine,
+    PurchaseOrder, PurchaseOrderLine, GoodsReceipt, GoodsReceiptLine, ImportJob,
 )
 
 
@@ -54,18 +55,37 @@ class VendorReturnSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class PreloadedProductField(serializers.PrimaryKeyRelatedField):
+    """Product by id, taken from ``context["products"]`` (an ``in_bulk`` dict) when the caller
+    preloaded them, so validating many lines does not run one query per line."""
+
+    def to_internal_value(self, data):
+        products = self.context.get("products")
+        if products is None or isinstance(data, (bool, Product)):
+            return super().to_internal_value(data)
+        try:
+            product = products.get(int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if product is None:
+            self.fail("does_not_exist", pk_value=data)
+        return product
+
+
 class PurchaseOrderLineSerializer(serializers.ModelSerializer):
     category = serializers.CharField(required=False, allow_blank=True)
     product_name = serializers.SerializerMethodField()
-    
+    product = PreloadedProductField(queryset=Product.objects.all(), required=False, allow_null=True)
+
     class Meta:
         model = PurchaseOrderLine
         fields = "__all__"
         extra_kwargs = {
             "po": {"required": False},
             "expected_unit_cost": {"required": False},
-            "product": {"required": False, "allow_null": True},
             "medicine_form": {"required": False, "allow_null": True},
+            "qty_packs_received": {"read_only": True},
+            "qty_packs_pending": {"read_only": True},
         }
 
     def get_product_name(self, obj):
@@ -99,6 +119,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
             "gross_total": {"read_only": True},
             "tax_total": {"read_only": True},
             "net_total": {"read_only": True},
+            "lines_received": {"read_only": True},
         }
 
     @transaction.atomic
@@ -115,6 +136,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
         po.tax_total = tax_total
         po.net_total = (gross_total + tax_total).quantize(Decimal("0.01"))
         po.save(update_fields=["gross_total", "tax_total", "net_total"])
+        apply_po(snapshot_po(po))
         return po
 
     @transaction.atomic
@@ -123,6 +145,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
         validated_data.pop("gross_total", None)
         validated_data.pop("tax_total", None)
         validated_data.pop("net_total", None)
+        apply_po(snapshot_po(instance), sign=-1)
         for k, v in validated_data.items():
             setattr(instance, k, v)
         instance.save()
@@ -134,18 +157,28 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
             instance.tax_total = tax_total
             instance.net_total = (gross_total + tax_total).quantize(Decimal("0.01"))
             instance.save(update_fields=["gross_total", "tax_total", "net_total"])
+        apply_po(snapshot_po(instance))
         return instance
 
     def _save_lines(self, po, lines, vendor):
+        """Insert the PO lines in one statement; returns (gross_total, tax_total)."""
         gross_total = Decimal("0.00")
         tax_total = Decimal("0.00")
-        vendor_obj = vendor
-        for raw in lines:
-            line = dict(raw)
+        lines = [dict(raw) for raw in lines]
+        ids = {int(ln["product"]) for ln in lines if ln.get("product") and not isinstance(ln["product"], Product)}
+        found = Product.objects.in_bulk(ids) if ids else {}
+        for line in lines:
             product = line.get("product")
             if product and not isinstance(product, Product):
-                product = Product.objects.filter(id=product).first()
+                product = found.get(int(product))
             line["product"] = product
+        derived = self._derive_unit_costs(
+            [ln["product"] for ln in lines if ln["product"] and ln.get("expected_unit_cost") in (None, "", 0, "0")],
+            vendor,
+        )
+        rows = []
+        for line in lines:
+            product = line["product"]
             # PO does not create catalog product.
             # If product exists → use its name.
             if product and not line.get("requested_name"):
@@ -155,7 +188,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
             raw_cost = line.get("expected_unit_cost")
             cost = Decimal(str(raw_cost or "0"))
             if raw_cost in (None, "", 0, "0"):
-                cost = self._derive_unit_cost(product, vendor_obj)
+                cost = derived.get(product.id, Decimal("0.00")) if product else Decimal("0.00")
                 line["expected_unit_cost"] = cost
             gst_override = line.get("gst_percent_override")
             product_gst = Decimal(product.gst_percent or 0) if product else Decimal("0")
@@ -167,30 +200,35 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
             )
             gross_total += parts["gross"]
             tax_total += parts["tax"]
-            PurchaseOrderLine.objects.create(po=po, **line)
+            row = PurchaseOrderLine(po=po, **line)
+            row.prepare_save()
+            rows.append(row)
+        PurchaseOrderLine.objects.bulk_create(rows)
         return gross_total, tax_total
 
-    def _derive_unit_cost(self, product, vendor):
-        if not product:
-            return Decimal("0.00")
+    def _derive_unit_costs(self, products, vendor) -> dict:
+        """Product id -> unit cost of the vendor's latest posted GRN line for it, else the product's MRP."""
+        if not products:
+            return {}
         from .models import GoodsReceiptLine, GoodsReceipt
 
-        cost = None
+        costs = {}
         if vendor is not None:
-            gl = (
+            latest = (
                 GoodsReceiptLine.objects.filter(
                     grn__po__vendor=vendor,
                     grn__status=GoodsReceipt.Status.POSTED,
-                    product_id=product.id,
+                    product_id__in={p.id for p in products},
                 )
-                .order_by("-grn__received_at")
-                .first()
+                .order_by("product_id", "-grn__received_at")
+                .values_list("product_id", "unit_cost")
             )
-            if gl:
-                cost = gl.unit_cost
-        if cost is None:
-            cost = product.mrp or Decimal("0.00")
-        return Decimal(cost)
+            for product_id, unit_cost in latest:
+                costs.setdefault(product_id, unit_cost)
+        for product in products:
+            if costs.get(product.id) is None:
+                costs[product.id] = product.mrp or Decimal("0.00")
+        return {product_id: Decimal(cost) for product_id, cost in costs.items()}
 
 
 class GoodsReceiptLineSerializer(serializers.ModelSerializer):
@@ -249,3 +287,10 @@ class GoodsReceiptSerializer(serializers.ModelSerializer):
                 GoodsReceiptLine.objects.create(grn=instance, **line)
         return instance
 
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    po_number = serializers.CharField(source="po.po_number", read_only=True, default=None)
+
+    class Meta:
+        model = ImportJob
+        exclude = ["upload_path"]
@@ -1,17 +1,24 @@
 from collections import defaultdict
 from decimal import Decimal, ROUND_HALF_UP
-from django.db import transaction
-from django.db.models import Sum
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
 
 from apps.catalog.models import BatchLot, Product, ProductCategory
 from apps.catalog.services import packs_to_base
-from apps.inventory.services import write_movement, convert_quantity_to_base
-from apps.inventory.models import RackRule
+from apps.inventory.services import (
+    write_movement, write_movements, convert_quantity_to_base, record_cost_layer, record_cost_layers,
+)
 from .models import (
     Purchase, PurchaseLine, VendorReturn, GoodsReceipt, GoodsReceiptLine, PurchaseOrder, PurchaseOrderLine,
+    PurchaseFact, BatchSource,
 )
 from apps.governance.services import audit, emit_event
+from .services_vendor_stats import record_grn as record_vendor_grn
 from django.utils import timezone
+from core.loaders import identity_map, identity_scope
+from core.mastercache import categories, rack_rules
+from core.versions import bump
 
 PRICE_PER_BASE_QUANT = Decimal("0.000001")
 
@@ -19,15 +26,68 @@ PRICE_PER_BASE_QUANT = Decimal("0.000001")
 
 
 def assign_rack(location_id: int, manufacturer_name: str) -> str | None:
-    rule = RackRule.objects.filter(location_id=location_id, manufacturer_name__iexact=manufacturer_name, is_active=True).first()
+    rule = rack_rules.lookup("manufacturer_ci", (location_id, (manufacturer_name or "").lower()))
     return rule.rack_code if rule else None
 
 
+def _lock_batches(keys) -> dict[tuple, BatchLot]:
+    """The BatchLot rows for exactly these (product_id, batch_no) pairs, locked."""
+    if not keys:
+        return {}
+    cond = models.Q()
+    for product_id, batch_no in keys:
+        cond |= models.Q(product_id=product_id, batch_no=batch_no)
+    return {(b.product_id, b.batch_no): b for b in BatchLot.objects.select_for_update().filter(cond)}
+
+
+def _receive_into_batch(batch: BatchLot, ln: GoodsReceiptLine, created: bool, location_id: int) -> set[str]:
+    """Apply one GRN line's lot info, rack, purchase price and initial quantity to its batch.
+
+    Returns the changed fields; ``ln.qty_base_received`` must already be set.
+    """
+    product: Product = ln.product
+    updates = set()
+    # Update lot info if missing
+    if ln.mfg_date and not batch.mfg_date:
+        batch.mfg_date = ln.mfg_date
+        updates.add("mfg_date")
+    if ln.expiry_date and not batch.expiry_date:
+        batch.expiry_date = ln.expiry_date
+        updates.add("expiry_date")
+    # Suggest/assign rack
+    rack = ln.rack_no or assign_rack(location_id, product.manufacturer or "")
+    if rack and batch.rack_no != rack:
+        batch.rack_no = rack
+        updates.add("rack_no")
+
+    if ln.unit_cost is not None:
+        price_pack = Decimal(str(ln.unit_cost))
+        if batch.purchase_price != price_pack:
+            batch.purchase_price = price_pack
+            updates.add("purchase_price")
+        units_per_pack = product.units_per_pack or Decimal("1")
+        if units_per_pack > 0:
+            per_base = (price_pack / units_per_pack).quantize(
+                PRICE_PER_BASE_QUANT, rounding=ROUND_HALF_UP
+            )
+            if batch.purchase_price_per_base != per_base:
+                batch.purchase_price_per_base = per_base
+                updates.add("purchase_price_per_base")
+
+    needs_initial_update = created or not (batch.initial_quantity or Decimal("0"))
+    if needs_initial_update and ln.qty_base_received:
+        batch.initial_quantity = Decimal(str(ln.qty_packs_received or 0))
+        batch.initial_quantity_base = ln.qty_base_received
+        updates.update(["initial_quantity", "initial_quantity_base"])
+    return updates
+
+
 @transaction.atomic
 def post_purchase(purchase_id, actor=None):
     # Legacy flow: write purchase into stock
     p = Purchase.objects.select_for_update().get(id=purchase_id)
     total = Decimal("0")
+    batch_ids: list[int] = []
     for line in p.lines.select_related("product"):
         product: Product = line.product
         received = Decimal(line.qty_packs) * (product.units_per_pack or Decimal("0"))
@@ -39,6 +99,7 @@ def post_purchase(purchase_id, actor=None):
             batch_no=line.batch_no,
             defaults={"expiry_date": line.expiry_date, "status": BatchLot.Status.ACTIVE},
         )
+        batch_ids.append(batch.id)
         write_movement(
             location_id=p.location_id,
             batch_lot_id=batch.id,
@@ -47,11 +108,20 @@ def post_purchase(purchase_id, actor=None):
             ref_doc=("PURCHASE", p.id),
             actor=actor,
         )
+        if line.unit_cost is not None and received:
+            record_cost_layer(
+                location_id=p.location_id,
+                batch_lot_id=batch.id,
+                qty_base=received,
+                unit_cost_per_base=line.unit_cost * Decimal(line.qty_packs) / received,
+                ref_doc=("PURCHASE", p.id),
+            )
         total += (line.unit_cost * Decimal(line.qty_packs))
 
     p.gross_total = total
     p.net_total = total
     p.save(update_fields=["gross_total", "net_total"])
+    record_batch_sources(location_id=p.location_id, vendor_id=p.vendor_id, batch_ids=batch_ids)
 
     audit(
         actor,
@@ -64,12 +134,13 @@ def post_purchase(purchase_id, actor=None):
     return p
 
 
+@identity_scope()
 @transaction.atomic
 def post_goods_receipt(grn_id: int, actor) -> None:
     grn = (
         GoodsReceipt.objects.select_for_update()
         .select_related("po")
-        .prefetch_related("lines__product", "po__lines")
+        .prefetch_related("lines__product")
         .get(id=grn_id)
     )
     if grn.status == GoodsReceipt.Status.POSTED:
@@ -78,9 +149,9 @@ def post_goods_receipt(grn_id: int, actor) -> None:
     lines = list(grn.lines.select_related("po_line").all())
     if not lines:
         raise ValueError("Cannot POST an empty GRN.")
+    identity_map().attach(lines, "product")
 
     per_line_received = defaultdict(lambda: Decimal("0"))
-    po_line_map: dict[int, PurchaseOrderLine] = {}
     for ln in lines:
         if not ln.expiry_date or (ln.qty_packs_received or 0) <= 0:
             raise ValueError("Each GRN line must have expiry_date and qty_packs_received > 0")
@@ -88,92 +159,59 @@ def post_goods_receipt(grn_id: int, actor) -> None:
             raise ValueError("Each GRN line must be linked to a purchase order line.")
         qty_packs = Decimal(str(ln.qty_packs_received or 0))
         per_line_received[ln.po_line_id] += qty_packs
-        po_line_map[ln.po_line_id] = ln.po_line
 
-    if per_line_received:
-        already_received = (
-            GoodsReceiptLine.objects.filter(
-                po_line_id__in=per_line_received.keys(),
-                grn__status=GoodsReceipt.Status.POSTED,
+    # The PO's lines, locked: their received counters are checked here and advanced below
+    po_lines = {
+        pol.id: pol
+        for pol in PurchaseOrderLine.objects.select_for_update()
+        .filter(models.Q(po_id=grn.po_id) | models.Q(id__in=per_line_received.keys()))
+        .order_by("id")
+    }
+    for po_line_id, new_qty in per_line_received.items():
+        po_line = po_lines[po_line_id]
+        ordered_qty = Decimal(po_line.qty_packs_ordered or 0)
+        prev = Decimal(po_line.qty_packs_received or 0)
+        remaining = ordered_qty - prev
+        if remaining < Decimal("0"):
+            remaining = Decimal("0")
+        if new_qty > remaining:
+            raise ValueError(
+                "Receiving quantity exceeds total ordered for PO line "
+                f"{po_line_id}. Ordered {ordered_qty}, already received {prev}, "
+                f"remaining {remaining}."
             )
-            .values("po_line_id")
-            .annotate(total=Decimal("0") + Sum("qty_packs_received"))
-        )
-        already_map = {row["po_line_id"]: Decimal(row["total"] or 0) for row in already_received}
-        for po_line_id, new_qty in per_line_received.items():
-            po_line = po_line_map[po_line_id]
-            ordered_qty = Decimal(po_line.qty_packs_ordered or 0)
-            prev = already_map.get(po_line_id, Decimal("0"))
-            remaining = ordered_qty - prev
-            if remaining < Decimal("0"):
-                remaining = Decimal("0")
-            if new_qty > remaining:
-                raise ValueError(
-                    "Receiving quantity exceeds total ordered for PO line "
-                    f"{po_line_id}. Ordered {ordered_qty}, already received {prev}, "
-                    f"remaining {remaining}."
-                )
 
+    # Lines naming a new product create it first, one at a time; the rest is written in bulk
     for ln in lines:
-        qty_packs = Decimal(str(ln.qty_packs_received or 0))
-        product: Product | None = ln.product
-        if not product:
-            product = _create_or_update_product_from_payload(
-                ln.new_product_payload or {}, default_vendor_id=grn.po.vendor_id
-            )
-            ln.product = product
-            ln.save(update_fields=["product"])
-            if ln.po_line and not ln.po_line.product_id:
-                pol = ln.po_line
-                pol.product = product
-                updates = ["product"]
-                if not pol.requested_name:
-                    pol.requested_name = product.name
-                    updates.append("requested_name")
-                if product.medicine_form_id and not pol.medicine_form_id:
-                    pol.medicine_form_id = product.medicine_form_id
-                    updates.append("medicine_form")
-                pol.save(update_fields=updates)
-
-        batch, created = BatchLot.objects.get_or_create(
-            product=product,
-            batch_no=ln.batch_no,
-            defaults={
-                "mfg_date": ln.mfg_date,
-                "expiry_date": ln.expiry_date,
-                "status": BatchLot.Status.ACTIVE,
-            },
+        if ln.product:
+            continue
+        product = _create_or_update_product_from_payload(
+            ln.new_product_payload or {}, default_vendor_id=grn.po.vendor_id
         )
-        # Update lot info if missing
-        batch_updates: list[str] = []
-        if ln.mfg_date and not batch.mfg_date:
-            batch.mfg_date = ln.mfg_date
-            batch_updates.append("mfg_date")
-        if ln.expiry_date and not batch.expiry_date:
-            batch.expiry_date = ln.expiry_date
-            batch_updates.append("expiry_date")
-        # Suggest/assign rack
-        rack = ln.rack_no or assign_rack(grn.location_id, product.manufacturer or "")
-        if rack and batch.rack_no != rack:
-            batch.rack_no = rack
-            batch_updates.append("rack_no")
-
-        if ln.unit_cost is not None:
-            price_pack = Decimal(str(ln.unit_cost))
-            if batch.purchase_price != price_pack:
-                batch.purchase_price = price_pack
-                batch_updates.append("purchase_price")
-            units_per_pack = product.units_per_pack or Decimal("1")
-            if units_per_pack > 0:
-                per_base = (price_pack / units_per_pack).quantize(
-                    PRICE_PER_BASE_QUANT, rounding=ROUND_HALF_UP
-                )
-                if batch.purchase_price_per_base != per_base:
-                    batch.purchase_price_per_base = per_base
-                    batch_updates.append("purchase_price_per_base")
-
-        needs_initial_update = created or not (batch.initial_quantity or Decimal("0"))
-
+        ln.product = product
+        ln.save(update_fields=["product"])
+        if ln.po_line and not ln.po_line.product_id:
+            pol = ln.po_line
+            pol.product = product
+            updates = ["product"]
+            if not pol.requested_name:
+                pol.requested_name = product.name
+                updates.append("requested_name")
+            if product.medicine_form_id and not pol.medicine_form_id:
+                pol.medicine_form_id = product.medicine_form_id
+                updates.append("medicine_form")
+            pol.save(update_fields=updates)
+    identity_map().attach([ln.product for ln in lines], "base_uom", "selling_uom")
+
+    # Every (product, batch_no) the GRN touches, locked in one query
+    existing = _lock_batches({(ln.product_id, ln.batch_no) for ln in lines})
+    new_batches: dict[tuple, BatchLot] = {}
+    batch_updates: dict[tuple, set[str]] = defaultdict(set)
+    changed_products: dict[int, Product] = {}
+    line_keys: list[tuple] = []
+    for ln in lines:
+        product: Product = ln.product
+        key = (product.id, ln.batch_no)
         qty_base = ln.qty_base_received
         if qty_base in (None, 0):
             try:
@@ -189,61 +227,100 @@ def post_goods_receipt(grn_id: int, actor) -> None:
             except Exception:
                 qty_base = packs_to_base(product.id, Decimal(ln.qty_packs_received))
         ln.qty_base_received = qty_base
-        ln.save(update_fields=["qty_base_received"])
 
-        if needs_initial_update and qty_base:
-            batch.initial_quantity = qty_packs
-            batch.initial_quantity_base = qty_base
-            batch_updates.extend(["initial_quantity", "initial_quantity_base"])
-
-        if batch_updates:
-            batch.save(update_fields=sorted(set(batch_updates)))
+        batch = existing.get(key) or new_batches.get(key)
+        created = batch is None
+        if created:
+            batch = new_batches[key] = BatchLot(
+                product=product,
+                batch_no=ln.batch_no,
+                mfg_date=ln.mfg_date,
+                expiry_date=ln.expiry_date,
+                status=BatchLot.Status.ACTIVE,
+            )
+        batch_updates[key] |= _receive_into_batch(batch, ln, created, grn.location_id)
 
-        product_updates: list[str] = []
         if ln.mrp is not None:
             mrp = Decimal(str(ln.mrp))
             if product.mrp != mrp:
                 product.mrp = mrp
-                product_updates.append("mrp")
-        if product_updates:
-            product.save(update_fields=product_updates)
-        write_movement(
-            location_id=grn.location_id,
-            batch_lot_id=batch.id,
-            qty_change_base=qty_base - (ln.qty_base_damaged or Decimal("0")),
-            reason="PURCHASE",
-            ref_doc=("GRN", grn.id),
-            actor=actor,
-        )
-
-    # Update PO line received qty and status
-    po = grn.po
-    # aggregate received per po_line
-    recvd = (
-        GoodsReceiptLine.objects.filter(po_line__po=po)
-        .values("po_line_id")
-        .annotate(total=Decimal("0") + Sum("qty_packs_received"))
-    )
-    recvd_map = {r["po_line_id"]: r["total"] for r in recvd}
-    all_received = True
-    any_received = False
-    for pol in po.lines.all():
-        got = recvd_map.get(pol.id, 0) or 0
-        any_received = any_received or (got > 0)
-        if got < (pol.qty_packs_ordered or 0):
-            all_received = False
-    po.status = (
-        PurchaseOrder.Status.COMPLETED if all_received else (
-            PurchaseOrder.Status.PARTIALLY_RECEIVED if any_received else PurchaseOrder.Status.OPEN
+                changed_products[product.id] = product
+        line_keys.append(key)
+
+    for batch in new_batches.values():
+        batch.prepare_save()
+    try:
+        with transaction.atomic():
+            BatchLot.objects.bulk_create(list(new_batches.values()))
+    except IntegrityError:
+        # A GRN posted concurrently created some of these batches: receive into its rows instead
+        raced = _lock_batches(set(new_batches))
+        for key, batch in raced.items():
+            del new_batches[key]
+            existing[key] = batch
+            batch_updates[key] = set()
+            for ln in lines:
+                if (ln.product_id, ln.batch_no) == key:
+                    batch_updates[key] |= _receive_into_batch(batch, ln, False, grn.location_id)
+        BatchLot.objects.bulk_create(list(new_batches.values()))
+    dirty = {key: existing[key] for key, fields in batch_updates.items() if fields and key in existing}
+    for batch in dirty.values():
+        batch.prepare_save()
+    for fields in {frozenset(batch_updates[key]) for key in dirty}:
+        BatchLot.objects.bulk_update(
+            [batch for key, batch in dirty.items() if batch_updates[key] == fields], sorted(fields)
         )
+    GoodsReceiptLine.objects.bulk_update(lines, ["qty_base_received"])
+    Product.objects.bulk_update(list(changed_products.values()), ["mrp"])
+    # What the per-row post_save signals (core.signals) would have done
+    if new_batches or dirty:
+        bump("batch")
+        identity_map().forget(BatchLot)
+    if changed_products:
+        bump("product")
+        identity_map().forget(Product)
+
+    received_batch_ids = [(existing.get(key) or new_batches[key]).id for key in line_keys]
+    movements, cost_layers = [], []
+    for ln, batch_id in zip(lines, received_batch_ids):
+        qty_base = ln.qty_base_received
+        qty_good = qty_base - (ln.qty_base_damaged or Decimal("0"))
+        movements.append((batch_id, qty_good))
+        # Each receipt keeps its own cost, even when the batch was received before at another price
+        if ln.unit_cost is not None and qty_base:
+            qty_packs = Decimal(str(ln.qty_packs_received or 0))
+            cost_layers.append((batch_id, qty_good, Decimal(str(ln.unit_cost)) * qty_packs / Decimal(qty_base)))
+    write_movements(grn.location_id, movements, reason="PURCHASE", ref_doc=("GRN", grn.id), actor=actor)
+    record_cost_layers(cost_layers, location_id=grn.location_id, ref_doc=("GRN", grn.id))
+
+    # Advance the PO lines' received counters; the PO status follows from them
+    for po_line_id, new_qty in per_line_received.items():
+        pol = po_lines[po_line_id]
+        pol.qty_packs_received = (pol.qty_packs_received or 0) + int(new_qty)
+        pol.prepare_save()
+    PurchaseOrderLine.objects.bulk_update(
+        [po_lines[po_line_id] for po_line_id in per_line_received], ["qty_packs_received", "qty_packs_pending"]
     )
-    po.save(update_fields=["status"])
+    po = grn.po
+    po.lines_received, po.status = receipt_status([pol for pol in po_lines.values() if pol.po_id == po.id])
+    po.save(update_fields=["status", "lines_received"])
 
     grn.received_at = timezone.now()
     grn.received_by_id = getattr(actor, "id", None)
     grn.status = GoodsReceipt.Status.POSTED
     grn.save(update_fields=["status", "received_at", "received_by"])
 
+    record_purchase_facts(grn, lines)
+    record_vendor_grn(grn, lines)
+    record_batch_sources(
+        location_id=grn.location_id,
+        vendor_id=grn.po.vendor_id,
+        batch_ids=received_batch_ids,
+        grn_id=grn.id,
+        po_id=grn.po_id,
+        received_at=grn.received_at,
+    )
+
     audit(
         actor,
         table="procurement_goodsreceipt",
@@ -255,6 +332,170 @@ def post_goods_receipt(grn_id: int, actor) -> None:
     emit_event("GRN_POSTED", {"grn_id": grn.id, "po_id": grn.po_id})
 
 
+def receipt_status(po_lines) -> tuple[int, str]:
+    """(lines_received, status) of a PO from the received counters of all its lines."""
+    lines_received = sum(1 for pol in po_lines if not pol.qty_packs_pending)
+    if lines_received == len(po_lines):
+        return lines_received, PurchaseOrder.Status.COMPLETED
+    if any(pol.qty_packs_received for pol in po_lines):
+        return lines_received, PurchaseOrder.Status.PARTIALLY_RECEIVED
+    return lines_received, PurchaseOrder.Status.OPEN
+
+
+@transaction.atomic
+def reconcile_po_receipts(po_ids=None) -> dict:
+    """Recompute the received counters of PO lines and POs from posted GRN lines.
+
+    Statuses of POs being received (OPEN, PARTIALLY_RECEIVED, COMPLETED) are derived again
+    from the corrected counters. Returns how many lines and POs were changed.
+    """
+    pos = PurchaseOrder.objects.select_for_update().order_by("id")
+    po_lines = PurchaseOrderLine.objects.select_for_update().order_by("id")
+    posted = GoodsReceiptLine.objects.filter(grn__status=GoodsReceipt.Status.POSTED)
+    if po_ids is not None:
+        pos = pos.filter(id__in=po_ids)
+        po_lines = po_lines.filter(po_id__in=po_ids)
+        posted = posted.filter(po_line__po_id__in=po_ids)
+    received = dict(
+        posted.values("po_line_id").annotate(total=Sum("qty_packs_received")).values_list("po_line_id", "total")
+    )
+    by_po = defaultdict(list)
+    changed_lines = []
+    for pol in po_lines.only("id", "po_id", "qty_packs_ordered", "qty_packs_received", "qty_packs_pending").iterator():
+        before = (pol.qty_packs_received, pol.qty_packs_pending)
+        pol.qty_packs_received = received.get(pol.id) or 0
+        pol.prepare_save()
+        if (pol.qty_packs_received, pol.qty_packs_pending) != before:
+            changed_lines.append(pol)
+        by_po[pol.po_id].append(pol)
+    PurchaseOrderLine.objects.bulk_update(changed_lines, ["qty_packs_received", "qty_packs_pending"], batch_size=1000)
+
+    receiving = {PurchaseOrder.Status.OPEN, PurchaseOrder.Status.PARTIALLY_RECEIVED, PurchaseOrder.Status.COMPLETED}
+    changed_pos = []
+    for po in pos.only("id", "status", "lines_received").iterator():
+        before = (po.lines_received, po.status)
+        lines_received, status = receipt_status(by_po[po.id])
+        po.lines_received = lines_received
+        # A PO without lines has nothing to receive yet; leave its status alone
+        if po.status in receiving and by_po[po.id]:
+            po.status = status
+        if (po.lines_received, po.status) != before:
+            changed_pos.append(po)
+    PurchaseOrder.objects.bulk_update(changed_pos, ["lines_received", "status"], batch_size=1000)
+    return {"lines": len(changed_lines), "pos": len(changed_pos)}
+
+
+def record_batch_sources(
+    *, location_id: int, vendor_id: int, batch_ids: list[int], grn_id=None, po_id=None, received_at=None
+) -> None:
+    """Stamp the source vendor (and GRN/PO when known) on each received batch at a location.
+
+    One row per (batch, location); the latest receipt wins, matching what the expiry report used to pick.
+    """
+    defaults = {"vendor_id": vendor_id, "grn_id": grn_id, "po_id": po_id, "received_at": received_at or timezone.now()}
+    batch_ids = list(dict.fromkeys(batch_ids))
+    sources = {
+        src.batch_lot_id: src
+        for src in BatchSource.objects.select_for_update().filter(location_id=location_id, batch_lot_id__in=batch_ids)
+    }
+    for src in sources.values():
+        for field, value in defaults.items():
+            setattr(src, field, value)
+    BatchSource.objects.bulk_update(list(sources.values()), list(defaults))
+    missing = [batch_id for batch_id in batch_ids if batch_id not in sources]
+    try:
+        with transaction.atomic():
+            BatchSource.objects.bulk_create(
+                [BatchSource(batch_lot_id=batch_id, location_id=location_id, **defaults) for batch_id in missing]
+            )
+    except IntegrityError:
+        # Another receipt of one of these batches at this location was posted concurrently
+        for batch_id in missing:
+            BatchSource.objects.update_or_create(batch_lot_id=batch_id, location_id=location_id, defaults=defaults)
+
+
+def record_purchase_facts(grn: GoodsReceipt, lines: list[GoodsReceiptLine]) -> None:
+    """Add a posted GRN's lines to the daily PurchaseFact rows."""
+    day = timezone.localdate(grn.received_at)
+    vendor_id = grn.po.vendor_id
+    per_product: dict[int, dict] = {}
+    for ln in lines:
+        bucket = per_product.setdefault(
+            ln.product_id,
+            {"qty_packs": Decimal("0"), "qty_base": Decimal("0"), "value": Decimal("0"), "line_count": 0},
+        )
+        qty_packs = Decimal(ln.qty_packs_received or 0)
+        bucket["qty_packs"] += qty_packs
+        bucket["qty_base"] += Decimal(ln.qty_base_received or 0)
+        bucket["value"] += qty_packs * Decimal(ln.unit_cost or 0)
+        bucket["line_count"] += 1
+
+    key = {"location_id": grn.location_id, "day": day, "vendor_id": vendor_id}
+    facts = {
+        fact.product_id: fact
+        for fact in PurchaseFact.objects.select_for_update().filter(**key, product_id__in=per_product)
+    }
+    for product_id, fact in facts.items():
+        for field, value in per_product[product_id].items():
+            setattr(fact, field, getattr(fact, field) + value)
+    PurchaseFact.objects.bulk_update(list(facts.values()), ["qty_packs", "qty_base", "value", "line_count"])
+    missing = {product_id: totals for product_id, totals in per_product.items() if product_id not in facts}
+    try:
+        with transaction.atomic():
+            PurchaseFact.objects.bulk_create(
+                [PurchaseFact(**key, product_id=product_id, **totals) for product_id, totals in missing.items()]
+            )
+    except IntegrityError:
+        # Another GRN for the same grain was posted concurrently
+        for product_id, totals in missing.items():
+            updated = PurchaseFact.objects.filter(**key, product_id=product_id).update(
+                qty_packs=F("qty_packs") + totals["qty_packs"],
+                qty_base=F("qty_base") + totals["qty_base"],
+                value=F("value") + totals["value"],
+                line_count=F("line_count") + totals["line_count"],
+            )
+            if not updated:
+                PurchaseFact.objects.create(**key, product_id=product_id, **totals)
+
+
+@transaction.atomic
+def rebuild_purchase_facts(batch_size: int = 1000) -> int:
+    """Recompute PurchaseFact from every posted GRN line. Returns the number of rows written."""
+    value_expr = ExpressionWrapper(
+        F("qty_packs_received") * F("unit_cost"),
+        output_field=models.DecimalField(max_digits=16, decimal_places=2),
+    )
+    rows = (
+        GoodsReceiptLine.objects.filter(grn__status=GoodsReceipt.Status.POSTED, product__isnull=False)
+        .exclude(grn__received_at__isnull=True)
+        .annotate(day=TruncDate("grn__received_at"))
+        .values("grn__location_id", "day", "grn__po__vendor_id", "product_id")
+        .annotate(
+            qty_packs=Sum("qty_packs_received"),
+            qty_base=Sum("qty_base_received"),
+            value=Sum(value_expr),
+            line_count=Count("id"),
+        )
+        .order_by()
+    )
+    PurchaseFact.objects.all().delete()
+    facts = [
+        PurchaseFact(
+            location_id=r["grn__location_id"],
+            day=r["day"],
+            vendor_id=r["grn__po__vendor_id"],
+            product_id=r["product_id"],
+            qty_packs=r["qty_packs"] or 0,
+            qty_base=r["qty_base"] or 0,
+            value=r["value"] or 0,
+            line_count=r["line_count"],
+        )
+        for r in rows
+    ]
+    PurchaseFact.objects.bulk_create(facts, batch_size=batch_size)
+    return len(facts)
+
+
 def _create_or_update_product_from_payload(payload: dict, default_vendor_id=None) -> Product:
     if not payload:
         raise ValueError("Product details are required for new medicines.")
@@ -280,7 +521,7 @@ def _create_or_update_product_from_payload(payload: dict, default_vendor_id=None
             # Try to treat as integer ID
             category_id = int(category_value)
             # Verify it exists
-            if not ProductCategory.objects.filter(id=category_id).exists():
+            if categories.get(category_id) is None:
                 category_id = None
         except (ValueError, TypeError):
             # Not a number - treat as category name
@@ -315,10 +556,12 @@ def _create_or_update_product_from_payload(payload: dict, default_vendor_id=None
                 category_name = str(category_value)
             
             # Find or create the category
-            category_obj, created = ProductCategory.objects.get_or_create(
-                name=category_name,
-                defaults={'is_active': True}
-            )
+            category_obj = categories.lookup("name", category_name)
+            if category_obj is None:
+                category_obj, created = ProductCategory.objects.get_or_create(
+                    name=category_name,
+                    defaults={'is_active': True}
+                )
             category_id = category_obj.id
 
     # Handle rack_location - can be ID or None
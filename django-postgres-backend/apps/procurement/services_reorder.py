@@ -0,0 +1,151 @@
+"""Reorder suggestions for a location, grouped by each product's preferred vendor.
+
+Everything is read with one aggregate query per input, whatever the catalogue size:
+active products (reorder level, pack size, preferred vendor), stock on hand and units
+sold over the sales window (both summed from InventoryMovement), packs still pending on
+PO lines that are not completed or cancelled, and the vendors' lead times. The rest is
+arithmetic in base units per product:
+
+    reorder point = reorder_level + average daily sales * lead time
+    position      = stock on hand + pending PO quantity
+
+A product whose position is at or below its reorder point is ordered up to
+reorder point + average daily sales * cover days, rounded up to whole packs. Each vendor
+group can be posted as is to ``purchase-orders/import-commit``, which derives unit costs.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import ROUND_CEILING, Decimal
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.catalog.models import Product
+from apps.inventory.models import InventoryMovement
+from apps.settingsx.registry import parse_setting
+from apps.settingsx.services import get_settings
+
+from .models import PurchaseOrder, PurchaseOrderLine, Vendor
+
+QTY_QUANT = Decimal("0.001")
+OPEN_PO_STATUSES = (
+    PurchaseOrder.Status.DRAFT,
+    PurchaseOrder.Status.OPEN,
+    PurchaseOrder.Status.PARTIALLY_RECEIVED,
+)
+SETTING_KEYS = ("REORDER_SALES_WINDOW_DAYS", "REORDER_LEAD_TIME_DAYS", "REORDER_COVER_DAYS")
+
+
+def reorder_settings() -> dict:
+    """The REORDER_* settings, read in one go."""
+    stored = get_settings(SETTING_KEYS)
+    return {key: parse_setting(key, stored[key]) for key in SETTING_KEYS}
+
+
+def _by_product(rows) -> dict:
+    return {product_id: total or Decimal("0") for product_id, total in rows}
+
+
+def suggest_reorders(
+    location_id: int,
+    *,
+    window_days: int | None = None,
+    cover_days: int | None = None,
+    vendor_id: int | None = None,
+) -> dict:
+    """Suggested order quantities (in packs) for ``location_id``, one group per preferred vendor.
+
+    ``window_days`` and ``cover_days`` default to the REORDER_SALES_WINDOW_DAYS and
+    REORDER_COVER_DAYS settings; a vendor's ``lead_time_days`` falls back to
+    REORDER_LEAD_TIME_DAYS. ``vendor_id`` limits the result to that vendor's products.
+    Products without a preferred vendor come last, in a group with ``vendor_id`` None.
+    """
+    conf = reorder_settings()
+    window_days = max(int(window_days or conf["REORDER_SALES_WINDOW_DAYS"] or 30), 1)
+    cover_days = max(int(cover_days if cover_days is not None else conf["REORDER_COVER_DAYS"] or 0), 0)
+    default_lead = int(conf["REORDER_LEAD_TIME_DAYS"] or 0)
+
+    products = Product.objects.filter(is_active=True)
+    if vendor_id is not None:
+        products = products.filter(preferred_vendor_id=vendor_id)
+    products = list(
+        products.order_by("name", "id").values_list(
+            "id", "name", "code", "units_per_pack", "reorder_level", "preferred_vendor_id"
+        )
+    )
+    movements = InventoryMovement.objects.filter(location_id=location_id)
+    stock = _by_product(
+        movements.values("batch_lot__product_id").annotate(qty=Sum("qty_change_base")).values_list("batch_lot__product_id", "qty")
+    )
+    since = timezone.now() - timedelta(days=window_days)
+    sold = _by_product(
+        movements.filter(reason=InventoryMovement.Reason.SALE, created_at__gte=since)
+        .values("batch_lot__product_id")
+        .annotate(qty=Sum("qty_change_base"))
+        .values_list("batch_lot__product_id", "qty")
+    )
+    pending = _by_product(
+        PurchaseOrderLine.objects.filter(
+            po__location_id=location_id,
+            po__status__in=OPEN_PO_STATUSES,
+            product__isnull=False,
+            qty_packs_pending__gt=0,
+        )
+        .values("product_id")
+        .annotate(qty=Sum("qty_packs_pending"))
+        .values_list("product_id", "qty")
+    )
+    vendors = {
+        row["id"]: row
+        for row in Vendor.objects.filter(id__in={p[5] for p in products if p[5]}).values("id", "name", "lead_time_days")
+    }
+
+    groups: dict = {}
+    for product_id, name, code, units_per_pack, reorder_level, pref_vendor_id in products:
+        per_pack = units_per_pack or Decimal("1")
+        vendor = vendors.get(pref_vendor_id)
+        lead = vendor["lead_time_days"] if vendor and vendor["lead_time_days"] is not None else default_lead
+        daily = -sold.get(product_id, Decimal("0")) / window_days
+        if daily < 0:
+            daily = Decimal("0")  # more sale reversals than sales in the window
+        reorder_point = (reorder_level or Decimal("0")) + daily * lead
+        on_hand = stock.get(product_id, Decimal("0"))
+        on_order = Decimal(pending.get(product_id, 0)) * per_pack
+        position = on_hand + on_order
+        if position > reorder_point:
+            continue
+        target = reorder_point + daily * cover_days
+        packs = int(((target - position) / per_pack).to_integral_value(rounding=ROUND_CEILING))
+        if packs <= 0:
+            continue
+        if pref_vendor_id not in groups:
+            groups[pref_vendor_id] = {
+                "vendor_id": pref_vendor_id,
+                "vendor_name": vendor["name"] if vendor else "",
+                "location_id": location_id,
+                "lead_time_days": lead,
+                "lines": [],
+            }
+        groups[pref_vendor_id]["lines"].append({
+            "product_id": product_id,
+            "product_name": name,
+            "product_code": code or "",
+            "qty": packs,
+            "units_per_pack": per_pack,
+            "stock_base": on_hand.quantize(QTY_QUANT),
+            "pending_base": on_order.quantize(QTY_QUANT),
+            "avg_daily_sales": daily.quantize(QTY_QUANT),
+            "reorder_point": reorder_point.quantize(QTY_QUANT),
+            "target_base": target.quantize(QTY_QUANT),
+        })
+
+    ordered = sorted(groups.values(), key=lambda g: (g["vendor_id"] is None, g["vendor_name"].lower(), g["vendor_id"] or 0))
+    return {
+        "location_id": location_id,
+        "window_days": window_days,
+        "cover_days": cover_days,
+        "default_lead_time_days": default_lead,
+        "products_considered": len(products),
+        "vendors": ordered,
+    }
@@ -0,0 +1,206 @@
+"""Vendor analytics rollup behind VendorViewSet's summary, purchase-orders and products actions.
+
+``VendorStats`` holds a vendor's order count, order value and number of distinct item names;
+``VendorItem`` has one row per item name with how often it was ordered and received and its
+latest PO and GRN prices. Both are adjusted in the transaction that writes the document: a
+PO is described by ``snapshot_po`` and added with ``apply_po`` (subtracted, with sign=-1,
+before it is changed or deleted), and ``record_grn`` stamps the prices of a posted GRN.
+``rebuild_vendor_stats`` (``manage.py rebuild_vendor_stats``) recomputes both from the
+documents.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from decimal import Decimal
+
+from django.apps import apps as global_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+UNNAMED = "(Unnamed Item)"
+
+
+def _model(name: str, apps=None):
+    return (apps or global_apps).get_model("procurement", name)
+
+
+def item_name(name) -> str:
+    return name or UNNAMED
+
+
+def _newer(day, last_day, last_price) -> bool:
+    """Whether a PO dated ``day`` replaces the last PO price; undated POs only fill a gap."""
+    if last_price is None:
+        return True
+    if day is None:
+        return last_day is None
+    return last_day is None or day >= last_day
+
+
+def _lock_items(vendor_id: int, names) -> dict:
+    """The vendor's VendorItem rows for ``names``, locked, created when missing."""
+    VendorItem = _model("VendorItem")
+    names = set(names)
+    items = {item.name: item for item in VendorItem.objects.select_for_update().filter(vendor_id=vendor_id, name__in=names)}
+    missing = names - items.keys()
+    if missing:
+        try:
+            with transaction.atomic():
+                created = VendorItem.objects.bulk_create([VendorItem(vendor_id=vendor_id, name=name) for name in missing])
+        except IntegrityError:
+            # Another transaction added some of these names concurrently
+            for name in missing:
+                VendorItem.objects.get_or_create(vendor_id=vendor_id, name=name)
+            items = {
+                item.name: item
+                for item in VendorItem.objects.select_for_update().filter(vendor_id=vendor_id, name__in=names)
+            }
+        else:
+            items.update((item.name, item) for item in created)
+    return items
+
+
+def snapshot_po(po, lines=None) -> dict:
+    """What ``po`` (or just the given lines of it) contributes to its vendor's rollup."""
+    if lines is None:
+        rows = po.lines.order_by("id").values_list("requested_name", "expected_unit_cost")
+    else:
+        rows = [(line.requested_name, line.expected_unit_cost) for line in lines]
+    return {
+        "vendor_id": po.vendor_id,
+        "po_id": po.id,
+        "orders": 1 if lines is None else 0,
+        "value": Decimal(po.net_total or 0) if lines is None else Decimal("0"),
+        "order_date": po.order_date,
+        "lines": [(item_name(name), price) for name, price in rows],
+    }
+
+
+def apply_po(snapshot: dict, sign: int = 1) -> None:
+    """Add (sign=1) or take away (sign=-1) a ``snapshot_po`` from the vendor's rollup.
+
+    Taking a PO away lowers the counts; a last PO price it set falls back to the vendor's
+    latest other PO line for that item.
+    """
+    VendorStats = _model("VendorStats")
+    VendorItem = _model("VendorItem")
+    vendor_id = snapshot["vendor_id"]
+    stats, _ = VendorStats.objects.select_for_update().get_or_create(vendor_id=vendor_id)
+
+    counts = Counter(name for name, _ in snapshot["lines"])
+    if counts:
+        prices = dict(snapshot["lines"])
+        items = _lock_items(vendor_id, counts)
+        for name, n in counts.items():
+            item = items[name]
+            item.ordered_lines = max(item.ordered_lines + sign * n, 0)
+            if sign > 0 and _newer(snapshot["order_date"], item.last_po_date, item.last_po_price):
+                item.last_po_price, item.last_po_date = prices[name], snapshot["order_date"]
+            elif sign < 0 and (item.last_po_price, item.last_po_date) == (prices[name], snapshot["order_date"]):
+                item.last_po_price, item.last_po_date = _latest_po_price(vendor_id, name, snapshot["po_id"])
+        VendorItem.objects.bulk_update(
+            [items[name] for name in counts], ["ordered_lines", "last_po_price", "last_po_date"]
+        )
+
+    stats.order_count = max(stats.order_count + sign * snapshot["orders"], 0)
+    stats.order_value += sign * snapshot["value"]
+    stats.item_count = VendorItem.objects.filter(vendor_id=vendor_id, ordered_lines__gt=0).count()
+    stats.save()
+
+
+def _latest_po_price(vendor_id: int, name: str, exclude_po_id) -> tuple:
+    """(price, order_date) of the vendor's latest PO line for ``name`` outside one PO."""
+    named = Q(requested_name=name)
+    if name == UNNAMED:
+        named |= Q(requested_name="")
+    row = (
+        _model("PurchaseOrderLine").objects.filter(named, po__vendor_id=vendor_id)
+        .exclude(po_id=exclude_po_id)
+        .order_by(F("po__order_date").desc(nulls_last=True), "-id")
+        .values_list("expected_unit_cost", "po__order_date")
+        .first()
+    )
+    return row or (None, None)
+
+
+def record_grn(grn, lines) -> None:
+    """Stamp a posted GRN's unit costs on the vendor's items; ``lines`` need product and po_line loaded."""
+    VendorItem = _model("VendorItem")
+    counts: Counter = Counter()
+    prices = {}
+    for ln in lines:
+        name = item_name(ln.product.name if ln.product else getattr(ln.po_line, "requested_name", ""))
+        counts[name] += 1
+        prices.setdefault(name, ln.unit_cost)
+    if not counts:
+        return
+    items = _lock_items(grn.po.vendor_id, counts)
+    for name, n in counts.items():
+        item = items[name]
+        item.received_lines += n
+        if item.last_grn_at is None or (grn.received_at and grn.received_at >= item.last_grn_at):
+            item.last_grn_price, item.last_grn_at = prices[name], grn.received_at
+    VendorItem.objects.bulk_update(
+        [items[name] for name in counts], ["received_lines", "last_grn_price", "last_grn_at"]
+    )
+
+
+def rebuild_vendor_stats(vendor_ids=None, *, apps=None) -> int:
+    """Recompute VendorStats and VendorItem from all POs and posted GRNs; returns the vendors written.
+
+    ``apps`` lets a data migration pass its historical app registry.
+    """
+    VendorStats = _model("VendorStats", apps)
+    VendorItem = _model("VendorItem", apps)
+    pos = _model("PurchaseOrder", apps).objects.all()
+    po_lines = _model("PurchaseOrderLine", apps).objects.all()
+    grn_lines = _model("GoodsReceiptLine", apps).objects.filter(grn__status="POSTED")
+    if vendor_ids is not None:
+        pos = pos.filter(vendor_id__in=vendor_ids)
+        po_lines = po_lines.filter(po__vendor_id__in=vendor_ids)
+        grn_lines = grn_lines.filter(grn__po__vendor_id__in=vendor_ids)
+
+    items: dict[tuple, object] = {}
+
+    def item(vendor_id, name):
+        key = (vendor_id, item_name(name))
+        if key not in items:
+            items[key] = VendorItem(vendor_id=vendor_id, name=key[1])
+        return items[key]
+
+    for vendor_id, name, price, day in (
+        po_lines.order_by("id").values_list("po__vendor_id", "requested_name", "expected_unit_cost", "po__order_date").iterator()
+    ):
+        it = item(vendor_id, name)
+        it.ordered_lines += 1
+        if _newer(day, it.last_po_date, it.last_po_price):
+            it.last_po_price, it.last_po_date = price, day
+    for vendor_id, product_name, requested_name, price, received_at in (
+        grn_lines.order_by("id")
+        .values_list("grn__po__vendor_id", "product__name", "po_line__requested_name", "unit_cost", "grn__received_at")
+        .iterator()
+    ):
+        it = item(vendor_id, product_name or requested_name)
+        it.received_lines += 1
+        if it.last_grn_at is None or (received_at and received_at > it.last_grn_at):
+            it.last_grn_price, it.last_grn_at = price, received_at
+
+    item_counts = Counter(vendor_id for (vendor_id, _), it in items.items() if it.ordered_lines)
+    stats = [
+        VendorStats(
+            vendor_id=row["vendor_id"],
+            order_count=row["orders"],
+            order_value=row["value"] or 0,
+            item_count=item_counts.get(row["vendor_id"], 0),
+        )
+        for row in pos.values("vendor_id").annotate(orders=Count("id"), value=Sum("net_total")).order_by()
+    ]
+    with transaction.atomic():
+        old_stats, old_items = VendorStats.objects.all(), VendorItem.objects.all()
+        if vendor_ids is not None:
+            old_stats, old_items = old_stats.filter(vendor_id__in=vendor_ids), old_items.filter(vendor_id__in=vendor_ids)
+        old_items.delete()
+        old_stats.delete()
+        VendorItem.objects.bulk_create(items.values(), batch_size=1000)
+        VendorStats.objects.bulk_create(stats, batch_size=1000)
+    return len(stats)
@@ -0,0 +1,17 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+
+class BuyerClientMixin:
+    """``self.client`` is an APIClient logged in as ``self.buyer``, with the license check passing."""
+
+    def setUp(self):
+        super().setUp()
+        self.buyer = get_user_model().objects.create_user(username="buyer", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+        license_check = mock.patch("core.permissions.license_is_active", return_value=True)
+        license_check.start()
+        self.addCleanup(license_check.stop)
@@ -0,0 +1,444 @@
+"""Equivalence of the bulk post_goods_receipt with the per-line implementation it replaced.
+
+``reference_post_goods_receipt`` below is that implementation, kept verbatim (helpers renamed)
+so both can post the same GRN and the resulting rows be compared.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from unittest import mock
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Sum
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.catalog.models import BatchLot, Product, Uom
+from apps.catalog.services import packs_to_base
+from apps.governance.models import AuditLog
+from apps.inventory.models import BatchStock, CostLayer, InventoryMovement, RackRule
+from apps.inventory.services import convert_quantity_to_base, record_cost_layer, write_movement
+from apps.locations.models import Location
+from apps.procurement.models import (
+    BatchSource, GoodsReceipt, GoodsReceiptLine, PurchaseFact, PurchaseOrder, PurchaseOrderLine, Vendor,
+)
+from apps.procurement.services import (
+    PRICE_PER_BASE_QUANT, _create_or_update_product_from_payload, assign_rack, post_goods_receipt,
+)
+from apps.governance.services import audit, emit_event
+from apps.procurement import services
+from core.loaders import identity_map, identity_scope
+from core import mastercache
+
+
+@identity_scope()
+@transaction.atomic
+def reference_post_goods_receipt(grn_id: int, actor) -> None:
+    grn = (
+        GoodsReceipt.objects.select_for_update()
+        .select_related("po")
+        .prefetch_related("lines__product", "po__lines")
+        .get(id=grn_id)
+    )
+    if grn.status == GoodsReceipt.Status.POSTED:
+        raise ValueError("GRN already POSTED")
+
+    lines = list(grn.lines.select_related("po_line").all())
+    if not lines:
+        raise ValueError("Cannot POST an empty GRN.")
+    identity_map().attach(lines, "product")
+
+    per_line_received = defaultdict(lambda: Decimal("0"))
+    po_line_map: dict[int, PurchaseOrderLine] = {}
+    for ln in lines:
+        if not ln.expiry_date or (ln.qty_packs_received or 0) <= 0:
+            raise ValueError("Each GRN line must have expiry_date and qty_packs_received > 0")
+        if not ln.po_line_id:
+            raise ValueError("Each GRN line must be linked to a purchase order line.")
+        qty_packs = Decimal(str(ln.qty_packs_received or 0))
+        per_line_received[ln.po_line_id] += qty_packs
+        po_line_map[ln.po_line_id] = ln.po_line
+
+    if per_line_received:
+        already_received = (
+            GoodsReceiptLine.objects.filter(
+                po_line_id__in=per_line_received.keys(),
+                grn__status=GoodsReceipt.Status.POSTED,
+            )
+            .values("po_line_id")
+            .annotate(total=Decimal("0") + Sum("qty_packs_received"))
+        )
+        already_map = {row["po_line_id"]: Decimal(row["total"] or 0) for row in already_received}
+        for po_line_id, new_qty in per_line_received.items():
+            po_line = po_line_map[po_line_id]
+            ordered_qty = Decimal(po_line.qty_packs_ordered or 0)
+            prev = already_map.get(po_line_id, Decimal("0"))
+            remaining = ordered_qty - prev
+            if remaining < Decimal("0"):
+                remaining = Decimal("0")
+            if new_qty > remaining:
+                raise ValueError(
+                    "Receiving quantity exceeds total ordered for PO line "
+                    f"{po_line_id}. Ordered {ordered_qty}, already received {prev}, "
+                    f"remaining {remaining}."
+                )
+
+    received_batch_ids: list[int] = []
+    for ln in lines:
+        qty_packs = Decimal(str(ln.qty_packs_received or 0))
+        product: Product | None = ln.product
+        if not product:
+            product = _create_or_update_product_from_payload(
+                ln.new_product_payload or {}, default_vendor_id=grn.po.vendor_id
+            )
+            ln.product = product
+            ln.save(update_fields=["product"])
+            if ln.po_line and not ln.po_line.product_id:
+                pol = ln.po_line
+                pol.product = product
+                updates = ["product"]
+                if not pol.requested_name:
+                    pol.requested_name = product.name
+                    updates.append("requested_name")
+                if product.medicine_form_id and not pol.medicine_form_id:
+                    pol.medicine_form_id = product.medicine_form_id
+                    updates.append("medicine_form")
+                pol.save(update_fields=updates)
+
+        batch, created = BatchLot.objects.get_or_create(
+            product=product,
+            batch_no=ln.batch_no,
+            defaults={
+                "mfg_date": ln.mfg_date,
+                "expiry_date": ln.expiry_date,
+                "status": BatchLot.Status.ACTIVE,
+            },
+        )
+        # Update lot info if missing
+        batch_updates: list[str] = []
+        if ln.mfg_date and not batch.mfg_date:
+            batch.mfg_date = ln.mfg_date
+            batch_updates.append("mfg_date")
+        if ln.expiry_date and not batch.expiry_date:
+            batch.expiry_date = ln.expiry_date
+            batch_updates.append("expiry_date")
+        # Suggest/assign rack
+        rack = ln.rack_no or assign_rack(grn.location_id, product.manufacturer or "")
+        if rack and batch.rack_no != rack:
+            batch.rack_no = rack
+            batch_updates.append("rack_no")
+
+        if ln.unit_cost is not None:
+            price_pack = Decimal(str(ln.unit_cost))
+            if batch.purchase_price != price_pack:
+                batch.purchase_price = price_pack
+                batch_updates.append("purchase_price")
+            units_per_pack = product.units_per_pack or Decimal("1")
+            if units_per_pack > 0:
+                per_base = (price_pack / units_per_pack).quantize(
+                    PRICE_PER_BASE_QUANT, rounding=ROUND_HALF_UP
+                )
+                if batch.purchase_price_per_base != per_base:
+                    batch.purchase_price_per_base = per_base
+                    batch_updates.append("purchase_price_per_base")
+
+        needs_initial_update = created or not (batch.initial_quantity or Decimal("0"))
+
+        qty_base = ln.qty_base_received
+        if qty_base in (None, 0):
+            try:
+                qty_base, _ = convert_quantity_to_base(
+                    quantity=Decimal(str(ln.qty_packs_received or 0)),
+                    base_uom=product.base_uom,
+                    selling_uom=product.selling_uom,
+                    quantity_uom=product.selling_uom,
+                    units_per_pack=product.units_per_pack or Decimal("1"),
+                    tablets_per_strip=getattr(product, "tablets_per_strip", None),
+                    strips_per_box=getattr(product, "strips_per_box", None),
+                )
+            except Exception:
+                qty_base = packs_to_base(product.id, Decimal(ln.qty_packs_received))
+        ln.qty_base_received = qty_base
+        ln.save(update_fields=["qty_base_received"])
+
+        if needs_initial_update and qty_base:
+            batch.initial_quantity = qty_packs
+            batch.initial_quantity_base = qty_base
+            batch_updates.extend(["initial_quantity", "initial_quantity_base"])
+
+        if batch_updates:
+            batch.save(update_fields=sorted(set(batch_updates)))
+
+        product_updates: list[str] = []
+        if ln.mrp is not None:
+            mrp = Decimal(str(ln.mrp))
+            if product.mrp != mrp:
+                product.mrp = mrp
+                product_updates.append("mrp")
+        if product_updates:
+            product.save(update_fields=product_updates)
+        qty_good = qty_base - (ln.qty_base_damaged or Decimal("0"))
+        received_batch_ids.append(batch.id)
+        write_movement(
+            location_id=grn.location_id,
+            batch_lot_id=batch.id,
+            qty_change_base=qty_good,
+            reason="PURCHASE",
+            ref_doc=("GRN", grn.id),
+            actor=actor,
+        )
+        # Each receipt keeps its own cost, even when the batch was received before at another price
+        if ln.unit_cost is not None and qty_base:
+            record_cost_layer(
+                location_id=grn.location_id,
+                batch_lot_id=batch.id,
+                qty_base=qty_good,
+                unit_cost_per_base=Decimal(str(ln.unit_cost)) * qty_packs / Decimal(qty_base),
+                ref_doc=("GRN", grn.id),
+            )
+
+    # Update PO line received qty and status
+    po = grn.po
+    # aggregate received per po_line
+    recvd = (
+        GoodsReceiptLine.objects.filter(po_line__po=po)
+        .values("po_line_id")
+        .annotate(total=Decimal("0") + Sum("qty_packs_received"))
+    )
+    recvd_map = {r["po_line_id"]: r["total"] for r in recvd}
+    all_received = True
+    any_received = False
+    for pol in po.lines.all():
+        got = recvd_map.get(pol.id, 0) or 0
+        any_received = any_received or (got > 0)
+        if got < (pol.qty_packs_ordered or 0):
+            all_received = False
+    po.status = (
+        PurchaseOrder.Status.COMPLETED if all_received else (
+            PurchaseOrder.Status.PARTIALLY_RECEIVED if any_received else PurchaseOrder.Status.OPEN
+        )
+    )
+    po.save(update_fields=["status"])
+
+    grn.received_at = timezone.now()
+    grn.received_by_id = getattr(actor, "id", None)
+    grn.status = GoodsReceipt.Status.POSTED
+    grn.save(update_fields=["status", "received_at", "received_by"])
+
+    _reference_purchase_facts(grn, lines)
+    _reference_batch_sources(
+        location_id=grn.location_id,
+        vendor_id=grn.po.vendor_id,
+        batch_ids=received_batch_ids,
+        grn_id=grn.id,
+        po_id=grn.po_id,
+        received_at=grn.received_at,
+    )
+
+    audit(
+        actor,
+        table="procurement_goodsreceipt",
+        row_id=grn.id,
+        action="POSTED",
+        before=None,
+        after={"status": grn.status, "po_id": grn.po_id},
+    )
+    emit_event("GRN_POSTED", {"grn_id": grn.id, "po_id": grn.po_id})
+
+
+def _reference_batch_sources(
+    *, location_id: int, vendor_id: int, batch_ids: list[int], grn_id=None, po_id=None, received_at=None
+) -> None:
+    """Stamp the source vendor (and GRN/PO when known) on each received batch at a location.
+
+    One row per (batch, location); the latest receipt wins, matching what the expiry report used to pick.
+    """
+    defaults = {"vendor_id": vendor_id, "grn_id": grn_id, "po_id": po_id, "received_at": received_at or timezone.now()}
+    for batch_id in dict.fromkeys(batch_ids):
+        BatchSource.objects.update_or_create(batch_lot_id=batch_id, location_id=location_id, defaults=defaults)
+
+
+def _reference_purchase_facts(grn: GoodsReceipt, lines: list[GoodsReceiptLine]) -> None:
+    """Add a posted GRN's lines to the daily PurchaseFact rows."""
+    day = timezone.localdate(grn.received_at)
+    vendor_id = grn.po.vendor_id
+    per_product: dict[int, dict] = {}
+    for ln in lines:
+        bucket = per_product.setdefault(
+            ln.product_id,
+            {"qty_packs": Decimal("0"), "qty_base": Decimal("0"), "value": Decimal("0"), "line_count": 0},
+        )
+        qty_packs = Decimal(ln.qty_packs_received or 0)
+        bucket["qty_packs"] += qty_packs
+        bucket["qty_base"] += Decimal(ln.qty_base_received or 0)
+        bucket["value"] += qty_packs * Decimal(ln.unit_cost or 0)
+        bucket["line_count"] += 1
+
+    for product_id, totals in per_product.items():
+        key = {"location_id": grn.location_id, "day": day, "vendor_id": vendor_id, "product_id": product_id}
+        updated = PurchaseFact.objects.filter(**key).update(
+            qty_packs=F("qty_packs") + totals["qty_packs"],
+            qty_base=F("qty_base") + totals["qty_base"],
+            value=F("value") + totals["value"],
+            line_count=F("line_count") + totals["line_count"],
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    PurchaseFact.objects.create(**key, **totals)
+            except IntegrityError:
+                # Another GRN for the same grain was posted concurrently
+                PurchaseFact.objects.filter(**key).update(
+                    qty_packs=F("qty_packs") + totals["qty_packs"],
+                    qty_base=F("qty_base") + totals["qty_base"],
+                    value=F("value") + totals["value"],
+                    line_count=F("line_count") + totals["line_count"],
+                )
+
+
+
+
+def snapshot(grn_id: int) -> dict:
+    """Every row post_goods_receipt writes, keyed by natural keys instead of ids."""
+    def lot(batch_id):
+        b = BatchLot.objects.select_related("product").get(id=batch_id)
+        return (b.product.code, b.batch_no)
+
+    return {
+        "batches": sorted(
+            BatchLot.objects.select_related("product").values_list(
+                "product__code", "batch_no", "mfg_date", "expiry_date", "status", "rack_no", "initial_quantity",
+                "initial_quantity_base", "purchase_price", "purchase_price_per_base",
+            )
+        ),
+        "products": sorted(Product.objects.values_list("code", "mrp")),
+        "grn_lines": sorted(
+            GoodsReceiptLine.objects.filter(grn_id=grn_id).values_list("product__code", "batch_no", "qty_base_received")
+        ),
+        "movements": sorted(
+            (lot(m.batch_lot_id), m.location_id, m.qty_change_base, m.reason, m.ref_doc_type, m.ref_doc_id)
+            for m in InventoryMovement.objects.all()
+        ),
+        "stock": sorted((lot(s.batch_id), s.location_id, s.quantity) for s in BatchStock.objects.all()),
+        "cost_layers": sorted(
+            (lot(c.batch_lot_id), c.qty_base_received, c.qty_base_remaining, c.unit_cost_per_base, c.ref_doc_type)
+            for c in CostLayer.objects.all()
+        ),
+        "sources": sorted((lot(s.batch_lot_id), s.location_id, s.vendor_id, s.grn_id) for s in BatchSource.objects.all()),
+        "facts": sorted(PurchaseFact.objects.values_list("product__code", "qty_packs", "qty_base", "value", "line_count")),
+        "po": list(PurchaseOrder.objects.values_list("status")),
+        "grn": list(GoodsReceipt.objects.filter(id=grn_id).values_list("status")),
+        "audit": sorted(
+            (a.table_name, a.action, tuple(sorted((k, v) for k, v in (a.after_json or {}).items() if k != "batch_lot_id")))
+            for a in AuditLog.objects.all()
+        ),
+    }
+
+
+class BulkGrnPostingEquivalenceTests(TestCase):
+    def setUp(self):
+        self.loc = Location.objects.create(code="LOC1", name="Main")
+        self.vendor = Vendor.objects.create(name="Acme")
+        tab = Uom.objects.create(name="TAB")
+        strip = Uom.objects.create(name="STRIP")
+
+        def product(code, **extra):
+            return Product.objects.create(
+                code=code, name=code, mrp=Decimal("50.00"), base_unit="TAB", pack_unit="STRIP",
+                units_per_pack=Decimal("10.000"), base_uom=tab, selling_uom=strip, manufacturer="Cipla", **extra,
+            )
+
+        self.p1 = product("P1", tablets_per_strip=10, strips_per_box=5)
+        self.p2 = product("P2")
+        self.p3 = product("P3")
+        RackRule.objects.create(location=self.loc, manufacturer_name="Cipla", rack_code="R-9")
+        soon = date.today() + timedelta(days=300)
+        # Existing lot with no mfg date and no initial quantity
+        BatchLot.objects.create(product=self.p2, batch_no="OLD", expiry_date=soon, purchase_price=Decimal("9.00"))
+        self.po = PurchaseOrder.objects.create(vendor=self.vendor, location=self.loc, po_number="PO-1", status="OPEN")
+        pols = [
+            PurchaseOrderLine.objects.create(po=self.po, product=p, qty_packs_ordered=50, expected_unit_cost=Decimal("10"))
+            for p in (self.p1, self.p2, self.p3)
+        ]
+        self.grn = GoodsReceipt.objects.create(po=self.po, location=self.loc, status=GoodsReceipt.Status.DRAFT)
+
+        def line(pol, batch_no, qty, cost, **extra):
+            defaults = dict(expiry_date=soon, qty_base_received=Decimal("0"), mrp=Decimal("55.00"))
+            defaults.update(extra)
+            GoodsReceiptLine.objects.create(
+                grn=self.grn, po_line=pol, product=pol.product, batch_no=batch_no, qty_packs_received=qty,
+                unit_cost=Decimal(cost), **defaults,
+            )
+
+        line(pols[0], "A1", 4, "12.50", mfg_date=date.today() - timedelta(days=30))
+        # Same new lot twice in one GRN: second line must not reset its initial quantity
+        line(pols[0], "A1", 2, "13.00", rack_no="R-1", mrp=Decimal("57.50"))
+        line(pols[1], "OLD", 5, "11.00", mfg_date=date.today() - timedelta(days=90), qty_base_damaged=Decimal("3"))
+        line(pols[2], "C1", 3, "8.00", qty_base_received=Decimal("25"))
+        line(pols[2], "C2", 1, "8.00", expiry_date=date.today() - timedelta(days=1))
+
+    def tearDown(self):
+        mastercache.rack_rules.invalidate()
+
+    def _post(self, func) -> dict:
+        sid = transaction.savepoint()
+        func(self.grn.id, None)
+        result = snapshot(self.grn.id)
+        transaction.savepoint_rollback(sid)
+        mastercache.rack_rules.invalidate()
+        return result
+
+    def test_bulk_posting_writes_the_same_rows_as_the_per_line_version(self):
+        expected = self._post(reference_post_goods_receipt)
+        actual = self._post(post_goods_receipt)
+        for key in expected:
+            assert actual[key] == expected[key], key
+        assert expected["movements"] and expected["cost_layers"] and expected["audit"]
+
+    def test_bulk_posting_needs_far_fewer_queries(self):
+        counts = []
+        for func in (reference_post_goods_receipt, post_goods_receipt):
+            queries = []
+            with connection.execute_wrapper(lambda execute, sql, *a: queries.append(sql) or execute(sql, *a)):
+                self._post(func)
+            counts.append(len(queries))
+        assert counts[1] * 2 < counts[0], counts
+
+    def test_batch_created_by_a_concurrent_grn_is_received_into(self):
+        # The other GRN's lot, as it exists once it commits
+        rival = dict(product=self.p3, batch_no="C1", expiry_date=date.today() + timedelta(days=200),
+                     initial_quantity=Decimal("7"), initial_quantity_base=Decimal("70"), purchase_price=Decimal("7.00"))
+
+        def reference(grn_id, actor):
+            BatchLot.objects.create(**rival)
+            reference_post_goods_receipt(grn_id, actor)
+
+        expected = self._post(reference)
+
+        real_lock = services._lock_batches
+        locks = []
+
+        def racing_lock(keys):
+            locks.append(len(keys))
+            found = real_lock(keys)
+            if len(locks) == 1:
+                # It commits after our lock query ran but before our insert
+                BatchLot.objects.create(**rival)
+            return found
+
+        with mock.patch.object(services, "_lock_batches", side_effect=racing_lock), \
+                mock.patch.object(BatchLot.objects, "bulk_create", wraps=BatchLot.objects.bulk_create) as bulk_create:
+            actual = self._post(post_goods_receipt)
+        # A1, C1, C2 are new; C1 turns out to exist, so A1 and C2 are inserted again
+        assert locks == [4, 3]
+        assert [len(call.args[0]) for call in bulk_create.call_args_list] == [3, 2]
+        for key in expected:
+            assert actual[key] == expected[key], key
+
+    def test_lock_covers_only_the_received_pairs(self):
+        BatchLot.objects.create(product=self.p1, batch_no="OLD", expiry_date=date.today() + timedelta(days=100))
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *a: queries.append(sql) or execute(sql, *a)):
+            self._post(post_goods_receipt)
+        lock = next(sql for sql in queries if 'FROM "catalog_batchlot"' in sql and '"batch_no" IN' not in sql and "OR" in sql)
+        assert lock.count('"batch_no" =') == 4
@@ -182,3 +182,128 @@ class GRNPartialTests(TestCase):
         self.assertEqual(batch.purchase_price_per_base, Decimal("6.000000"))
         self.assertEqual(batch.initial_quantity, Decimal("10.000"))
         self.assertEqual(batch.initial_quantity_base, Decimal("10.000"))
+
+    def test_posting_records_purchase_facts(self):
+        from apps.procurement.models import PurchaseFact
+        from apps.procurement.services import rebuild_purchase_facts
+
+        po = PurchaseOrder.objects.create(
+            vendor=self.vendor,
+            location=self.location,
+            po_number="PO-4",
+            status=PurchaseOrder.Status.OPEN,
+        )
+        pol = PurchaseOrderLine.objects.create(
+            po=po,
+            product=self.product,
+            requested_name="Paracetamol",
+            qty_packs_ordered=30,
+            expected_unit_cost=Decimal("5.00"),
+        )
+        for batch_no, qty in (("B4", 10), ("B5", 5)):
+            grn = GoodsReceipt.objects.create(po=po, location=self.location, status=GoodsReceipt.Status.DRAFT)
+            GoodsReceiptLine.objects.create(
+                grn=grn,
+                po_line=pol,
+                product=self.product,
+                batch_no=batch_no,
+                expiry_date=date.today() + timedelta(days=365),
+                qty_packs_received=qty,
+                qty_base_received=Decimal(qty),
+                unit_cost=Decimal("4.00"),
+                mrp=Decimal("50.00"),
+            )
+            post_goods_receipt(grn.id, actor=self.user)
+
+        fact = PurchaseFact.objects.get(vendor=self.vendor, product=self.product)
+        self.assertEqual(fact.value, Decimal("60.00"))
+        self.assertEqual(fact.qty_packs, Decimal("15.000"))
+        self.assertEqual(fact.line_count, 2)
+
+        self.assertEqual(rebuild_purchase_facts(), 1)
+        rebuilt = PurchaseFact.objects.get(vendor=self.vendor, product=self.product)
+        self.assertEqual((rebuilt.value, rebuilt.line_count), (fact.value, fact.line_count))
+
+    def test_posting_stamps_batch_source(self):
+        from apps.procurement.models import BatchSource
+
+        po = PurchaseOrder.objects.create(
+            vendor=self.vendor,
+            location=self.location,
+            po_number="PO-5",
+            status=PurchaseOrder.Status.OPEN,
+        )
+        pol = PurchaseOrderLine.objects.create(
+            po=po,
+            product=self.product,
+            requested_name="Paracetamol",
+            qty_packs_ordered=10,
+            expected_unit_cost=Decimal("5.00"),
+        )
+        grn = GoodsReceipt.objects.create(po=po, location=self.location, status=GoodsReceipt.Status.DRAFT)
+        GoodsReceiptLine.objects.create(
+            grn=grn,
+            po_line=pol,
+            product=self.product,
+            batch_no="B6",
+            expiry_date=date.today() + timedelta(days=20),
+            qty_packs_received=10,
+            qty_base_received=Decimal("10"),
+            unit_cost=Decimal("4.00"),
+            mrp=Decimal("50.00"),
+        )
+        post_goods_receipt(grn.id, actor=self.user)
+
+        source = BatchSource.objects.get(batch_lot__batch_no="B6", location=self.location)
+        self.assertEqual((source.vendor_id, source.grn_id, source.po_id), (self.vendor.id, grn.id, po.id))
+
+    def test_posting_keeps_receipt_counters_and_reconcile_restores_them(self):
+        from apps.procurement.services import reconcile_po_receipts
+
+        po = PurchaseOrder.objects.create(
+            vendor=self.vendor,
+            location=self.location,
+            po_number="PO-7",
+            status=PurchaseOrder.Status.OPEN,
+        )
+        pol1, pol2 = [
+            PurchaseOrderLine.objects.create(
+                po=po,
+                product=self.product,
+                requested_name="Paracetamol",
+                qty_packs_ordered=qty,
+                expected_unit_cost=Decimal("5.00"),
+            )
+            for qty in (10, 6)
+        ]
+        self.assertEqual((pol1.qty_packs_received, pol1.qty_packs_pending), (0, 10))
+        grn = GoodsReceipt.objects.create(po=po, location=self.location, status=GoodsReceipt.Status.DRAFT)
+        for pol, qty, batch_no in ((pol1, 10, "B7"), (pol2, 2, "B8")):
+            GoodsReceiptLine.objects.create(
+                grn=grn,
+                po_line=pol,
+                product=self.product,
+                batch_no=batch_no,
+                expiry_date=date.today() + timedelta(days=200),
+                qty_packs_received=qty,
+                qty_base_received=Decimal(qty),
+                unit_cost=Decimal("5.00"),
+                mrp=Decimal("50.00"),
+            )
+        post_goods_receipt(grn.id, actor=self.user)
+
+        pol1.refresh_from_db()
+        pol2.refresh_from_db()
+        po.refresh_from_db()
+        self.assertEqual((pol1.qty_packs_received, pol1.qty_packs_pending), (10, 0))
+        self.assertEqual((pol2.qty_packs_received, pol2.qty_packs_pending), (2, 4))
+        self.assertEqual((po.lines_received, po.status), (1, PurchaseOrder.Status.PARTIALLY_RECEIVED))
+
+        PurchaseOrderLine.objects.filter(po=po).update(qty_packs_received=0, qty_packs_pending=0)
+        PurchaseOrder.objects.filter(id=po.id).update(lines_received=0, status=PurchaseOrder.Status.OPEN)
+        self.assertEqual(reconcile_po_receipts(), {"lines": 2, "pos": 1})
+        po.refresh_from_db()
+        pol2.refresh_from_db()
+        self.assertEqual((po.lines_received, po.status), (1, PurchaseOrder.Status.PARTIALLY_RECEIVED))
+        self.assertEqual((pol2.qty_packs_received, pol2.qty_packs_pending), (2, 4))
+        self.assertEqual(reconcile_po_receipts(), {"lines": 0, "pos": 0})
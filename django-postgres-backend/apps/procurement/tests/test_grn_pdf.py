@@ -0,0 +1,66 @@
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.procurement import importers_pdf
+from apps.procurement.importers_pdf import parse_grn_pdf
+
+
+def text_pdf(pages: list[str]) -> bytes:
+    """A minimal PDF with one line of Helvetica text per page."""
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, line in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({line}) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {5 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 3 0 R >> >> >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+class ParseGrnPdfTests(SimpleTestCase):
+    def test_text_layer_skips_ocr_and_keeps_page_order(self):
+        data = text_pdf(["INVOICE PAGE ONE", "INVOICE PAGE TWO", "INVOICE PAGE THREE"])
+        result = parse_grn_pdf(io.BytesIO(data))
+        assert result["ok"] and result["meta"]["ocr_used"] is False
+        text = result["raw_text"]
+        assert text.index("ONE") < text.index("TWO") < text.index("THREE")
+
+    def test_ocr_pages_keeps_order_and_caps_pages_in_flight(self):
+        lock, active, peak = threading.Lock(), [0], [0]
+
+        def fake_ocr(data, number, dpi):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01 * (6 - number))  # later pages finish first
+            with lock:
+                active[0] -= 1
+            return f"{data[:4].decode()} page {number}"
+
+        # Threads stand in for the process pool so the patched ocr_page is used
+        with ThreadPoolExecutor(max_workers=4) as pool, \
+                mock.patch.object(importers_pdf, "_ocr_pool", return_value=pool), \
+                mock.patch.object(importers_pdf, "ocr_page", side_effect=fake_ocr):
+            texts = importers_pdf.ocr_pages(b"%PDF-scan", [1, 2, 3, 4, 5], workers=2)
+        assert texts == [f"%PDF page {n}" for n in (1, 2, 3, 4, 5)]
+        assert peak[0] == 2
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+# Loaded only when an import/export actually runs (see utils_pdf, importers_pdf, reports.services)
+HEAVY_MODULES = ("pdfplumber", "pdfminer", "pytesseract", "PIL", "openpyxl")
+# Generous ceiling for django.setup() plus URLconf loading; override on slow CI machines
+BUDGET_MS = int(os.environ.get("IMPORT_TIME_BUDGET_MS", "4000"))
+
+SCRIPT = "import django; django.setup(); from django.urls import get_resolver; get_resolver().url_patterns"
+
+
+class ImportBudgetTests(SimpleTestCase):
+    def test_setup_and_urlconf_stay_light(self):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", SCRIPT],
+            cwd=Path(settings.BASE_DIR),
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        assert proc.returncode == 0, proc.stderr[-2000:]
+
+        imported = set()
+        total_us = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line.split("|")
+            imported.add(name.strip().split(".")[0])
+            if len(name) - len(name.lstrip()) == 1:  # top-level imports only, children are included
+                total_us += int(cumulative)
+
+        assert not imported.intersection(HEAVY_MODULES), sorted(imported.intersection(HEAVY_MODULES))
+        assert total_us / 1000 < BUDGET_MS, f"django.setup() + URLconf took {total_us / 1000:.0f} ms of imports"
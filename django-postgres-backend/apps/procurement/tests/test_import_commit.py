@@ -1,4 +1,5 @@
 from decimal import Decimal
+
 from django.test import TestCase
 from rest_framework.test import APIClient
 
@@ -6,6 +7,7 @@ from apps.procurement.models import Vendor, PurchaseOrder, GoodsReceipt, Purchas
 from apps.catalog.models import ProductCategory, Product, VendorProductCode, MedicineForm
 from apps.locations.models import Location
 from apps.procurement.services import post_goods_receipt
+from apps.procurement.tests.helpers import BuyerClientMixin
 from datetime import date
 
 
@@ -171,3 +173,74 @@ class ImportCommitTests(TestCase):
         assert existing.pack_size == "1x20"
         assert str(existing.mrp) == "15.00"
 
+
+class ImportCommitValidationTests(BuyerClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.vendor = Vendor.objects.create(name="Cipla")
+        self.other_vendor = Vendor.objects.create(name="Sun")
+        self.loc = Location.objects.create(code="LOC", name="Loc")
+        self.p1 = Product.objects.create(
+            code="TAB1", name="Tablet 1", mrp=Decimal("100.00"), units_per_pack=Decimal("10.000"), gst_percent=Decimal("12.00"),
+        )
+        VendorProductCode.objects.create(vendor=self.vendor, product=self.p1, vendor_code="V-TAB1")
+
+    def test_po_commit_creates_one_numbered_po_per_vendor(self):
+        r = self.client.post("/api/v1/procurement/purchase-orders/import-commit", {
+            "vendor_id": self.vendor.id, "location_id": self.loc.id,
+            "lines": [
+                {"product_id": self.p1.id, "qty": 2, "unit_cost": "45.00"},
+                {"product_name": "Loose item", "qty": 1},
+                {"vendor_id": self.other_vendor.id, "product_name": "Other item", "qty": 3},
+            ],
+        }, format="json")
+        assert r.status_code == 201, r.data
+        pos = list(PurchaseOrder.objects.order_by("id"))
+        assert [po.lines.count() for po in pos] == [2, 1]
+        assert len({po.po_number for po in pos}) == 2 and all(po.po_number for po in pos)
+        assert r.data["extra_po_ids"] == [pos[1].id]
+        assert pos[0].gross_total == Decimal("90.00")
+
+    def test_po_commit_reports_every_bad_line_and_writes_nothing(self):
+        r = self.client.post("/api/v1/procurement/purchase-orders/import-commit", {
+            "vendor_id": self.vendor.id, "location_id": self.loc.id,
+            "lines": [
+                {"product_id": self.p1.id, "qty": 1},
+                {"qty": 1},
+                {"product_id": 999999, "qty": 1},
+                {"product_id": self.p1.id, "qty": "many"},
+            ],
+        }, format="json")
+        assert r.status_code == 400
+        assert [e["line"] for e in r.data["errors"]] == [1, 2, 3]
+        assert not PurchaseOrder.objects.exists()
+
+    def test_grn_commit_reports_every_bad_line_and_writes_nothing(self):
+        po = PurchaseOrder.objects.create(vendor=self.vendor, location=self.loc, po_number="PO-1", status=PurchaseOrder.Status.OPEN)
+        PurchaseOrderLine.objects.create(po=po, product=self.p1, qty_packs_ordered=5, expected_unit_cost=Decimal("10"))
+        url = "/api/v1/procurement/grns/import-commit"
+        body = {"vendor_id": self.vendor.id, "location_id": self.loc.id, "po_id": po.id}
+        r = self.client.post(url, {**body, "lines": [
+            {"vendor_code": "V-TAB1", "qty": 1, "batch_no": "B1"},
+            {"vendor_code": "NOPE", "qty": 1},
+            {"product_id": self.p1.id, "qty": 1, "expiry_date": "2030-02-30"},
+            {"product_id": self.p1.id, "qty": "x"},
+        ]}, format="json")
+        assert r.status_code == 400
+        assert [e["line"] for e in r.data["errors"]] == [1, 2, 3]
+        assert not GoodsReceipt.objects.exists()
+
+        line = [{"vendor_code": "V-TAB1", "qty": 1, "batch_no": "B1"}]
+        for bad in ("abc", "1.5", "-0.1"):
+            r = self.client.post(url, {**body, "lines": line, "fuzzy_threshold": bad}, format="json")
+            assert r.status_code == 400 and "fuzzy_threshold" in r.data["detail"], (bad, r.data)
+
+        r = self.client.post(url, {**body, "lines": [
+            {"vendor_code": "V-TAB1", "qty": 1, "batch_no": "B1", "expiry_date": "2030-01-31"},
+            {"product_id": self.p1.id, "qty": 2, "batch_no": "B2", "unit_cost": "9.50"},
+        ]}, format="json")
+        assert r.status_code == 201, r.data
+        lines = list(GoodsReceiptLine.objects.filter(grn_id=r.data["id"]).order_by("id"))
+        assert [(ln.batch_no, ln.qty_packs_received, ln.unit_cost) for ln in lines] == [
+            ("B1", 1, Decimal("0.00")), ("B2", 2, Decimal("9.50")),
+        ]
@@ -0,0 +1,142 @@
+import io
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Product, ProductCategory
+from apps.locations.models import Location
+from apps.procurement.import_jobs import (
+    NO_ITEMS, ImportFailed, _progress_writer, create_po_from_items, run_import_job, spool_upload,
+)
+from apps.procurement.models import ImportJob, PurchaseOrder, Vendor
+from apps.procurement.tests.helpers import BuyerClientMixin
+from apps.procurement.utils import iter_items_from_csv, iter_items_from_excel
+from apps.settingsx.services import next_doc_number
+
+CSV = b"CODE,ITEM NAME,QTY,RATE\nTAB1,Tablet 1,3,10.50\n,Loose item,2,4\n"
+
+
+class ImportJobFixtures:
+    def setUp(self):
+        spool = tempfile.TemporaryDirectory()
+        self.addCleanup(spool.cleanup)
+        self.settings_override = override_settings(IMPORT_SPOOL_DIR=spool.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.vendor = Vendor.objects.create(name="Cipla")
+        self.loc = Location.objects.create(code="LOC", name="Loc")
+        cat = ProductCategory.objects.create(name="Cat")
+        self.product = Product.objects.create(
+            code="tab1", name="Tablet 1", category=cat, mrp=Decimal("100.00"),
+            units_per_pack=Decimal("10.000"), gst_percent=Decimal("12.00"),
+        )
+
+    def _job(self, payload):
+        path = spool_upload(SimpleUploadedFile("po.csv", payload), "csv")
+        return ImportJob.objects.create(
+            vendor=self.vendor, location=self.loc, file_name="po.csv", file_type="csv", file_size=len(payload), upload_path=path,
+        )
+
+
+class ImportJobTests(BuyerClientMixin, ImportJobFixtures, TestCase):
+    def test_csv_job_creates_po_and_records_progress(self):
+        job = self._job(CSV)
+        spooled = job.upload_path
+        assert os.path.exists(spooled)
+        job = run_import_job(job.id)
+        assert job.status == ImportJob.Status.DONE, job.error
+        assert (job.items_found, job.lines_matched, job.lines_created) == (2, 1, 2)
+        lines = list(job.po.lines.order_by("id"))
+        assert lines[0].product == self.product and lines[0].qty_packs_ordered == 3
+        assert lines[1].product is None and lines[1].requested_name == "Loose item"
+        assert job.upload_path == "" and not os.path.exists(spooled) and job.finished_at is not None
+        # A finished job is not claimed again
+        assert run_import_job(job.id) is None
+
+    def test_authenticated_upload_over_the_api(self):
+        def upload(**extra):
+            data = {"file": SimpleUploadedFile("po.csv", CSV, content_type="text/csv"), "vendor_id": self.vendor.id, "location_id": self.loc.id}
+            return self.client.post("/api/v1/procurement/import-purchase-file/", {**data, **extra}, format="multipart")
+
+        r = upload(wait="true")
+        assert r.status_code == 201, r.data
+        job = ImportJob.objects.get(pk=r.data["job_id"])
+        assert job.created_by == self.buyer and job.po_id == r.data["purchase_order_id"]
+
+        with override_settings(IMPORT_JOBS_INLINE=True), self.captureOnCommitCallbacks(execute=True):
+            r = upload()
+        assert r.status_code == 202, r.data
+        polled = self.client.get(r.data["status_url"])
+        assert polled.status_code == 200 and polled.data["status"] == ImportJob.Status.DONE
+
+        # Other users cannot read the job; staff can
+        other = APIClient()
+        other.force_authenticate(get_user_model().objects.create_user(username="other", password="x"))
+        assert other.get(r.data["status_url"]).status_code == 404
+        other.force_authenticate(get_user_model().objects.create_user(username="admin", password="x", is_staff=True))
+        assert other.get(r.data["status_url"]).status_code == 200
+
+        # A job that cannot be recorded leaves no spooled file behind
+        with mock.patch.object(ImportJob.objects, "create", side_effect=DatabaseError("down")), self.assertRaises(DatabaseError):
+            upload()
+        assert os.listdir(settings.IMPORT_SPOOL_DIR) == []
+
+    def test_progress_is_reported_per_batch(self):
+        items = [{"product_code": "TAB1", "qty": "1"}, {"name": "Gauze", "qty": "1"}, {"product_code": "tab1", "qty": "2"}]
+        progress = mock.Mock()
+        create_po_from_items(vendor=self.vendor, location=self.loc, items=items, batch_size=2, progress=progress)
+        assert progress.call_args_list == [mock.call(2, 1), mock.call(3, 2)]
+
+    def test_failed_import_does_not_use_up_a_po_number(self):
+        def items():
+            yield {"product_code": "TAB1", "name": "Tablet 1", "qty": "1", "rate": "1"}
+            raise ImportFailed("bad page")
+
+        with self.assertRaises(ImportFailed):
+            create_po_from_items(vendor=self.vendor, location=self.loc, items=items(), batch_size=1)
+        assert not PurchaseOrder.objects.exists()
+        assert next_doc_number("PO") == "PO-00001"
+
+    def test_empty_file_fails_with_message(self):
+        job = run_import_job(self._job(b"CODE,ITEM NAME,QTY,RATE\n").id)
+        assert job.status == ImportJob.Status.FAILED and job.error == NO_ITEMS
+        assert job.po is None
+
+
+class ImportJobProgressTests(ImportJobFixtures, TransactionTestCase):
+    def test_progress_commits_outside_the_import_transaction(self):
+        job = self._job(CSV)
+        write, close = _progress_writer(job.id)
+        with self.assertRaises(ImportFailed), transaction.atomic():
+            write(items_found=2, lines_matched=1)
+            raise ImportFailed("rolled back")
+        close()
+        assert ImportJob.objects.values_list("items_found", "lines_matched").get(pk=job.id) == (2, 1)
+
+
+class PurchaseParserTests(SimpleTestCase):
+    def test_csv_and_xlsx_share_the_compiled_column_mapping(self):
+        import openpyxl
+
+        csv_items = iter_items_from_csv(io.BytesIO(b"\xef\xbb\xbfItem Code,Product Name,Qty Packs,Sale Rate\nA1,Caf\xe9 syrup,2,9.5\n,,,\n"))
+        assert not isinstance(csv_items, list)
+        assert list(csv_items) == [{"product_code": "A1", "name": "Caf\xe9 syrup", "qty": "2", "rate": "9.5", "net_value": "0"}]
+
+        wb = openpyxl.Workbook()
+        wb.active.append(["product_code", "name", "qty", "rate", "net_value"])
+        wb.active.append(["TAB1", "Tablet 1", 3, 10.5, 31.5])
+        wb.active.append([None, None, None, None, None])
+        buf = io.BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+        assert list(iter_items_from_excel(buf)) == [
+            {"product_code": "TAB1", "name": "Tablet 1", "qty": "3", "rate": "10.5", "net_value": "31.5"}
+        ]
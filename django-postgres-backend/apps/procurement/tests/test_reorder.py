@@ -0,0 +1,74 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.catalog.models import BatchLot, Product
+from apps.inventory.models import InventoryMovement
+from apps.locations.models import Location
+from apps.procurement.models import PurchaseOrder, PurchaseOrderLine, Vendor
+from apps.procurement.services_reorder import suggest_reorders
+from apps.procurement.tests.helpers import BuyerClientMixin
+
+
+class ReorderSuggestionTests(BuyerClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.loc = Location.objects.create(code="LOC", name="Loc")
+        self.acme = Vendor.objects.create(name="Acme", lead_time_days=5)
+
+    def _product(self, code, reorder_level, vendor=None, stock=(), sold_days_ago=()):
+        product = Product.objects.create(
+            code=code, name=f"Item {code}", mrp=Decimal("10.00"), base_unit="TAB", pack_unit="STRIP",
+            units_per_pack=Decimal("10"), reorder_level=Decimal(reorder_level), preferred_vendor=vendor,
+        )
+        batch = BatchLot.objects.create(product=product, batch_no=f"B-{code}", expiry_date=timezone.now().date() + timedelta(days=400))
+        for qty in stock:
+            InventoryMovement.objects.create(location=self.loc, batch_lot=batch, qty_change_base=qty, reason="PURCHASE")
+        for qty, days_ago in sold_days_ago:
+            mv = InventoryMovement.objects.create(location=self.loc, batch_lot=batch, qty_change_base=-qty, reason="SALE")
+            InventoryMovement.objects.filter(id=mv.id).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return product
+
+    def test_suggestions_cover_lead_time_and_feed_po_commit(self):
+        # 10 on hand, 2/day sold over the last 30 days (the older sale is outside the window)
+        busy = self._product("P1", "20", self.acme, stock=[100], sold_days_ago=[(60, 3), (30, 40)])
+        covered = self._product("P2", "10", self.acme)
+        self._product("P3", "5")
+        po = PurchaseOrder.objects.create(vendor=self.acme, location=self.loc, po_number="PO-1", status="OPEN")
+        PurchaseOrderLine.objects.create(po=po, product=covered, qty_packs_ordered=2, expected_unit_cost=Decimal("1"))
+
+        r = self.client.get("/api/v1/procurement/reorder-suggestions/", {"location_id": self.loc.id})
+        assert r.status_code == 200, r.data
+        assert r.data["window_days"] == 30 and r.data["cover_days"] == 14
+        groups = r.data["vendors"]
+        assert [g["vendor_id"] for g in groups] == [self.acme.id, None]
+        line = groups[0]["lines"][0]
+        # reorder point 20 + 2 * 5 = 30; order up to 30 + 2 * 14 = 58 -> 48 units = 5 packs
+        assert (line["product_id"], line["qty"], line["reorder_point"], line["target_base"]) == (busy.id, 5, Decimal("30.000"), Decimal("58.000"))
+        assert len(groups[0]["lines"]) == 1  # P2 is covered by its open PO
+        assert groups[1]["lines"][0]["qty"] == 1
+
+        r = self.client.post("/api/v1/procurement/purchase-orders/import-commit", groups[0], format="json")
+        assert r.status_code == 201, r.data
+        again = suggest_reorders(self.loc.id)
+        assert [g["vendor_id"] for g in again["vendors"]] == [None]
+
+    def test_query_count_does_not_grow_with_products(self):
+        self._product("P1", "20", self.acme, stock=[5])
+        suggest_reorders(self.loc.id)  # loads the settings snapshot
+        with CaptureQueriesContext(connection) as few:
+            suggest_reorders(self.loc.id)
+        for n in range(2, 12):
+            self._product(f"P{n}", "20", Vendor.objects.create(name=f"V{n}"), stock=[5], sold_days_ago=[(3, 1)])
+        with CaptureQueriesContext(connection) as many:
+            result = suggest_reorders(self.loc.id)
+        assert sum(len(g["lines"]) for g in result["vendors"]) == 11
+        assert len(many.captured_queries) == len(few.captured_queries)
+
+    def test_location_is_required(self):
+        assert self.client.get("/api/v1/procurement/reorder-suggestions/").status_code == 400
+        assert self.client.get("/api/v1/procurement/reorder-suggestions/", {"location_id": "x"}).status_code == 400
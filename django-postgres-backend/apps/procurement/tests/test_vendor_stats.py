@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.catalog.models import Product
+from apps.locations.models import Location
+from apps.procurement.models import GoodsReceipt, GoodsReceiptLine, PurchaseOrder, Vendor, VendorItem, VendorStats
+from apps.procurement.serializers import PurchaseOrderSerializer
+from apps.procurement.services import post_goods_receipt
+from apps.procurement.services_vendor_stats import rebuild_vendor_stats
+from apps.procurement.tests.helpers import BuyerClientMixin
+
+
+class VendorStatsTests(BuyerClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.vendor = Vendor.objects.create(name="Cipla")
+        self.loc = Location.objects.create(code="LOC", name="Loc")
+        self.p1 = Product.objects.create(code="P1", name="Paracetamol", mrp=Decimal("50.00"), units_per_pack=Decimal("10"))
+        self.p2 = Product.objects.create(code="P2", name="Cetirizine", mrp=Decimal("30.00"), units_per_pack=Decimal("10"))
+
+    def _po(self, order_date, lines, number):
+        ser = PurchaseOrderSerializer(data={
+            "vendor": self.vendor.id, "location": self.loc.id, "order_date": order_date.isoformat(), "lines": lines,
+        })
+        ser.is_valid(raise_exception=True)
+        return ser.save(po_number=number)
+
+    def _rollup(self):
+        stats = VendorStats.objects.get(vendor=self.vendor)
+        items = VendorItem.objects.filter(vendor=self.vendor).order_by("name").values_list(
+            "name", "ordered_lines", "last_po_price", "last_po_date", "received_lines", "last_grn_price", "last_grn_at",
+        )
+        return (stats.order_count, stats.order_value, stats.item_count), list(items)
+
+    def test_rollup_follows_pos_and_grns_and_matches_a_rebuild(self):
+        today = date.today()
+        old = self._po(today - timedelta(days=10), [
+            {"product": self.p1.id, "qty_packs_ordered": 5, "expected_unit_cost": "4.00"},
+            {"requested_name": "Loose gauze", "qty_packs_ordered": 2, "expected_unit_cost": "1.00"},
+        ], "PO-1")
+        new = self._po(today, [{"product": self.p1.id, "qty_packs_ordered": 3, "expected_unit_cost": "4.50"}], "PO-2")
+
+        r = self.client.get(f"/api/v1/procurement/vendors/{self.vendor.id}/products/")
+        assert r.status_code == 200, r.data
+        assert [(row["item_name"], row["last_price"]) for row in r.data] == [("Paracetamol", 4.5), ("Loose gauze", 1.0)]
+
+        grn = GoodsReceipt.objects.create(po=old, location=self.loc)
+        GoodsReceiptLine.objects.create(
+            grn=grn, po_line=old.lines.get(product=self.p1), product=self.p1, batch_no="B1",
+            expiry_date=today + timedelta(days=300), qty_packs_received=5, qty_base_received=Decimal("50"),
+            unit_cost=Decimal("3.90"), mrp=Decimal("50.00"),
+        )
+        post_goods_receipt(grn.id, actor=None)
+
+        # Replacing a PO's lines moves its items over
+        ser = PurchaseOrderSerializer(new, data={"lines": [{"product": self.p2.id, "qty_packs_ordered": 1, "expected_unit_cost": "2.00"}]}, partial=True)
+        ser.is_valid(raise_exception=True)
+        ser.save()
+
+        incremental = self._rollup()
+        assert incremental[0] == (2, old.net_total + PurchaseOrder.objects.get(id=new.id).net_total, 3)
+        rebuild_vendor_stats()
+        assert self._rollup() == incremental
+
+        r = self.client.get(f"/api/v1/procurement/vendors/{self.vendor.id}/summary/")
+        assert (r.data["total_orders"], r.data["products"]) == (2, 3)
+        r = self.client.get(f"/api/v1/procurement/vendors/{self.vendor.id}/products/")
+        assert [(row["item_name"], row["last_price"]) for row in r.data] == [("Paracetamol", 3.9)]
+        r = self.client.get(f"/api/v1/procurement/vendors/{self.vendor.id}/purchase-orders/?page=1")
+        assert r.data["count"] == 2
+        assert [(row["po_number"], row["items"]) for row in r.data["results"]] == [("PO-2", 1), ("PO-1", 7)]
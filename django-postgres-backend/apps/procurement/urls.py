@@ -4,7 +4,8 @@ from .views import (
     HealthView, VendorViewSet, PurchaseViewSet, PurchasePaymentViewSet,
     PurchaseDocumentViewSet, VendorReturnViewSet,
     PurchaseOrderViewSet, GoodsReceiptViewSet,
-    GrnImportPdfView, PoImportCommitView, GrnImportCommitView, PurchasesMonthlyStatsView,PurchaseImportView,
+    GrnImportPdfView, PoImportCommitView, GrnImportCommitView, PurchasesMonthlyStatsView,PurchaseImportView, ImportJobView,
+    ReorderSuggestionsView,
 )
 
 router = DefaultRouter()
@@ -24,5 +25,7 @@ urlpatterns = [
     path('grns/import-commit', GrnImportCommitView.as_view(), name='grn-import-commit'),
     path('stats/purchases-monthly/', PurchasesMonthlyStatsView.as_view(), name='purchases-monthly-stats'),
     path("import-purchase-file/", PurchaseImportView.as_view(), name="import-purchase-file"),  
+    path("import-jobs/<int:pk>/", ImportJobView.as_view(), name="import-job-detail"),
+    path("reorder-suggestions/", ReorderSuggestionsView.as_view(), name="reorder-suggestions"),
 ]
 
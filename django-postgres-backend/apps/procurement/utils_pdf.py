@@ -1,17 +1,9 @@
 import re
-import os
 from decimal import Decimal, InvalidOperation
 from dateutil import parser as dateparser
-import pdfplumber
-import pytesseract
-from PIL import Image
 
-# Only set tesseract path on Windows (Azure/Linux has it in PATH)
-if os.name == 'nt':  # Windows
-    tesseract_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-    if os.path.exists(tesseract_path):
-        pytesseract.pytesseract.tesseract_cmd = tesseract_path
-# On Linux/Azure, tesseract should be installed and available in PATH
+# pdfplumber is imported inside the parsers: this module is loaded with the URLconf, and the
+# PDF stack should only be paid for by workers that actually import a PDF.
 
 
 # ---------------------------------------------------------
@@ -46,6 +38,8 @@ def _parse_date(s):
 
 
 def extract_tables_from_pdf(path: str):
+    import pdfplumber
+
     tables = []
     with pdfplumber.open(path) as pdf:
         for page in pdf.pages:
@@ -119,7 +113,7 @@ def _parse_decimal(v):
         return Decimal("0")
 
 
-def extract_purchase_items_from_pdf(file_content_or_path):
+def extract_purchase_items_from_pdf(file_content_or_path, progress=None):
     """
     FINAL WORKING VERSION FOR YOUR PDF FORMAT.
     Your PDF has lines like:
@@ -130,8 +124,11 @@ def extract_purchase_items_from_pdf(file_content_or_path):
     
     Accepts either a file path (str) or file-like object (BytesIO) for in-memory processing.
     pdfplumber.open() can handle both file paths and file-like objects.
+    ``progress(pages_parsed, pages_total)`` is called after each page when given.
     """
 
+    import pdfplumber
+
     items = []
 
     # 1. Extract RAW text from PDF
@@ -139,9 +136,12 @@ def extract_purchase_items_from_pdf(file_content_or_path):
     try:
         # pdfplumber.open() can accept both file paths and file-like objects (BytesIO, etc.)
         with pdfplumber.open(file_content_or_path) as pdf:
-            for page in pdf.pages:
+            total = len(pdf.pages)
+            for number, page in enumerate(pdf.pages, start=1):
                 txt = page.extract_text() or ""
                 full_text += "\n" + txt
+                if progress:
+                    progress(number, total)
     except Exception as e:
         # Check if it's a poppler dependency issue
         err_msg = str(e).lower()
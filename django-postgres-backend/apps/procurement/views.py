@@ -1,39 +1,47 @@
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework import viewsets, status, permissions
+from rest_framework import generics, viewsets, status, permissions
 from drf_spectacular.utils import extend_schema, OpenApiTypes, OpenApiExample, OpenApiParameter
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
-from django.utils import timezone
+from collections import defaultdict
 from decimal import Decimal, InvalidOperation
 
 
 
 from .models import (
     Vendor, Purchase, PurchasePayment, PurchaseDocument, VendorReturn,
-    PurchaseOrder, PurchaseOrderLine, GoodsReceipt, GoodsReceiptLine,
+    PurchaseOrder, PurchaseOrderLine, GoodsReceipt, GoodsReceiptLine, PurchaseFact, ImportJob,
+    VendorItem, VendorStats,
 )
 from apps.accounts.models import User as AccountsUser
 from .serializers import (
     VendorSerializer, PurchaseSerializer, PurchasePaymentSerializer,
     PurchaseDocumentSerializer, VendorReturnSerializer,
-    PurchaseOrderSerializer, GoodsReceiptSerializer,
+    PurchaseOrderSerializer, GoodsReceiptSerializer, ImportJobSerializer,
 )
 from .services import post_purchase, post_vendor_return, post_goods_receipt
+from .services_reorder import suggest_reorders
+from .services_vendor_stats import apply_po, snapshot_po
+from .import_jobs import (
+    NO_ITEMS, SUPPORTED_TYPES, _discard_upload, max_upload_bytes, run_import_job, spool_upload,
+    submit as submit_import_job,
+)
 from apps.settingsx.services import next_doc_number
 from apps.catalog.models import BatchLot
 from apps.inventory.services import write_movement
 from .importers_pdf import parse_grn_pdf
-from apps.catalog.services_vendor_map import product_by_vendor_code
-from apps.governance.services import audit
+from apps.catalog.services_matching import MatchDiagnostics, ProductMatcher
+from apps.governance.services import audit, audit_many
 from django.db.models.functions import TruncMonth
-from django.db.models import Sum
+from django.db.models import Count, F, Sum
 import os
 import io
 from .models import Purchase, PurchaseLine
 from apps.catalog.models import Product
-from apps.procurement.utils_pdf import extract_purchase_items_from_pdf
 from django.conf import settings
 from django.shortcuts import get_object_or_404
 import logging
@@ -54,6 +62,13 @@ class VendorViewSet(viewsets.ModelViewSet):
     # -----------------------------
     # Vendor Summary (totals)
     # -----------------------------
+    def _paginated(self, request, rows, build):
+        """Serve ``rows`` (a queryset) paginated when ``?page=`` is given, else as the plain list it always was."""
+        if "page" in request.query_params:
+            page = self.paginate_queryset(rows)
+            return self.get_paginated_response([build(row) for row in page])
+        return Response([build(row) for row in rows])
+
     @extend_schema(
         tags=["Procurement"],
         summary="Vendor summary: totals and counts",
@@ -64,25 +79,21 @@ class VendorViewSet(viewsets.ModelViewSet):
         from django.db.models import Sum
 
         v = self.get_object()
-        pos = PurchaseOrder.objects.filter(vendor_id=v.id)
-
-        total_orders = pos.count()
-        total_amount = pos.aggregate(s=Sum("net_total")).get("s") or 0
-
-        # DISTINCT requested item names instead of product_id
-        prod_count = (
-            PurchaseOrderLine.objects
-            .filter(po__vendor_id=v.id)
-            .values("requested_name")
-            .distinct()
-            .count()
+        # Order totals and distinct item names come from the vendor rollup (services_vendor_stats)
+        stats = VendorStats.objects.filter(vendor_id=v.id).first() or VendorStats(vendor=v)
+
+        # Received (posted GRN) totals from the purchase facts
+        received = PurchaseFact.objects.filter(vendor_id=v.id).aggregate(
+            value=Sum("value"), products=Count("product_id", distinct=True)
         )
 
         return Response({
             "vendor_id": v.id,
-            "total_orders": total_orders,
-            "total_amount": float(total_amount),
-            "products": prod_count,
+            "total_orders": stats.order_count,
+            "total_amount": float(stats.order_value or 0),
+            "products": stats.item_count,
+            "received_amount": float(received["value"] or 0),
+            "received_products": received["products"] or 0,
         })
 
     # -----------------------------
@@ -91,31 +102,33 @@ class VendorViewSet(viewsets.ModelViewSet):
     @extend_schema(
         tags=["Procurement"],
         summary="Vendor purchase orders list (compact)",
+        parameters=[OpenApiParameter("page", OpenApiTypes.INT, OpenApiParameter.QUERY, description="Paginate (PAGE_SIZE per page) instead of the latest 100")],
         responses={200: OpenApiTypes.OBJECT},
     )
     @action(detail=True, methods=["get"], url_path="purchase-orders")
     def vendor_pos(self, request, pk=None):
         v = self.get_object()
-        items = []
-
-        for po in (
+        pos = (
             PurchaseOrder.objects
             .filter(vendor_id=v.id)
-            .order_by("-order_date")[:100]
-        ):
-            item_cnt = sum((l.qty_packs_ordered or 0) for l in po.lines.all())
+            .annotate(item_cnt=Sum("lines__qty_packs_ordered"))
+            .order_by("-order_date", "-id")
+        )
+        if "page" not in request.query_params:
+            pos = pos[:100]
 
-            items.append({
+        def build(po):
+            return {
                 "po_id": po.id,
                 "po_number": po.po_number,
                 "order_date": po.order_date.strftime("%d-%m-%Y") if po.order_date else None,
                 "expected_date": po.expected_date.strftime("%d-%m-%Y") if po.expected_date else None,
-                "items": item_cnt,
+                "items": po.item_cnt or 0,
                 "amount": float(po.net_total or 0),
                 "status": po.status,
-            })
+            }
 
-        return Response(items)
+        return self._paginated(request, pos, build)
 
     # -----------------------------
     # Vendor Products (using requested_name since no product FK)
@@ -123,71 +136,35 @@ class VendorViewSet(viewsets.ModelViewSet):
     @extend_schema(
         tags=["Procurement"],
         summary="Vendor supplied item names with last price/date",
+        parameters=[OpenApiParameter("page", OpenApiTypes.INT, OpenApiParameter.QUERY, description="Paginate (PAGE_SIZE per page)")],
         responses={200: OpenApiTypes.OBJECT},
     )
     @action(detail=True, methods=["get"], url_path="products")
     def vendor_products(self, request, pk=None):
         v = self.get_object()
-        from .models import GoodsReceiptLine, GoodsReceipt
-
-        # GRN IDs (posted only)
-        grn_ids = GoodsReceipt.objects.filter(
-            po__vendor_id=v.id,
-            status=GoodsReceipt.Status.POSTED
-        ).values_list("id", flat=True)
-
-        qs = GoodsReceiptLine.objects.filter(grn_id__in=list(grn_ids))
-
-        last_map = {}
-
-        # --- Use GRN lines first ---
-        for gl in qs.order_by("-grn__received_at"):
-
-            # FIX: determine the item name safely
-            if gl.product:
-                key = gl.product.name
-            elif gl.po_line and gl.po_line.requested_name:
-                key = gl.po_line.requested_name
-            else:
-                key = "(Unnamed Item)"
-
-            if key not in last_map:
-                last_map[key] = {
-                    "item_name": key,
-                    "last_price": float(gl.unit_cost or 0),
-                    "last_order_date": gl.grn.received_at,
+        # Items received on posted GRNs, latest first; PO lines only when nothing was received yet
+        items = VendorItem.objects.filter(vendor_id=v.id)
+        received = items.filter(received_lines__gt=0)
+        if received.exists():
+            rows = received.order_by("-last_grn_at", "name")
+
+            def build(item):
+                return {
+                    "item_name": item.name,
+                    "last_price": float(item.last_grn_price or 0),
+                    "last_order_date": item.last_grn_at.strftime("%d-%m-%Y") if item.last_grn_at else None,
+                }
+        else:
+            rows = items.filter(ordered_lines__gt=0).order_by(F("last_po_date").desc(nulls_last=True), "name")
+
+            def build(item):
+                return {
+                    "item_name": item.name,
+                    "last_price": float(item.last_po_price or 0),
+                    "last_order_date": item.last_po_date.strftime("%d-%m-%Y") if item.last_po_date else None,
                 }
 
-        # --- Fallback to PO lines if no GRN exists ---
-        if not last_map:
-            for pl in (
-                PurchaseOrderLine.objects
-                .filter(po__vendor_id=v.id)
-                .order_by("-po__order_date")
-            ):
-                key = pl.requested_name or "(Unnamed Item)"
-
-                if key not in last_map:
-                    last_map[key] = {
-                        "item_name": key,
-                        "last_price": float(pl.expected_unit_cost or 0),
-                        "last_order_date": pl.po.order_date,
-                    }
-
-        # Convert datetime to string
-        result = []
-        for item in last_map.values():
-            result.append({
-                "item_name": item["item_name"],
-                "last_price": item["last_price"],
-                "last_order_date": (
-                    item["last_order_date"].strftime("%d-%m-%Y")
-                    if item["last_order_date"]
-                    else None
-                ),
-            })
-
-        return Response(result)
+        return self._paginated(request, rows, build)
 
     def destroy(self, request, *args, **kwargs):
         """
@@ -293,6 +270,11 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
                 actor = AccountsUser.objects.filter(email=email).first()
         serializer.save(po_number=po_number, created_by=actor)
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        apply_po(snapshot_po(instance), sign=-1)
+        instance.delete()
+
     @extend_schema(
         tags=["Procurement"],
         summary="Get full purchase order details including product info",
@@ -318,6 +300,8 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
                     "manufacturer": getattr(prod, "manufacturer", None),
                     "pack_size": getattr(prod, "pack_size", None),
                     "qty_packs_ordered": ln.qty_packs_ordered,
+                    "qty_packs_received": ln.qty_packs_received,
+                    "qty_packs_pending": ln.qty_packs_pending,
                     "expected_unit_cost": str(ln.expected_unit_cost),
                     "gst_percent_override": (
                         str(ln.gst_percent_override)
@@ -341,6 +325,7 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
             "gross_total": str(po.gross_total),
             "tax_total": str(po.tax_total),
             "net_total": str(po.net_total),
+            "lines_received": po.lines_received,
             "lines": lines_payload,
         }
         return Response(payload)
@@ -354,7 +339,9 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
         # POST create a line
         ser = PurchaseOrderLineSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
-        ser.save(po_id=pk)
+        with transaction.atomic():
+            line = ser.save(po_id=pk)
+            apply_po(snapshot_po(line.po, lines=[line]))
         return Response(ser.data, status=status.HTTP_201_CREATED)
 
 
@@ -404,95 +391,104 @@ class PoImportCommitView(APIView):
         if not location_id or not isinstance(lines, list) or not lines:
             return Response({"detail": "location_id and lines required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        from collections import defaultdict
-        vendor_lines = defaultdict(list)
-
-        # Group by vendor
-        for ln in lines:
+        # Every line is checked before anything is written; all problems are returned together
+        errors = []
+        vendor_lines = defaultdict(list)  # vendor id -> [(line index, line payload)]
+        for idx, ln in enumerate(lines):
             ln_vendor_id = ln.get("vendor_id") or ln.get("vendor") or global_vendor_id
             if not ln_vendor_id:
-                return Response(
-                    {"detail": "vendor_id is required either globally or per line."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+                errors.append({"line": idx, "detail": "vendor_id is required either globally or per line."})
+                continue
             try:
                 ln_vendor_id = int(ln_vendor_id)
             except (TypeError, ValueError):
-                return Response({"detail": f"Invalid vendor id: {ln_vendor_id!r}"}, status=status.HTTP_400_BAD_REQUEST)
+                errors.append({"line": idx, "detail": f"Invalid vendor id: {ln_vendor_id!r}"})
+                continue
 
-            vendor_lines[ln_vendor_id].append(ln)
+            # Product always optional for PO (NO creation)
+            product_id = ln.get("product_id") or ln.get("product")
 
-        po_results = []
-        actor = request.user if request.user.is_authenticated else None
+            # PO only stores names when no product found
+            requested_name = (
+                ln.get("requested_name")
+                or ln.get("product_name")
+                or ln.get("name")
+                or ""
+            ).strip()
 
-        for vendor_id, v_lines in vendor_lines.items():
+            # If no product_id → must have a requested_name
+            if not product_id and not requested_name:
+                errors.append({"line": idx, "detail": "requested_name is required when product_id is missing."})
+                continue
 
-            po_payload = {
+            # DO NOT USE vendor_code → because it may trigger product lookup
+            # Removed: product_by_vendor_code()
+            # Removed: medicine_form logic
+
+            vendor_lines[ln_vendor_id].append((idx, {
+                "product": product_id,  # May be None (allowed)
+                "requested_name": requested_name,
+                "qty_packs_ordered": (
+                    ln.get("qty")
+                    or ln.get("qty_packs")
+                    or ln.get("qty_packs_ordered")
+                    or 0
+                ),
+                "expected_unit_cost": (
+                    ln.get("unit_cost")
+                    or ln.get("price")
+                    or ln.get("expected_unit_cost")
+                    or "0.00"
+                ),
+                "gst_percent_override": ln.get("gst_percent") or ln.get("gst_percent_override"),
+            }))
+
+        # Products referenced by any line, loaded once for the serializers below
+        product_ids = set()
+        for v_lines in vendor_lines.values():
+            for _, line in v_lines:
+                try:
+                    product_ids.add(int(line["product"]))
+                except (TypeError, ValueError):
+                    pass
+        context = {"request": request, "products": Product.objects.in_bulk(product_ids) if product_ids else {}}
+
+        serializers_by_vendor = []
+        for vendor_id, v_lines in vendor_lines.items():
+            ser = PurchaseOrderSerializer(data={
                 "vendor": vendor_id,
                 "location": location_id,
                 "order_date": request.data.get("order_date"),
                 "expected_date": request.data.get("expected_date"),
                 "note": request.data.get("note", ""),
-                "lines": [],
-            }
-
-            for ln in v_lines:
-
-                # Product always optional for PO (NO creation)
-                product_id = ln.get("product_id") or ln.get("product")
-
-                # PO only stores names when no product found
-                requested_name = (
-                    ln.get("requested_name")
-                    or ln.get("product_name")
-                    or ln.get("name")
-                    or ""
-                ).strip()
-
-                # If no product_id → must have a requested_name
-                if not product_id and not requested_name:
-                    return Response(
-                        {"detail": "requested_name is required when product_id is missing."},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                # DO NOT USE vendor_code → because it may trigger product lookup
-                # Removed: product_by_vendor_code()
-                # Removed: medicine_form logic
-
-                line_payload = {
-                    "product": product_id,  # May be None (allowed)
-                    "requested_name": requested_name,
-                    "qty_packs_ordered": (
-                        ln.get("qty")
-                        or ln.get("qty_packs")
-                        or ln.get("qty_packs_ordered")
-                        or 0
-                    ),
-                    "expected_unit_cost": (
-                        ln.get("unit_cost")
-                        or ln.get("price")
-                        or ln.get("expected_unit_cost")
-                        or "0.00"
-                    ),
-                    "gst_percent_override": ln.get("gst_percent") or ln.get("gst_percent_override"),
-                }
-
-                po_payload["lines"].append(line_payload)
-
-            ser = PurchaseOrderSerializer(data=po_payload)
-            ser.is_valid(raise_exception=True)
-            po = ser.save()
-
-            audit(
-                actor,
-                table="procurement_purchaseorder",
-                row_id=po.id,
-                action="IMPORT_COMMIT",
-                before=None,
-                after={"lines": len(po_payload["lines"])},
+                "lines": [line for _, line in v_lines],
+            }, context=context)
+            if ser.is_valid():
+                serializers_by_vendor.append(ser)
+                continue
+            line_errors = ser.errors.get("lines") or []
+            for (idx, _), line_error in zip(v_lines, line_errors if isinstance(line_errors, list) else []):
+                if line_error:
+                    errors.append({"line": idx, "errors": line_error})
+            other = {k: v for k, v in ser.errors.items() if k != "lines" or not isinstance(v, list)}
+            if other:
+                errors.append({"vendor_id": vendor_id, "errors": other})
+        if errors:
+            errors.sort(key=lambda e: e.get("line", -1))
+            detail = errors[0].get("detail") if len(errors) == 1 else None
+            return Response(
+                {"detail": detail or f"{len(errors)} problem(s) found; nothing was imported.", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            po_results.append(ser.data)
+
+        actor = request.user if request.user.is_authenticated else None
+        pos = [ser.save(po_number=next_doc_number("PO")) for ser in serializers_by_vendor]
+        audit_many(
+            actor,
+            "procurement_purchaseorder",
+            [(po.id, "IMPORT_COMMIT", None, {"lines": len(v_lines)}) for po, v_lines in zip(pos, vendor_lines.values())],
+        )
+        po_results = [ser.data for ser in serializers_by_vendor]
 
         # Same response format
         if len(po_results) == 1:
@@ -525,33 +521,75 @@ class GrnImportCommitView(APIView):
 
         # Build GRN DRAFT with lines; map to po_line by product
         from .models import GoodsReceipt, GoodsReceiptLine, PurchaseOrderLine
-        grn = GoodsReceipt.objects.create(po_id=po_id, location_id=location_id, status=GoodsReceipt.Status.DRAFT)
-        for ln in lines:
+        # Products (ids, product codes, vendor codes, optionally names) and PO lines are resolved in a few queries
+        by_name = request.data.get("match_by_name") in ["1", "true", "True", True]
+        fuzzy_threshold = request.data.get("fuzzy_threshold")
+        if fuzzy_threshold in (None, ""):
+            fuzzy_threshold = None
+        else:
+            try:
+                fuzzy_threshold = float(fuzzy_threshold)
+            except (TypeError, ValueError):
+                return Response({"detail": "fuzzy_threshold must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+            if not 0 <= fuzzy_threshold <= 1:
+                return Response({"detail": "fuzzy_threshold must be between 0 and 1"}, status=status.HTTP_400_BAD_REQUEST)
+        matcher = ProductMatcher(int(vendor_id), fuzzy_threshold=fuzzy_threshold)
+        matches = matcher.match_many([
+            {
+                "product_id": ln.get("product_id"),
+                "code": ln.get("vendor_code") or ln.get("product_code") or "",
+                "name": (ln.get("name") or ln.get("product_name") or "") if by_name else "",
+            }
+            for ln in lines
+        ])
+        diagnostics = MatchDiagnostics().add(matches).as_dict()
+        po_lines = {}
+        for pol in PurchaseOrderLine.objects.filter(po_id=po_id).order_by("id"):
+            po_lines.setdefault(pol.product_id, pol)
+
+        # Every line is checked before anything is written; all problems are returned together
+        errors, grn_lines = [], []
+        for idx, (ln, match) in enumerate(zip(lines, matches)):
             product_id = ln.get("product_id")
             if not product_id:
                 vend_code = ln.get("vendor_code") or ln.get("product_code") or ""
-                prod = product_by_vendor_code(int(vendor_id), vend_code)
-                if not prod:
-                    return Response({"detail": f"Unable to resolve product for code '{vend_code}'"}, status=status.HTTP_400_BAD_REQUEST)
-                product_id = prod.id
-            pol = PurchaseOrderLine.objects.filter(po_id=po_id, product_id=product_id).first()
+                if not match.product:
+                    errors.append({"line": idx, "detail": f"Unable to resolve product for code '{vend_code}'", "match": match.as_dict()})
+                    continue
+                product_id = match.product.id
+            pol = po_lines.get(int(product_id))
             if not pol:
-                return Response({"detail": f"No PO line found for product {product_id}"}, status=status.HTTP_400_BAD_REQUEST)
-            GoodsReceiptLine.objects.create(
-                grn=grn,
-                po_line=pol,
-                product_id=product_id,
-                batch_no=ln.get("batch_no", ""),
-                mfg_date=ln.get("mfg_date"),
-                expiry_date=ln.get("expiry_date"),
-                qty_packs_received=int(ln.get("qty") or ln.get("qty_packs") or ln.get("qty_packs_received") or 0),
-                qty_base_received=Decimal("0.000"),
-                qty_base_damaged=Decimal("0.000"),
-                unit_cost=Decimal(str(ln.get("unit_cost") or ln.get("price") or 0)),
-                mrp=Decimal(str(ln.get("mrp") or 0)),
-            )
+                errors.append({"line": idx, "detail": f"No PO line found for product {product_id}"})
+                continue
+            try:
+                grn_lines.append(GoodsReceiptLine(
+                    po_line=pol,
+                    product_id=product_id,
+                    batch_no=ln.get("batch_no", ""),
+                    mfg_date=GoodsReceiptLine._meta.get_field("mfg_date").to_python(ln.get("mfg_date")),
+                    expiry_date=GoodsReceiptLine._meta.get_field("expiry_date").to_python(ln.get("expiry_date")),
+                    qty_packs_received=int(ln.get("qty") or ln.get("qty_packs") or ln.get("qty_packs_received") or 0),
+                    qty_base_received=Decimal("0.000"),
+                    qty_base_damaged=Decimal("0.000"),
+                    unit_cost=Decimal(str(ln.get("unit_cost") or ln.get("price") or 0)),
+                    mrp=Decimal(str(ln.get("mrp") or 0)),
+                ))
+            except (ValueError, InvalidOperation, DjangoValidationError) as exc:
+                message = "; ".join(exc.messages) if isinstance(exc, DjangoValidationError) else "qty, unit_cost and mrp must be numbers"
+                errors.append({"line": idx, "detail": f"Invalid value: {message}"})
+        if errors:
+            detail = errors[0]["detail"] if len(errors) == 1 else f"{len(errors)} lines could not be imported; nothing was saved."
+            body = {"detail": detail, "errors": errors, "matches": diagnostics}
+            if len(errors) == 1 and "match" in errors[0]:
+                body["match"] = errors[0]["match"]
+            return Response(body, status=status.HTTP_400_BAD_REQUEST)
+
+        grn = GoodsReceipt.objects.create(po_id=po_id, location_id=location_id, status=GoodsReceipt.Status.DRAFT)
+        for line in grn_lines:
+            line.grn = grn
+        GoodsReceiptLine.objects.bulk_create(grn_lines)
         audit(request.user if request.user.is_authenticated else None, table="procurement_goodsreceipt", row_id=grn.id, action="IMPORT_COMMIT", before=None, after={"lines": len(lines)})
-        return Response({"id": grn.id, "status": grn.status}, status=status.HTTP_201_CREATED)
+        return Response({"id": grn.id, "status": grn.status, "matches": diagnostics}, status=status.HTTP_201_CREATED)
 
 
 class PurchasesMonthlyStatsView(APIView):
@@ -564,49 +602,88 @@ class PurchasesMonthlyStatsView(APIView):
     def get(self, request):
         months = int(request.query_params.get("months", 6))
         location_id = request.query_params.get("location_id")
-        from .models import GoodsReceiptLine, GoodsReceipt
-        qs = GoodsReceiptLine.objects.select_related("grn")
+        qs = PurchaseFact.objects.all()
         if location_id:
-            qs = qs.filter(grn__location_id=location_id)
-        qs = qs.filter(grn__status=GoodsReceipt.Status.POSTED)
-        data = (
-            qs.annotate(month=TruncMonth("grn__received_at"))
-            .values("month")
-            .annotate(total=Sum(Sum("qty_packs_received") * 0 + Sum("unit_cost")))
-        )
-        # Simpler: compute value as sum(qty_packs_received * unit_cost)
-        data = (
-            qs.annotate(month=TruncMonth("grn__received_at"))
+            qs = qs.filter(location_id=location_id)
+        rows = (
+            qs.annotate(month=TruncMonth("day"))
             .values("month")
-            .annotate(value=Sum(Sum("qty_packs_received") * 0))
+            .annotate(total=Sum("value"))
+            .order_by("-month")[:months]
         )
-        # We'll compute value in Python to avoid DB-specific operations
-        from collections import defaultdict
-        bucket = defaultdict(lambda: 0)
-        for gl in qs.annotate(month=TruncMonth("grn__received_at")).values(
-            "month", "qty_packs_received", "unit_cost"
-        ):
-            if gl["month"] is None:
-                continue
-            key = gl["month"].strftime("%Y-%m")
-            bucket[key] += float(gl["qty_packs_received"] or 0) * float(gl["unit_cost"] or 0)
         # Keep only latest N months sorted
-        series = [{"month": k, "total": round(v, 2)} for k, v in sorted(bucket.items())][-months:]
+        series = [
+            {"month": r["month"].strftime("%Y-%m"), "total": round(float(r["total"] or 0), 2)}
+            for r in reversed(rows)
+        ]
         return Response(series)
 
 
+class ReorderSuggestionsView(APIView):
+    @extend_schema(
+        tags=["Procurement"],
+        summary="Suggested order quantities for a location, grouped by preferred vendor",
+        description=(
+            "Each vendor group (vendor_id, location_id, lines with product_id and qty in packs) "
+            "can be posted to purchase-orders/import-commit."
+        ),
+        parameters=[
+            OpenApiParameter("location_id", OpenApiTypes.INT, OpenApiParameter.QUERY, required=True),
+            OpenApiParameter("vendor_id", OpenApiTypes.INT, OpenApiParameter.QUERY),
+            OpenApiParameter("window_days", OpenApiTypes.INT, OpenApiParameter.QUERY),
+            OpenApiParameter("cover_days", OpenApiTypes.INT, OpenApiParameter.QUERY),
+        ],
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+    )
+    def get(self, request):
+        params = {}
+        for name in ("location_id", "vendor_id", "window_days", "cover_days"):
+            raw = request.query_params.get(name)
+            if raw in (None, ""):
+                continue
+            try:
+                params[name] = int(raw)
+            except (TypeError, ValueError):
+                return Response({"detail": f"{name} must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+            if params[name] < 0:
+                return Response({"detail": f"{name} must not be negative"}, status=status.HTTP_400_BAD_REQUEST)
+        location_id = params.pop("location_id", None)
+        if not location_id:
+            return Response({"detail": "location_id is required"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(suggest_reorders(location_id, **params))
+
+
     
 logger = logging.getLogger(__name__)
 
 
 class PurchaseImportView(APIView):
+    """Accept a purchase file and convert it into a PO on a background import job.
+
+    Responds 202 with the job id; poll ``import-jobs/<id>/`` for progress. Pass
+    ``wait=true`` to run the import inside the request and get the PO back (201).
+    """
+
+    @staticmethod
+    def _detect_type(file):
+        file_name_lower = (getattr(file, 'name', '') or '').lower()
+        if '.' in file_name_lower:
+            return file_name_lower.split(".")[-1].strip()
+        # Fallback: try to detect from content_type
+        content_type_lower = (getattr(file, 'content_type', '') or '').lower()
+        if 'pdf' in content_type_lower:
+            return 'pdf'
+        if 'csv' in content_type_lower:
+            return 'csv'
+        if 'excel' in content_type_lower or 'spreadsheet' in content_type_lower:
+            return 'xlsx'
+        return None
 
     def post(self, request):
         file = request.FILES.get("file")
         vendor_id = request.data.get("vendor_id")
         location_id = request.data.get("location_id")
-        auto_receive = request.data.get("auto_receive") in ["1", "true", "True", True]
-        po_number = next_doc_number("PO")
+        wait = request.data.get("wait") in ["1", "true", "True", True]
 
         if not file:
             return Response({"detail": "file is required"}, status=400)
@@ -614,206 +691,67 @@ class PurchaseImportView(APIView):
         if not vendor_id or not location_id:
             return Response({"detail": "vendor_id and location_id are required"}, status=400)
 
-        try:
-            vendor = get_object_or_404(Vendor, pk=vendor_id)
-            location = get_object_or_404(Location, pk=location_id)
+        vendor = get_object_or_404(Vendor, pk=vendor_id)
+        location = get_object_or_404(Location, pk=location_id)
 
-            # Get file name and extension
-            file_name = getattr(file, 'name', '') or ''
-            
-            # Detect file type from extension, fallback to content_type if no extension
-            ext = None
-            file_name_lower = file_name.lower() if file_name else ''
-            
-            if file_name and '.' in file_name_lower:
-                ext = file_name_lower.split(".")[-1].strip()
-            else:
-                # Fallback: try to detect from content_type
-                content_type = getattr(file, 'content_type', '') or ''
-                content_type_lower = content_type.lower()
-                if 'pdf' in content_type_lower:
-                    ext = 'pdf'
-                elif 'csv' in content_type_lower or 'text/csv' in content_type_lower:
-                    ext = 'csv'
-                elif 'excel' in content_type_lower or 'spreadsheet' in content_type_lower:
-                    ext = 'xlsx'
-            
-            if ext not in ["pdf", "csv", "xlsx", "xls"]:
-                return Response({"detail": f"Unsupported file type. File: {file_name or 'unknown'}, Detected: {ext or 'none'}. Supported types are: CSV, PDF, XLSX, XLS"}, status=400)
-
-            # Process file in-memory to avoid filesystem permission issues on Azure
-            # Read the entire file into memory
-            import io
-            file_bytes = b""
-            bytes_read = 0
-            for chunk in file.chunks():
-                file_bytes += chunk
-                bytes_read += len(chunk)
-            
-            if bytes_read == 0:
-                return Response({"detail": "Uploaded file is empty. Please ensure the file contains data."}, status=400)
-            
-            logger.info(f"Processing {ext.upper()} file in-memory: {file_name}, size: {bytes_read} bytes")
+        file_name = getattr(file, 'name', '') or ''
+        ext = self._detect_type(file)
+        if ext not in SUPPORTED_TYPES:
+            return Response({"detail": f"Unsupported file type. File: {file_name or 'unknown'}, Detected: {ext or 'none'}. Supported types are: CSV, PDF, XLSX, XLS"}, status=400)
 
-            # Process file based on type - all in-memory
-            items = None
-            try:
-                if ext == "pdf":
-                    # pdfplumber.open() can accept BytesIO directly
-                    file_obj = io.BytesIO(file_bytes)
-                    try:
-                        items = extract_purchase_items_from_pdf(file_obj)
-                        logger.info(f"PDF processing completed, found {len(items) if items else 0} items")
-                    except Exception as pdf_err:
-                        # Check for common pdfplumber errors
-                        err_msg = str(pdf_err).lower()
-                        if "pdftoppm" in err_msg or "poppler" in err_msg or "command not found" in err_msg:
-                            logger.error(f"PDF processing failed - missing system dependency (poppler-utils): {pdf_err}", exc_info=True)
-                            return Response({
-                                "detail": "PDF processing failed. The server is missing required system libraries (poppler-utils). Please contact the administrator or use CSV format instead."
-                            }, status=500)
-                        else:
-                            raise  # Re-raise if it's a different error
-                    
-                elif ext == "csv":
-                    # Process CSV directly from bytes
-                    from .utils import extract_items_from_csv
-                    items = extract_items_from_csv(file_bytes)
-                    logger.info(f"CSV processing completed, found {len(items) if items else 0} items")
-                    
-                elif ext in ["xlsx", "xls"]:
-                    # openpyxl.load_workbook() can accept BytesIO directly
-                    from .utils import extract_items_from_excel
-                    file_obj = io.BytesIO(file_bytes)
-                    items = extract_items_from_excel(file_obj)
-                    logger.info(f"Excel processing completed, found {len(items) if items else 0} items")
-                    
-            except ImportError as import_err:
-                logger.error(f"Missing Python dependency for {ext} file: {import_err}", exc_info=True)
-                missing_module = str(import_err).split("'")[1] if "'" in str(import_err) else "unknown"
-                return Response({
-                    "detail": f"Failed to process {ext.upper()} file. Required Python library '{missing_module}' is not installed on the server."
-                }, status=500)
-            except Exception as proc_err:
-                logger.error(f"Error processing {ext} file: {proc_err}", exc_info=True)
-                import traceback
-                logger.error(f"Full traceback: {traceback.format_exc()}")
-                return Response({
-                    "detail": f"Failed to process {ext.upper()} file: {str(proc_err)}. Please check the file format and ensure it's valid."
-                }, status=500)
-
-            if not items:
-                return Response({"detail": "No items found in file"}, status=400)
-
-            created_lines = 0
-            total_amount = Decimal("0.00")
-
-            with transaction.atomic():
-
-                po = PurchaseOrder.objects.create(
-                    vendor=vendor,
-                    location=location,
-                    po_number=po_number,
-                    order_date=timezone.now().date(),
-                    status="OPEN",
-                    net_total=0,
-                )
-
-                for it in items:
-                    code = (it.get("product_code") or "").strip()
-                    # ALWAYS use the name from CSV/Excel - this is the item name to display
-                    name = (it.get("name") or "").strip()  # Item name from Excel/CSV
-
-                    # PRODUCT LOOKUP ONLY (for linking, but we'll ALWAYS use requested_name for display)
-                    # Don't do product lookup by name - only by code if provided
-                    product = None
-                    if code:
-                        product = Product.objects.filter(code__iexact=code).first()
-
-                    # PARSE FIELDS from CSV/Excel
-                    qty_raw = it.get("qty") or "0"  # Quantity from Excel/CSV
-                    rate_raw = it.get("rate") or "0"
-                    net_raw = it.get("net_value") or "0"
-
-                    try:
-                        qty = int(float(qty_raw))
-                    except:
-                        qty = 0
-
-                    try:
-                        rate = Decimal(str(rate_raw))
-                    except:
-                        rate = Decimal("0.00")
-
-                    try:
-                        net_value = Decimal(str(net_raw))
-                    except:
-                        net_value = rate * qty
-
-                    # ALWAYS use the name from CSV/Excel as requested_name for display
-                    # Even if we found a product, we still show the CSV item name
-                    requested_name_for_display = name if name else ""
-                    
-                    # Create line - ALWAYS use CSV item name for requested_name
-                    PurchaseOrderLine.objects.create(
-                        po=po,
-                        product=product,  # Link to product if found by code, but display uses requested_name
-                        requested_name=requested_name_for_display,  # ALWAYS use item name from CSV
-                        qty_packs_ordered=qty,  # ALWAYS use quantity from CSV
-                        expected_unit_cost=rate,
-                        gst_percent_override=None
-                    )
-
-                    total_amount += net_value
-                    created_lines += 1
-
-                # Update total
-                po.net_total = total_amount
-                po.save()
+        if not file.size:
+            return Response({"detail": "Uploaded file is empty. Please ensure the file contains data."}, status=400)
+        if file.size > max_upload_bytes():
+            return Response({"detail": f"File is too large ({file.size // (1024 * 1024)} MB). The maximum size is {settings.IMPORT_MAX_UPLOAD_MB} MB."}, status=413)
 
+        logger.info("Queueing %s import: %s, size: %s bytes", ext.upper(), file_name, file.size)
+        path = spool_upload(file, ext)
+        try:
+            job = ImportJob.objects.create(
+                vendor=vendor,
+                location=location,
+                created_by=request.user if getattr(request.user, "is_authenticated", False) else None,
+                file_name=file_name[:255],
+                file_type=ext,
+                file_size=file.size,
+                upload_path=path,
+            )
+        except Exception:
+            _discard_upload(path)
+            raise
+
+        if wait:
+            job = run_import_job(job.id) or ImportJob.objects.get(pk=job.id)
+            if job.status != ImportJob.Status.DONE:
+                return Response({"detail": job.error, "job_id": job.id}, status=400 if job.error == NO_ITEMS else 500)
             return Response({
                 "message": "Imported successfully",
-                "purchase_order_id": po.id,
-                "po_number": po.po_number,
-                "lines_created": created_lines,
-                "net_total": str(po.net_total)
+                "job_id": job.id,
+                "purchase_order_id": job.po_id,
+                "po_number": job.po.po_number,
+                "lines_created": job.lines_created,
+                "net_total": str(job.po.net_total)
             }, status=201)
 
-        except Exception as exc:
-            logger.exception("Error importing file: %s", exc, exc_info=True)
-            error_msg = str(exc)
-            error_type = type(exc).__name__
-            
-            # Log detailed error information for debugging
-            logger.error(f"Import error - Type: {error_type}, Message: {error_msg}")
-            import traceback
-            logger.error(f"Full traceback: {traceback.format_exc()}")
-            
-            # Provide more helpful error messages
-            if "pdf" in error_msg.lower() or "pdfplumber" in error_msg.lower() or "No module named 'pdfplumber'" in error_msg:
-                return Response({
-                    "detail": f"Failed to process PDF file. Error: {error_msg}. The PDF processing library may not be installed on the server."
-                }, status=500)
-            elif "csv" in error_msg.lower():
-                return Response({
-                    "detail": f"Failed to process CSV file: {error_msg}. Please ensure the file is a valid CSV with proper formatting."
-                }, status=500)
-            elif "excel" in error_msg.lower() or "openpyxl" in error_msg.lower() or "No module named 'openpyxl'" in error_msg:
-                return Response({
-                    "detail": f"Failed to process Excel file. Error: {error_msg}. The Excel processing library may not be installed on the server."
-                }, status=500)
-            elif "permission" in error_msg.lower() or "Permission denied" in error_msg:
-                return Response({
-                    "detail": f"Permission error: {error_msg}. Please contact administrator."
-                }, status=500)
-            elif "No such file" in error_msg or "FileNotFoundError" in error_type:
-                return Response({
-                    "detail": f"File not found error: {error_msg}. The uploaded file may not have been saved correctly."
-                }, status=500)
-            else:
-                return Response({
-                    "detail": f"Failed to import file: {error_msg} (Error type: {error_type}). Please check server logs for more details."
-                }, status=500)
+        submit_import_job(job.id)
+        return Response({
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": request.build_absolute_uri(reverse("import-job-detail", args=[job.id])),
+        }, status=202)
+
+
+class ImportJobView(generics.RetrieveAPIView):
+    """Status and progress of a purchase file import job; users only see their own jobs (staff see all)."""
+    queryset = ImportJob.objects.select_related("po")
+    serializer_class = ImportJobSerializer
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        user = self.request.user
+        if user.is_staff or user.is_superuser:
+            return qs
+        return qs.filter(created_by_id=user.pk) if user.is_authenticated else qs.none()
 
 
 
@@ -1,8 +1,6 @@
 import io
 import uuid
 from datetime import date
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
 
 from django.utils import timezone
 
@@ -26,6 +24,8 @@ REPORT_UI_NAMES = {
 
 def _auto_width(ws):
     """Auto adjust column width"""
+    from openpyxl.utils import get_column_letter
+
     for col in ws.columns:
         max_len = 0
         col_letter = get_column_letter(col[0].column)
@@ -49,6 +49,9 @@ def generate_report_file(export):
     ui_name = REPORT_UI_NAMES.get(export.report_type, export.report_type)
     filename = f"{ui_name}_{today}_{short_uid}.xlsx"
 
+    # Imported here so the URLconf (and every worker/command) does not load openpyxl
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = export.report_type
@@ -12,6 +12,7 @@ from . import services
 import os
 from django.conf import settings
 from django.http import FileResponse, Http404
+from core.versions import conditional_get, location_scopes
 
 
 class ReportExportViewSet(viewsets.ModelViewSet):
@@ -84,6 +85,7 @@ class SalesSummaryView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes("customer"))
     def get(self, request):
         from apps.sales.models import SalesInvoice
         from django.db.models.functions import TruncMonth
@@ -154,8 +156,9 @@ class PurchasesSummaryView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes("vendor"))
     def get(self, request):
-        from apps.procurement.models import GoodsReceipt, GoodsReceiptLine
+        from apps.procurement.models import GoodsReceipt, PurchaseFact
         from django.db.models.functions import TruncMonth
         from django.db.models import Count
         from datetime import timedelta
@@ -168,33 +171,31 @@ class PurchasesSummaryView(APIView):
         months = int(request.query_params.get("months", 10))
 
         grn_qs = GoodsReceipt.objects.filter(status=GoodsReceipt.Status.POSTED)
+        fact_qs = PurchaseFact.objects.all()
 
         # Apply date range (if user selected)
         if from_str:
             grn_qs = grn_qs.filter(received_at__date__gte=from_str)
+            fact_qs = fact_qs.filter(day__gte=from_str)
         if to_str:
             grn_qs = grn_qs.filter(received_at__date__lte=to_str)
+            fact_qs = fact_qs.filter(day__lte=to_str)
 
         # If user didn’t apply date-from/to → use "Last X Months"
         if not from_str and not to_str:
             date_from = timezone.now() - timedelta(days=30 * months)
             grn_qs = grn_qs.filter(received_at__gte=date_from)
+            fact_qs = fact_qs.filter(day__gte=timezone.localdate(date_from))
 
         if location_id:
             grn_qs = grn_qs.filter(location_id=location_id)
+            fact_qs = fact_qs.filter(location_id=location_id)
 
         # Total GRNs
         total_orders = grn_qs.count()
 
-        # Calculate total purchase amount
-        lines = GoodsReceiptLine.objects.filter(
-            grn_id__in=grn_qs.values_list("id", flat=True)
-        )
-
-        total_purchase = sum([
-            float((ln.qty_packs_received or 0) * (ln.unit_cost or 0))
-            for ln in lines
-        ])
+        # Total purchase amount from the daily purchase facts
+        total_purchase = fact_qs.aggregate(s=Sum("value")).get("s") or 0
 
         # Monthly trend chart
         series = (
@@ -213,7 +214,7 @@ class PurchasesSummaryView(APIView):
         ]
 
         return Response({
-            "total_purchase": round(total_purchase, 2),
+            "total_purchase": round(float(total_purchase), 2),
             "total_orders": total_orders,
             "trend": trend,
         })
@@ -241,11 +242,12 @@ class ExpiryReportView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes("vendor"))
     def get(self, request):
         from apps.inventory.services import near_expiry
         from apps.settingsx.services import get_setting
         from apps.catalog.models import Product
-        from apps.procurement.models import GoodsReceipt, GoodsReceiptLine
+        from apps.procurement.models import BatchSource
         from datetime import date as _date
 
         location_id = request.query_params.get("location_id")
@@ -261,19 +263,15 @@ class ExpiryReportView(APIView):
         pids = list({r.get("product_id") for r in rows})
         products = {p.id: p for p in Product.objects.filter(id__in=pids)}
 
-        # Find supplier for each batch
-        vendor_by_batch = {}
-        grn_lines = GoodsReceiptLine.objects.filter(
-            grn__status=GoodsReceipt.Status.POSTED,
-            grn__location_id=location_id,
-            grn__lines__isnull=False
-        ).select_related("grn__po__vendor").order_by("-grn__received_at")
-
-        for gl in grn_lines:
-            key = (gl.product_id, gl.batch_no)
-            vendor = getattr(getattr(gl.grn.po, "vendor", None), "name", None)
-            if key not in vendor_by_batch and vendor:
-                vendor_by_batch[key] = vendor
+        # Supplier per (batch, location), stamped at GRN posting
+        batch_ids = {r.get("batch_lot_id") for r in rows}
+        sources = BatchSource.objects.filter(batch_lot_id__in=batch_ids)
+        if location_id:
+            sources = sources.filter(location_id=location_id)
+        vendor_by_batch = {
+            (s["batch_lot_id"], s["location_id"]): s["vendor__name"]
+            for s in sources.values("batch_lot_id", "location_id", "vendor__name")
+        }
 
         # Build response
         out = []
@@ -320,7 +318,7 @@ class ExpiryReportView(APIView):
                 "status": status_txt,
                 "quantity": float(qty_base),
                 "stock_value": stock_value,
-                "supplier": vendor_by_batch.get((r.get("product_id"), r.get("batch_no"))),
+                "supplier": vendor_by_batch.get((r.get("batch_lot_id"), r.get("location_id"))),
             })
 
         return Response(out)
@@ -338,6 +336,7 @@ class ExpirySummaryView(APIView):
         parameters=[OpenApiParameter("location_id", OpenApiTypes.INT, OpenApiParameter.QUERY)],
         responses={200: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes())
     def get(self, request):
         from apps.settingsx.services import get_setting
         from apps.catalog.models import Product
@@ -410,6 +409,7 @@ class TopSellingView(APIView):
         ],
         responses={200: OpenApiTypes.OBJECT},
     )
+    @conditional_get(location_scopes(all_locations=True))
     def get(self, request):
         from apps.sales.models import SalesInvoice, SalesLine
         from django.db.models import Sum
@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-19 03:10
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def backfill_cogs(apps, schema_editor):
+    # Lines posted before cost layers existed are costed at their batch price
+    SalesLine = apps.get_model("sales", "SalesLine")
+    BatchLot = apps.get_model("catalog", "BatchLot")
+    SalesLine.objects.update(
+        cost_per_base=Subquery(
+            BatchLot.objects.filter(pk=OuterRef("batch_lot_id")).values("purchase_price_per_base")[:1]
+        )
+    )
+    SalesLine.objects.update(cogs_amount=F("qty_base") * F("cost_per_base"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0008_remove_hsn_code_from_salesline'),
+        ('catalog', '0010_add_missing_packaging_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salesline',
+            name='cogs_amount',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='salesline',
+            name='cost_per_base',
+            field=models.DecimalField(decimal_places=6, default=0, max_digits=14),
+        ),
+        migrations.RunPython(backfill_cogs, migrations.RunPython.noop),
+    ]
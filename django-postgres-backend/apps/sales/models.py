@@ -77,6 +77,9 @@ class SalesLine(models.Model):
     tax_percent = models.DecimalField(max_digits=14, decimal_places=4, default=0)
     tax_amount = models.DecimalField(max_digits=14, decimal_places=4, default=0)
     line_total = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    # Cost of goods sold, fixed from the batch cost layers when the invoice is posted
+    cost_per_base = models.DecimalField(max_digits=14, decimal_places=6, default=0)
+    cogs_amount = models.DecimalField(max_digits=14, decimal_places=4, default=0)
     requires_prescription = models.BooleanField(default=False)
 
     def __str__(self):
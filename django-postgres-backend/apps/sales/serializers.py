@@ -5,7 +5,8 @@ from django.db import transaction
 from .models import SalesInvoice, SalesLine, SalesPayment
 from apps.catalog.models import Product, BatchLot
 from apps.customers.models import Customer
-from apps.settingsx.models import PaymentMethod, TaxBillingSettings
+from apps.settingsx.models import PaymentMethod
+from apps.settingsx.services import get_tax_billing_settings
 from apps.customers.serializers import CustomerSerializer
 from django.utils import timezone
 from apps.inventory.services import stock_on_hand
@@ -209,7 +210,7 @@ class SalesInvoiceSerializer(serializers.ModelSerializer):
         return data
 
     def _compute_totals_and_create_lines(self, invoice, lines):
-        settings = TaxBillingSettings.objects.first()
+        settings = get_tax_billing_settings()
         default_pct = Decimal(str(settings.gst_rate)) if settings and settings.gst_rate is not None else Decimal("0")
         calc_method = (settings.calc_method or "INCLUSIVE").upper() if settings else "INCLUSIVE"
 
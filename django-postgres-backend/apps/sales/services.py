@@ -6,11 +6,13 @@ from django.core.exceptions import ValidationError
 
 from .models import SalesInvoice, SalesLine
 from apps.inventory.models import InventoryMovement
+from apps.inventory.services import consume_cost_layers, record_cost_layer
 from apps.compliance.services import (
     ensure_prescription_for_invoice,
     create_compliance_entries,
 )
 from apps.governance.models import AuditLog
+from core.loaders import identity_map, identity_scope
 
 AMOUNT_QUANT = Decimal("0.0001")
 CURRENCY_QUANT = Decimal("0.01")
@@ -38,6 +40,7 @@ def write_movement(location_id, batch_lot_id, qty_delta, reason, ref_doc_type, r
     )
 
 
+@identity_scope()
 @transaction.atomic
 def post_invoice(actor, invoice_id):
     """Post a draft invoice into a confirmed sale. Idempotent: re-posting a POSTED invoice returns no-op."""
@@ -63,9 +66,6 @@ def post_invoice(actor, invoice_id):
     if inv.status != SalesInvoice.Status.DRAFT:
         raise ValidationError(f"Cannot post invoice in {inv.status} state.")
 
-    # Compliance: ensure prescription exists if required
-    ensure_prescription_for_invoice(inv)
-
     gross = Decimal("0")
     tax_total = Decimal("0")
     discount_total = Decimal("0")
@@ -78,6 +78,10 @@ def post_invoice(actor, invoice_id):
     lines_list = list(inv.lines.all())
     if not lines_list:
         raise ValidationError("Invoice has no line items to post")
+    identity_map().attach([inv], "location")
+
+    # Compliance: ensure prescription exists if required
+    ensure_prescription_for_invoice(inv, lines_list)
     
     # First pass: verify all stock is available (prevents partial deductions)
     for line in lines_list:
@@ -100,8 +104,16 @@ def post_invoice(actor, invoice_id):
         )
         line_total = (taxable + tax_amt).quantize(AMOUNT_QUANT, rounding=ROUND_HALF_UP)
 
+        # Fix the cost of goods sold from the batch cost layers
+        cogs, cost_per_base = consume_cost_layers(line.batch_lot_id, qty)
+
         # update calculated values on DB
-        SalesLine.objects.filter(pk=line.pk).update(tax_amount=tax_amt, line_total=line_total)
+        SalesLine.objects.filter(pk=line.pk).update(
+            tax_amount=tax_amt,
+            line_total=line_total,
+            cost_per_base=cost_per_base,
+            cogs_amount=cogs,
+        )
 
         gross += qty * rate
         discount_total += disc
@@ -131,7 +143,7 @@ def post_invoice(actor, invoice_id):
     # -----------------------------------------
     # COMPLIANCE (H1 / NDPS)
     # -----------------------------------------
-    create_compliance_entries(inv)
+    create_compliance_entries(inv, lines_list)
 
     # -----------------------------------------
     # PAYMENT STATUS UPDATE
@@ -161,7 +173,7 @@ def post_invoice(actor, invoice_id):
     except Exception:
         low_threshold_val = Decimal("0")
 
-    for line in inv.lines.all():
+    for line in lines_list:
         batch = line.batch_lot
         product = line.product
 
@@ -223,6 +235,7 @@ def cancel_invoice(actor, invoice_id):
             "SalesInvoiceCancel",
             inv.id,
         )
+        _return_cost_layer(inv, line, "SalesInvoiceCancel")
 
     inv.status = SalesInvoice.Status.CANCELLED
     inv.save(update_fields=["status"])
@@ -249,10 +262,22 @@ def restore_stock_for_invoice(invoice_id):
                 "SalesInvoiceDelete",
                 inv.id,
             )
+            _return_cost_layer(inv, line, "SalesInvoiceDelete")
     
     return inv
 
 
+def _return_cost_layer(inv, line, ref_doc_type):
+    """Put stock credited back by a cancel/delete into a layer at the cost it was sold at."""
+    record_cost_layer(
+        location_id=inv.location_id,
+        batch_lot_id=line.batch_lot_id,
+        qty_base=Decimal(line.qty_base),
+        unit_cost_per_base=Decimal(line.cost_per_base or 0),
+        ref_doc=(ref_doc_type, inv.id),
+    )
+
+
 def _update_payment_status(inv):
     """Recalculate invoice payment status and persist totals."""
     # refresh relations to read fresh payments
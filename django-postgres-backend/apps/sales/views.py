@@ -13,8 +13,8 @@ from datetime import date
 from .models import SalesInvoice, SalesPayment
 from .serializers import SalesInvoiceSerializer, SalesPaymentSerializer
 from . import services
-from apps.settingsx.services import next_doc_number
-from apps.settingsx.models import TaxBillingSettings, DocCounter, DeletedInvoiceNumber
+from apps.settingsx.services import next_doc_number, get_tax_billing_settings
+from apps.settingsx.models import DocCounter, DeletedInvoiceNumber
 from apps.inventory.models import InventoryMovement
 from apps.catalog.models import Product, BatchLot
 from core.permissions import HasActiveSystemLicense
@@ -61,7 +61,7 @@ class SalesInvoiceViewSet(viewsets.ModelViewSet):
                 invoice.save(update_fields=update_fields)
             else:
                 # Generate new invoice number normally
-                settings = TaxBillingSettings.objects.first()
+                settings = get_tax_billing_settings()
                 prefix = (settings.invoice_prefix or "INV-") if settings else "INV-"
                 start_num = (settings.invoice_start or 1) if settings else 1
                 padding = 4
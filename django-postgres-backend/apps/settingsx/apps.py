@@ -5,3 +5,14 @@ class SettingsxConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.settingsx'
 
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.models.signals import post_delete, post_save
+
+        from .models import AlertThresholds, SettingKV, TaxBillingSettings
+        from .services import expire_settings_check, invalidate_settings_snapshot
+
+        for model in (SettingKV, AlertThresholds, TaxBillingSettings):
+            post_save.connect(invalidate_settings_snapshot, sender=model, dispatch_uid=f"settings-snapshot:{model.__name__}:save")
+            post_delete.connect(invalidate_settings_snapshot, sender=model, dispatch_uid=f"settings-snapshot:{model.__name__}:delete")
+        request_started.connect(expire_settings_check, dispatch_uid="settings-snapshot:request")
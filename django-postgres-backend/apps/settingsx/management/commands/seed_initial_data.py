@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from apps.settingsx.models import BusinessProfile, DocCounter, SettingKV, PaymentMethod, PaymentTerm
 from apps.catalog.models import ProductCategory, MedicineForm, Uom
 from apps.inventory.models import RackRule, RackLocation
+from apps.settingsx.registry import default_values
 
 
 class Command(BaseCommand):
@@ -25,42 +26,7 @@ class Command(BaseCommand):
         for doc, prefix in counters:
             DocCounter.objects.get_or_create(document_type=doc, defaults=dict(prefix=prefix, next_number=1, padding_int=5))
 
-        defaults = {
-            # Alerts
-            "ALERT_LOW_STOCK_DEFAULT": "50",
-            "ALERT_EXPIRY_WARNING_DAYS": "60",
-            "ALERT_EXPIRY_CRITICAL_DAYS": "30",
-            "ALERT_CHECK_FREQUENCY": "DAILY",  # DAILY|WEEKLY
-            "AUTO_REMOVE_EXPIRED": "MANUAL",    # MANUAL|AUTO
-            "OUT_OF_STOCK_ACTION": "NOTIFY_ONLY",  # NOTIFY_ONLY|BLOCK_SALE
-            # Inventory/stock behavior
-            "ALLOW_NEGATIVE_STOCK": "false",
-            # Tax & Billing
-            "TAX_GST_RATE": "12",
-            "TAX_CGST_RATE": "6",
-            "TAX_SGST_RATE": "6",
-            "TAX_CALC_METHOD": "INCLUSIVE",  # INCLUSIVE | EXCLUSIVE
-            "INVOICE_PREFIX": "INV-",
-            "INVOICE_START": "1001",
-            "INVOICE_TEMPLATE": "STANDARD",
-            "INVOICE_FOOTER": "Thank you for choosing our pharmacy",
-            # Notifications
-            "NOTIFY_EMAIL_ENABLED": "false",
-            "NOTIFY_LOW_STOCK": "true",
-            "NOTIFY_EXPIRY": "true",
-            "NOTIFY_DAILY_REPORT": "false",
-            "NOTIFY_EMAIL": "",
-            "NOTIFY_SMS_ENABLED": "false",
-            "NOTIFY_SMS_PHONE": "",
-            "SMTP_HOST": "smtp.gmail.com",
-            "SMTP_PORT": "587",
-            "SMTP_USER": "",
-            "SMTP_PASSWORD": "",
-            # Backups schedule (UI only; scheduling done externally)
-            "AUTO_BACKUP_ENABLED": "false",
-            "AUTO_BACKUP_FREQUENCY": "DAILY",  # DAILY|WEEKLY|MONTHLY
-            "AUTO_BACKUP_TIME": "02:00",
-        }
+        defaults = default_values()
         for k, v in defaults.items():
             SettingKV.objects.get_or_create(key=k, defaults=dict(value=v))
 
@@ -0,0 +1,83 @@
+"""Known SettingKV keys with their settings-screen group, value type and default.
+
+Values are stored as strings; ``parse_setting`` turns them into the registered type.
+Keys with ``group`` None are server-side switches not shown on the grouped settings screen.
+"""
+from decimal import Decimal, InvalidOperation
+
+SETTINGS = {
+    # Alerts
+    "ALERT_EXPIRY_CRITICAL_DAYS": {"group": "alerts", "type": int, "default": "30"},
+    "ALERT_EXPIRY_WARNING_DAYS": {"group": "alerts", "type": int, "default": "60"},
+    "ALERT_LOW_STOCK_DEFAULT": {"group": "alerts", "type": int, "default": "50"},
+    "ALERT_CHECK_FREQUENCY": {"group": "alerts", "type": str, "default": "DAILY"},  # DAILY|WEEKLY
+    "AUTO_REMOVE_EXPIRED": {"group": "alerts", "type": str, "default": "MANUAL"},  # MANUAL|AUTO
+    "OUT_OF_STOCK_ACTION": {"group": "alerts", "type": str, "default": "NOTIFY_ONLY"},  # NOTIFY_ONLY|BLOCK_SALE
+    # Tax & billing
+    "TAX_GST_RATE": {"group": "tax", "type": Decimal, "default": "12"},
+    "TAX_CGST_RATE": {"group": "tax", "type": Decimal, "default": "6"},
+    "TAX_SGST_RATE": {"group": "tax", "type": Decimal, "default": "6"},
+    "TAX_CALC_METHOD": {"group": "tax", "type": str, "default": "INCLUSIVE"},  # INCLUSIVE|EXCLUSIVE
+    "INVOICE_PREFIX": {"group": "invoice", "type": str, "default": "INV-"},
+    "INVOICE_START": {"group": "invoice", "type": int, "default": "1001"},
+    "INVOICE_TEMPLATE": {"group": "invoice", "type": str, "default": "STANDARD"},
+    "INVOICE_FOOTER": {"group": "invoice", "type": str, "default": "Thank you for choosing our pharmacy"},
+    # Notifications
+    "NOTIFY_EMAIL_ENABLED": {"group": "notifications", "type": bool, "default": "false"},
+    "NOTIFY_LOW_STOCK": {"group": "notifications", "type": bool, "default": "true"},
+    "NOTIFY_EXPIRY": {"group": "notifications", "type": bool, "default": "true"},
+    "NOTIFY_DAILY_REPORT": {"group": "notifications", "type": bool, "default": "false"},
+    "NOTIFY_EMAIL": {"group": "notifications", "type": str, "default": ""},
+    "NOTIFY_SMS_ENABLED": {"group": "notifications", "type": bool, "default": "false"},
+    "NOTIFY_SMS_PHONE": {"group": "notifications", "type": str, "default": ""},
+    "SMTP_HOST": {"group": "notifications", "type": str, "default": "smtp.gmail.com"},
+    "SMTP_PORT": {"group": "notifications", "type": int, "default": "587"},
+    "SMTP_USER": {"group": "notifications", "type": str, "default": ""},
+    "SMTP_PASSWORD": {"group": "notifications", "type": str, "default": ""},
+    # Backups schedule (UI only; scheduling done externally)
+    "AUTO_BACKUP_ENABLED": {"group": "backups", "type": bool, "default": "false"},
+    "AUTO_BACKUP_FREQUENCY": {"group": "backups", "type": str, "default": "DAILY"},  # DAILY|WEEKLY|MONTHLY
+    "AUTO_BACKUP_TIME": {"group": "backups", "type": str, "default": "02:00"},
+    # Inventory/stock behaviour
+    "ALLOW_NEGATIVE_STOCK": {"group": None, "type": bool, "default": "false"},
+    "INVENTORY_COSTING_METHOD": {"group": None, "type": str, "default": "FIFO"},  # FIFO|WAVG
+    # Reorder suggestions
+    "REORDER_SALES_WINDOW_DAYS": {"group": None, "type": int, "default": "30"},
+    "REORDER_LEAD_TIME_DAYS": {"group": None, "type": int, "default": "7"},
+    "REORDER_COVER_DAYS": {"group": None, "type": int, "default": "14"},
+}
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+def group_keys() -> dict[str, list[str]]:
+    """Keys per settings-screen group, in registry order."""
+    groups: dict[str, list[str]] = {}
+    for key, spec in SETTINGS.items():
+        if spec["group"]:
+            groups.setdefault(spec["group"], []).append(key)
+    return groups
+
+
+def default_values() -> dict[str, str]:
+    return {key: spec["default"] for key, spec in SETTINGS.items()}
+
+
+def parse_setting(key: str, raw: str | None):
+    """Convert a stored value to the key's registered type, falling back to the registered default."""
+    spec = SETTINGS.get(key)
+    if spec is None:
+        return raw
+    for value in (raw, spec["default"]):
+        if value in (None, ""):
+            continue
+        kind = spec["type"]
+        try:
+            if kind is bool:
+                return str(value).strip().lower() in TRUE_VALUES
+            if kind is Decimal:
+                return Decimal(str(value))
+            return kind(value)
+        except (TypeError, ValueError, InvalidOperation):
+            continue
+    return None if spec["type"] is not str else ""
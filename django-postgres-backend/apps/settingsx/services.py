@@ -1,23 +1,144 @@
 from __future__ import annotations
 
+import time
+
 from django.db import transaction
 from typing import Optional
 
-from .models import SettingKV, DocCounter
+from core.models import ChangeVersion
+from core.versions import bump
+from .models import SettingKV, DocCounter, AlertThresholds, TaxBillingSettings
+
+# Process-local copy of SettingKV, AlertThresholds and TaxBillingSettings. It is validated against the
+# "settings" ChangeVersion row (bumped by core.signals on every save/delete) once per request and at
+# most every SNAPSHOT_RECHECK_SECONDS otherwise, so hot loops read settings without queries.
+SNAPSHOT_RECHECK_SECONDS = 5.0
+
+_snapshot: dict | None = None
+_checked_at = 0.0
+
+
+def _settings_version() -> int:
+    return ChangeVersion.objects.filter(scope="settings").values_list("version", flat=True).first() or 0
+
+
+def settings_snapshot() -> dict | None:
+    """Return the cached settings ({"kv", "alerts", "tax"}), or None when they must be read from the DB."""
+    global _snapshot, _checked_at
+    # A connection that wrote settings in its open transaction reads through to the DB until it
+    # commits; other threads keep using the snapshot of committed data
+    conn = transaction.get_connection()
+    if getattr(conn, "settings_dirty", False):
+        if conn.in_atomic_block:
+            return None
+        conn.settings_dirty = False
+        _snapshot = None
+    now = time.monotonic()
+    snap = _snapshot
+    if snap is not None and now - _checked_at < SNAPSHOT_RECHECK_SECONDS:
+        return snap
+    version = _settings_version()
+    if snap is None or snap["version"] != version:
+        snap = {
+            "version": version,
+            "kv": dict(SettingKV.objects.values_list("key", "value")),
+            "alerts": AlertThresholds.objects.first(),
+            "tax": TaxBillingSettings.objects.first(),
+        }
+        _snapshot = snap
+    _checked_at = now
+    return snap
+
+
+def invalidate_settings_snapshot(**kwargs) -> None:
+    """Drop this process's snapshot; connected to settings saves and deletes."""
+    global _snapshot
+    _snapshot = None
+    conn = transaction.get_connection()
+    if conn.in_atomic_block:
+        conn.settings_dirty = True
+        transaction.on_commit(lambda: _clear_dirty(conn))
+
+
+def _clear_dirty(conn) -> None:
+    global _snapshot
+    _snapshot = None
+    conn.settings_dirty = False
+
+
+def expire_settings_check(**kwargs) -> None:
+    """Force a version check on the next read; connected to request_started."""
+    global _checked_at
+    _checked_at = 0.0
 
 
 def get_setting(key: str, default: str | None = None) -> str | None:
+    snap = settings_snapshot()
+    if snap is not None:
+        return snap["kv"].get(key, default)
     row = SettingKV.objects.filter(pk=key).values_list("value", flat=True).first()
     if row is None:
         return default
     return row
 
 
+def get_settings(keys, default: str | None = None) -> dict[str, str | None]:
+    """Read many keys at once: from the snapshot, or with a single ``key__in`` query."""
+    keys = list(keys)
+    snap = settings_snapshot()
+    if snap is not None:
+        stored = snap["kv"]
+    else:
+        stored = dict(SettingKV.objects.filter(key__in=keys).values_list("key", "value"))
+    return {key: stored.get(key, default) for key in keys}
+
+
+def get_typed_setting(key: str):
+    """Value of a registered key converted to its registered type (see ``registry.SETTINGS``)."""
+    from .registry import parse_setting
+
+    return parse_setting(key, get_setting(key))
+
+
+def get_alert_thresholds() -> AlertThresholds | None:
+    """Shared AlertThresholds row (or None); callers must not modify it."""
+    snap = settings_snapshot()
+    if snap is not None:
+        return snap["alerts"]
+    return AlertThresholds.objects.first()
+
+
+def get_tax_billing_settings() -> TaxBillingSettings | None:
+    """Shared TaxBillingSettings row (or None); callers must not modify it."""
+    snap = settings_snapshot()
+    if snap is not None:
+        return snap["tax"]
+    return TaxBillingSettings.objects.first()
+
+
 @transaction.atomic
 def set_setting(key: str, value: str) -> None:
     SettingKV.objects.update_or_create(key=key, defaults={"value": value})
 
 
+@transaction.atomic
+def set_settings(values: dict[str, str]) -> dict[str, str | None]:
+    """Upsert many keys with one INSERT ... ON CONFLICT; returns the previous value of each key."""
+    if not values:
+        return {}
+    before = dict(SettingKV.objects.filter(key__in=list(values)).values_list("key", "value"))
+    SettingKV.objects.bulk_create(
+        [SettingKV(key=key, value=value) for key, value in values.items()],
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["value", "updated_at"],
+    )
+    # bulk_create sends no post_save, so bump the version and drop the local snapshot here
+    bump("settings")
+    invalidate_settings_snapshot()
+    return {key: before.get(key) for key in values}
+
+
 @transaction.atomic
 def next_doc_number(document_type: str, *args, prefix: str = "", padding: int | None = None) -> str:
     """Return and increment the next document number atomically.
@@ -0,0 +1,77 @@
+import threading
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+
+from apps.settingsx.models import SettingKV
+from apps.settingsx.services import (
+    expire_settings_check,
+    get_setting,
+    get_settings,
+    get_typed_setting,
+    invalidate_settings_snapshot,
+    set_setting,
+    set_settings,
+)
+from apps.settingsx.utils import get_stock_thresholds
+from core.versions import bump
+
+
+class SettingsSnapshotTests(TransactionTestCase):
+    def tearDown(self):
+        invalidate_settings_snapshot()
+
+    def test_reads_are_served_from_snapshot_and_writes_invalidate(self):
+        set_setting("ALLOW_NEGATIVE_STOCK", "false")
+        self.assertEqual(get_setting("ALLOW_NEGATIVE_STOCK"), "false")
+        with self.assertNumQueries(0):
+            self.assertEqual(get_setting("ALLOW_NEGATIVE_STOCK"), "false")
+            self.assertEqual(get_setting("MISSING_KEY", "x"), "x")
+            get_stock_thresholds()
+
+        set_setting("ALLOW_NEGATIVE_STOCK", "true")
+        self.assertEqual(get_setting("ALLOW_NEGATIVE_STOCK"), "true")
+
+    def test_change_from_another_process_is_picked_up_by_version(self):
+        set_setting("INVOICE_FOOTER", "old")
+        self.assertEqual(get_setting("INVOICE_FOOTER"), "old")
+
+        # Simulate another worker: the row changes without this process's signals firing
+        SettingKV.objects.filter(pk="INVOICE_FOOTER").update(value="new")
+        bump("settings")
+        self.assertEqual(get_setting("INVOICE_FOOTER"), "old")
+        expire_settings_check()
+        self.assertEqual(get_setting("INVOICE_FOOTER"), "new")
+
+    def test_bulk_upsert_and_typed_read(self):
+        set_setting("TAX_GST_RATE", "12")
+        before = set_settings({"TAX_GST_RATE": "18", "ALLOW_NEGATIVE_STOCK": "true"})
+        self.assertEqual(before, {"TAX_GST_RATE": "12", "ALLOW_NEGATIVE_STOCK": None})
+
+        values = get_settings(["TAX_GST_RATE", "ALLOW_NEGATIVE_STOCK", "SMTP_HOST"])
+        self.assertEqual(values, {"TAX_GST_RATE": "18", "ALLOW_NEGATIVE_STOCK": "true", "SMTP_HOST": None})
+        self.assertIs(get_typed_setting("ALLOW_NEGATIVE_STOCK"), True)
+        self.assertEqual(get_typed_setting("SMTP_PORT"), 587)
+
+    def test_other_threads_do_not_hide_an_uncommitted_write(self):
+        set_setting("INVOICE_FOOTER", "old")
+        seen = []
+
+        def other_request():
+            try:
+                seen.append(get_setting("INVOICE_FOOTER"))
+            finally:
+                connection.close()
+
+        with transaction.atomic():
+            set_setting("INVOICE_FOOTER", "new")
+            # SQLite locks the written table for other connections; stand in for the committed rows
+            committed = mock.patch.object(SettingKV.objects, "values_list", return_value=[("INVOICE_FOOTER", "old")])
+            with committed:
+                reader = threading.Thread(target=other_request)
+                reader.start()
+                reader.join()
+            self.assertEqual(get_setting("INVOICE_FOOTER"), "new")
+        self.assertEqual(seen, ["old"])
+        self.assertEqual(get_setting("INVOICE_FOOTER"), "new")
@@ -1,17 +1,15 @@
-from apps.settingsx.models import SettingKV, AlertThresholds
+from apps.settingsx.services import get_alert_thresholds, get_setting
 
 
 def _get_int_setting(key: str, default: int) -> int:
     try:
-        return int(SettingKV.objects.get(key=key).value)
-    except SettingKV.DoesNotExist:
-        return int(default)
+        return int(get_setting(key, default))
     except Exception:
         return int(default)
 
 
 def get_stock_thresholds():
-    thresholds = AlertThresholds.objects.first()
+    thresholds = get_alert_thresholds()
     if thresholds:
         return thresholds.low_stock_default, thresholds.low_stock_default // 5 if thresholds.low_stock_default else 10
     low = _get_int_setting("low_stock_threshold", 50)
@@ -11,8 +11,10 @@ from .serializers import (
 from .models import PaymentMethod, NotificationSettings, TaxBillingSettings, AlertThresholds
 from rest_framework import viewsets
 from . import services
+from .registry import group_keys
 from .services_backup import restore_backup, create_backup
 from apps.governance.permissions import IsAdmin
+from core.mastercache import MasterListMixin, payment_methods
 from core.permissions import HasActiveSystemLicense
 
 
@@ -121,51 +123,11 @@ class BusinessProfileView(generics.RetrieveUpdateAPIView):
 
 
 def _build_group_settings() -> dict:
-    keys = {
-        "alerts": [
-            "ALERT_EXPIRY_CRITICAL_DAYS",
-            "ALERT_EXPIRY_WARNING_DAYS",
-            "ALERT_LOW_STOCK_DEFAULT",
-            "ALERT_CHECK_FREQUENCY",
-            "AUTO_REMOVE_EXPIRED",
-            "OUT_OF_STOCK_ACTION",
-        ],
-        "tax": [
-            "TAX_GST_RATE",
-            "TAX_CGST_RATE",
-            "TAX_SGST_RATE",
-            "TAX_CALC_METHOD",
-        ],
-        "invoice": [
-            "INVOICE_PREFIX",
-            "INVOICE_START",
-            "INVOICE_TEMPLATE",
-            "INVOICE_FOOTER",
-        ],
-        "notifications": [
-            "NOTIFY_EMAIL_ENABLED",
-            "NOTIFY_LOW_STOCK",
-            "NOTIFY_EXPIRY",
-            "NOTIFY_DAILY_REPORT",
-            "NOTIFY_EMAIL",
-            "NOTIFY_SMS_ENABLED",
-            "NOTIFY_SMS_PHONE",
-            "SMTP_HOST",
-            "SMTP_PORT",
-            "SMTP_USER",
-            "SMTP_PASSWORD",
-        ],
-        "backups": [
-            "AUTO_BACKUP_ENABLED",
-            "AUTO_BACKUP_FREQUENCY",
-            "AUTO_BACKUP_TIME",
-        ],
-    }
-    data = {}
-    for group, items in keys.items():
-        data[group] = {k: SettingKV.objects.filter(key=k).values_list("value", flat=True).first() for k in items}
+    groups = group_keys()
+    values = services.get_settings(key for keys in groups.values() for key in keys)
+    data = {group: {k: values[k] for k in keys} for group, keys in groups.items()}
 
-    alerts_obj = AlertThresholds.objects.first()
+    alerts_obj = services.get_alert_thresholds()
     if alerts_obj:
         alerts = data.get("alerts", {})
         alerts.update(
@@ -254,20 +216,17 @@ class SettingsGroupSaveView(APIView):
         if not to_write and not alerts_payload:
             return Response({"updated": 0})
         from django.db import transaction
-        from .services import set_setting, get_setting
-        from apps.governance.services import audit
+        from apps.governance.services import audit_many
         with transaction.atomic():
-            for k, v in to_write.items():
-                before = get_setting(k)
-                set_setting(k, v)
-                audit(
-                    request.user if request.user.is_authenticated else None,
-                    table="settings_kv",
-                    row_id=hash(k) % 2**31,
-                    action="UPSERT",
-                    before={"key": k, "value": before},
-                    after={"key": k, "value": v},
-                )
+            before = services.set_settings(to_write)
+            audit_many(
+                request.user if request.user.is_authenticated else None,
+                table="settings_kv",
+                entries=(
+                    (hash(k) % 2**31, "UPSERT", {"key": k, "value": before[k]}, {"key": k, "value": v})
+                    for k, v in to_write.items()
+                ),
+            )
         return Response(_build_group_settings())
 
     def get(self, request):
@@ -415,8 +374,9 @@ class BackupCreateView(APIView):
         return Response(result)
 
 
-class PaymentMethodViewSet(viewsets.ModelViewSet):
+class PaymentMethodViewSet(MasterListMixin, viewsets.ModelViewSet):
     queryset = PaymentMethod.objects.all()
+    master_table = payment_methods
     serializer_class = PaymentMethodSerializer
 
     def get_queryset(self):
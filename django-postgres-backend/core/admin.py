@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ExampleModel, SystemLicense
+from .models import ChangeVersion, ExampleModel, SystemLicense
 
 
 @admin.register(ExampleModel)
@@ -19,3 +19,9 @@ class SystemLicenseAdmin(admin.ModelAdmin):
 
     is_active_flag.boolean = True
     is_active_flag.short_description = "Is active"
+
+
+@admin.register(ChangeVersion)
+class ChangeVersionAdmin(admin.ModelAdmin):
+    list_display = ("scope", "version", "updated_at")
+    search_fields = ("scope",)
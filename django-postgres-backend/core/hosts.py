@@ -0,0 +1,63 @@
+"""Host header validation compiled once at startup.
+
+``HostMatcher`` matches ALLOWED_HOSTS entries exactly as Django does ("*", exact names,
+".example.com" for a domain and its subdomains; anything else, such as "*.example.com",
+only matches itself literally), plus the CIDR ranges of ALLOWED_HOST_NETWORKS such as
+"169.254.0.0/16" for platform health probes. Patterns become sets and networks, so each
+check costs a few lookups, whatever the number of probe addresses seen, and never
+touches settings.
+"""
+from __future__ import annotations
+
+import ipaddress
+
+
+class HostMatcher:
+    def __init__(self, patterns, networks=()):
+        self.allow_all = False
+        self.exact: set[str] = set()
+        # ".example.com": the domain and its subdomains
+        self.suffixes: set[str] = set()
+        self.networks = [ipaddress.ip_network(n.strip(), strict=False) for n in networks if n and n.strip()]
+        for raw in patterns:
+            pattern = (raw or "").strip().lower()
+            if not pattern:
+                continue
+            if pattern == "*":
+                self.allow_all = True
+            elif pattern.startswith("."):
+                self.suffixes.add(pattern)
+            else:
+                self.exact.add(pattern[1:-1] if pattern.startswith("[") else pattern)
+
+    @staticmethod
+    def _normalize(domain: str) -> str:
+        domain = domain.lower().rstrip(".")
+        return domain[1:-1] if domain.startswith("[") else domain
+
+    def in_networks(self, domain: str) -> bool:
+        """Whether ``domain`` is an IP address inside one of the networks."""
+        if not self.networks:
+            return False
+        try:
+            address = ipaddress.ip_address(self._normalize(domain))
+        except ValueError:
+            return False
+        return any(address in network for network in self.networks)
+
+    def __call__(self, domain: str) -> bool:
+        """``domain`` is the host without port, as returned by ``split_domain_port``."""
+        if self.allow_all:
+            return True
+        domain = self._normalize(domain)
+        if domain in self.exact:
+            return True
+        if self.suffixes:
+            if "." + domain in self.suffixes:
+                return True
+            dot = domain.find(".")
+            while dot != -1:
+                if domain[dot:] in self.suffixes:
+                    return True
+                dot = domain.find(".", dot + 1)
+        return self.in_networks(domain)
@@ -0,0 +1,155 @@
+"""Request-scoped identity map for master data lookups.
+
+Inside a scope (every HTTP request via ``IdentityMapMiddleware``, or an explicit
+``identity_scope()`` in services and commands) each Product, BatchLot, Location, Uom, ...
+row is fetched at most once. Callers batch ids up front with ``load_many`` / ``attach``
+and share lookups keyed by something other than the primary key (a Uom name, a vendor
+code) through ``memo``. Outside a scope ``identity_map()`` hands out a throwaway map, so
+behaviour matches querying the ORM directly.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import Model
+
+_active: ContextVar["IdentityMap | None"] = ContextVar("identity_map", default=None)
+
+
+def _label(model) -> str:
+    return model._meta.concrete_model._meta.label
+
+
+class IdentityMap:
+    def __init__(self):
+        self._rows: dict[str, dict] = {}
+        self._memo: dict[tuple, object] = {}
+
+    def _table(self, model) -> dict:
+        return self._rows.setdefault(_label(model), {})
+
+    def prime(self, *objs) -> None:
+        """Register already loaded instances so later lookups reuse them (first one wins)."""
+        for obj in objs:
+            self._canonical(obj)
+
+    def _canonical(self, obj):
+        if isinstance(obj, Model) and obj.pk is not None:
+            table = self._table(type(obj))
+            if table.get(obj.pk) is None:
+                table[obj.pk] = obj
+            return table[obj.pk]
+        return obj
+
+    def load_many(self, model, ids) -> dict:
+        """Return ``{pk: instance}`` for the given ids, querying only the ones not seen yet."""
+        to_python = model._meta.pk.to_python
+        wanted = {to_python(pk) for pk in ids if pk not in (None, "")}
+        table = self._table(model)
+        missing = [pk for pk in wanted if pk not in table]
+        if missing:
+            found = model._default_manager.in_bulk(missing)
+            for pk in missing:
+                table[pk] = found.get(pk)
+        return {pk: table[pk] for pk in wanted if table[pk] is not None}
+
+    def get(self, model, pk):
+        """Like ``Model.objects.get(pk=pk)``, served from the map when possible."""
+        obj = self.load_many(model, [pk]).get(model._meta.pk.to_python(pk))
+        if obj is None:
+            raise model.DoesNotExist(f"{model.__name__} matching pk={pk} does not exist.")
+        return obj
+
+    def attach(self, instances, *fields: str) -> None:
+        """Fill the given foreign keys on ``instances`` with one query per related model.
+
+        Relations already cached on an instance (select_related / prefetch) are reused and
+        registered in the map instead of being fetched again.
+        """
+        instances = [obj for obj in instances if obj is not None]
+        for name in fields:
+            pending = []
+            for obj in instances:
+                field = obj._meta.get_field(name)
+                if field.is_cached(obj):
+                    self.prime(field.get_cached_value(obj))
+                else:
+                    pending.append((obj, field))
+            if not pending:
+                continue
+            rows = self.load_many(pending[0][1].related_model, [getattr(obj, field.attname) for obj, field in pending])
+            for obj, field in pending:
+                related = rows.get(getattr(obj, field.attname))
+                if related is not None:
+                    field.set_cached_value(obj, related)
+
+    def memo(self, model, key, loader):
+        """Cache ``loader()`` under ``key`` for lookups on ``model`` that are not by primary key."""
+        memo_key = (_label(model), key)
+        try:
+            return self._memo[memo_key]
+        except KeyError:
+            value = self._memo[memo_key] = self._canonical(loader())
+            return value
+
+    def missing_memos(self, model, keys) -> list:
+        """The keys in ``keys`` that have no memoised value yet (for batching them in one query)."""
+        label = _label(model)
+        return [key for key in keys if (label, key) not in self._memo]
+
+    def memoised(self, model, key, default=None):
+        return self._memo.get((_label(model), key), default)
+
+    def set_memo(self, model, key, value) -> None:
+        self._memo[(_label(model), key)] = self._canonical(value)
+
+    def forget(self, model, pk=None) -> None:
+        """Drop one row (or every row) of ``model`` along with its memoised lookups."""
+        label = _label(model)
+        if pk is None:
+            self._rows.pop(label, None)
+        else:
+            self._rows.get(label, {}).pop(pk, None)
+        self.forget_memos(model)
+
+    def forget_memos(self, model) -> None:
+        label = _label(model)
+        for memo_key in [k for k in self._memo if k[0] == label]:
+            del self._memo[memo_key]
+
+
+def identity_map() -> IdentityMap:
+    """The active map, or a throwaway one when no scope is open."""
+    return _active.get() or IdentityMap()
+
+
+@contextmanager
+def identity_scope():
+    """Open a scope for the duration of the block; nested scopes share the outer map."""
+    current = _active.get()
+    if current is not None:
+        yield current
+        return
+    token = _active.set(IdentityMap())
+    try:
+        yield _active.get()
+    finally:
+        _active.reset(token)
+
+
+def forget_saved(sender, instance, **kwargs) -> None:
+    """post_save receiver: keep the active map consistent with writes made during the scope."""
+    current = _active.get()
+    if current is None:
+        return
+    if current._rows.get(_label(sender), {}).get(instance.pk) is instance:
+        current.forget_memos(sender)
+    else:
+        current.forget(sender, instance.pk)
+
+
+def forget_deleted(sender, instance, **kwargs) -> None:
+    current = _active.get()
+    if current is not None:
+        current.forget(sender, instance.pk)
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import invalidate_license_cache
+from core.permissions import HasActiveSystemLicense
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of HasActiveSystemLicense with and without the process cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        n = max(1, options["iterations"])
+        perm = HasActiveSystemLicense()
+
+        def run(cached: bool):
+            invalidate_license_cache()
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                for _ in range(n):
+                    if not cached:
+                        invalidate_license_cache()
+                    perm.has_permission(None, None)
+                elapsed = time.perf_counter() - start
+            return elapsed / n * 1e6, len(ctx.captured_queries) / n
+
+        uncached_us, uncached_q = run(cached=False)
+        cached_us, cached_q = run(cached=True)
+        self.stdout.write(f"uncached: {uncached_us:9.1f} us/check  {uncached_q:.3f} queries/check")
+        self.stdout.write(f"cached:   {cached_us:9.1f} us/check  {cached_q:.3f} queries/check")
+        self.stdout.write(self.style.SUCCESS(f"saved {uncached_us - cached_us:.1f} us and {uncached_q - cached_q:.3f} queries per request"))
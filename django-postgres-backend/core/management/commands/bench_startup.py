@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+DEFAULT_URLS = ("/api/health/", "/api/v1/catalog/uoms/", "/api/v1/dashboard/summary/")
+
+
+def child():
+    """Entry point of the measured process: cold django.setup(), optional warm-up, then requests."""
+    opts = json.loads(sys.argv[1])
+    start = time.perf_counter()
+    import django
+
+    django.setup()
+    result = {"setup_ms": (time.perf_counter() - start) * 1000, "warmup_ms": 0.0, "requests": []}
+
+    if opts["warm"]:
+        from core.warmup import warm_up
+
+        t = time.perf_counter()
+        warm_up(background_imports=False)
+        result["warmup_ms"] = (time.perf_counter() - t) * 1000
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    hosts = [h for h in settings.ALLOWED_HOSTS if h != "*" and not h.startswith((".", "*."))]
+    client = Client(HTTP_HOST=hosts[0] if hosts else "localhost")
+    if opts["username"]:
+        client.force_login(get_user_model().objects.get(username=opts["username"]))
+
+    ready = time.perf_counter()
+    for url in opts["urls"]:
+        timings = []
+        for _ in range(2):
+            t = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - t) * 1000)
+        result["requests"].append({"url": url, "status": response.status_code, "first_ms": timings[0], "second_ms": timings[1]})
+    result["first_response_ms"] = result["setup_ms"] + result["warmup_ms"] + result["requests"][0]["first_ms"]
+    result["all_first_ms"] = (time.perf_counter() - ready) * 1000
+    print(json.dumps(result))
+
+
+class Command(BaseCommand):
+    help = "Measure cold worker start-up and first responses with and without core.warmup"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=3)
+        parser.add_argument("--username", help="Session-authenticate the requests as this user")
+        parser.add_argument("--url", action="append", dest="urls", help="URL to request (repeatable)")
+
+    def _run(self, warm: bool, urls, username) -> dict:
+        opts = json.dumps({"warm": warm, "urls": urls, "username": username})
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)}
+        out = subprocess.run(
+            [sys.executable, "-c", "from core.management.commands.bench_startup import child; child()", opts],
+            cwd=Path(settings.BASE_DIR),
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        urls = options["urls"] or list(DEFAULT_URLS)
+        runs = max(1, options["runs"])
+        for warm in (False, True):
+            results = [self._run(warm, urls, options["username"]) for _ in range(runs)]
+            best = min(results, key=lambda r: r["first_response_ms"])
+            label = "warm" if warm else "cold"
+            self.stdout.write(
+                f"{label}: setup {best['setup_ms']:7.1f} ms  warm-up {best['warmup_ms']:7.1f} ms  "
+                f"first response {best['first_response_ms']:7.1f} ms (best of {runs})"
+            )
+            for req in best["requests"]:
+                self.stdout.write(
+                    f"    {req['url']:<40} {req['status']}  first {req['first_ms']:7.1f} ms  second {req['second_ms']:7.1f} ms"
+                )
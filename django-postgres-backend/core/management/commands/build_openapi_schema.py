@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.schema import build_schema_cache, load_schema_cache, schema_cache_dir, schema_version
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema once and store it (plain + gzip) for /api/schema/"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-stale",
+            action="store_true",
+            help="Only regenerate when the stored schema was built from a different code version",
+        )
+
+    def handle(self, *args, **options):
+        if options["if_stale"] and load_schema_cache() is not None:
+            self.stdout.write(f"schema cache is current (version {schema_version()})")
+            return
+        start = time.perf_counter()
+        entries = build_schema_cache()
+        elapsed = time.perf_counter() - start
+        sizes = ", ".join(f"{fmt} {len(e['body']) // 1024} KB -> {len(e['gzip']) // 1024} KB gz" for fmt, e in entries.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"built schema version {schema_version()} in {elapsed:.1f}s into {schema_cache_dir()} ({sizes})"
+        ))
@@ -0,0 +1,177 @@
+"""Process-wide read-through cache for small master tables.
+
+Categories, medicine forms, UoMs, payment methods, rack locations/rules and locations are
+tiny and rarely change, yet import lines, product saves and invoices look them up one row
+at a time. Each ``MasterTable`` keeps the whole table in memory together with lookup
+indexes, validated against its ChangeVersion scope (bumped by ``core.signals`` on every
+save/delete, in any process) once per request and at most every RECHECK_SECONDS otherwise.
+
+Cached instances are shared between threads and requests: treat them as read-only.
+A process that writes a master inside a transaction reads through to the database until
+that transaction commits, so uncommitted rows never reach the shared cache.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from rest_framework.response import Response
+
+from .models import ChangeVersion
+
+RECHECK_SECONDS = 5.0
+RESPONSE_CACHE_SIZE = 64
+
+_tables: dict[str, "MasterTable"] = {}
+_versions: dict[str, int] = {}
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _refresh_versions() -> None:
+    """Read every master scope's version in one query, at most every RECHECK_SECONDS."""
+    global _checked_at
+    now = time.monotonic()
+    if now - _checked_at < RECHECK_SECONDS:
+        return
+    scopes = {table.scope for table in _tables.values()}
+    rows = dict(ChangeVersion.objects.filter(scope__in=scopes).values_list("scope", "version"))
+    _versions.update({scope: rows.get(scope, 0) for scope in scopes})
+    _checked_at = now
+
+
+def expire_master_check(**kwargs) -> None:
+    """Force a version check on the next read; connected to request_started."""
+    global _checked_at
+    _checked_at = 0.0
+
+
+class MasterTable:
+    def __init__(self, label: str, scope: str, indexes: dict | None = None):
+        self.label = label
+        self.scope = scope
+        # index name -> key function; rows whose key is None are left out, the lowest pk wins
+        self.indexes = {"pk": lambda obj: obj.pk, **(indexes or {})}
+        self._state: dict | None = None
+        self._dirty = False
+        self._responses: OrderedDict = OrderedDict()
+        _tables[label] = self
+
+    @property
+    def model(self):
+        return apps.get_model(self.label)
+
+    def _build(self, version) -> dict:
+        rows = list(self.model._default_manager.order_by("pk"))
+        state = {"version": version, "rows": rows, "indexes": {}}
+        for name, key in self.indexes.items():
+            index = state["indexes"][name] = {}
+            for obj in rows:
+                k = key(obj)
+                if k is not None:
+                    index.setdefault(k, obj)
+        return state
+
+    def _current(self) -> tuple[dict, bool]:
+        """Return (state, shared): a fresh private read while this process has uncommitted writes."""
+        if self._dirty:
+            if connection.in_atomic_block:
+                return self._build(None), False
+            self._dirty = False
+            self._state = None
+        with _lock:
+            _refresh_versions()
+            version = _versions.get(self.scope, 0)
+            state = self._state
+            if state is None or state["version"] != version:
+                state = self._state = self._build(version)
+                self._responses.clear()
+        return state, True
+
+    def all(self) -> list:
+        return list(self._current()[0]["rows"])
+
+    def get(self, pk):
+        """Row by primary key, or None."""
+        try:
+            pk = self.model._meta.pk.to_python(pk)
+        except ValidationError:
+            return None
+        return self.lookup("pk", pk)
+
+    def lookup(self, index: str, key):
+        return self._current()[0]["indexes"][index].get(key)
+
+    def cached_response(self, key: str, build):
+        """Serve ``build()`` (response data) from a small per-version cache keyed by ``key``."""
+        state, shared = self._current()
+        if not shared:
+            return build()
+        with _lock:
+            if state is self._state and key in self._responses:
+                self._responses.move_to_end(key)
+                return self._responses[key]
+        data = build()
+        with _lock:
+            if state is self._state:
+                self._responses[key] = data
+                while len(self._responses) > RESPONSE_CACHE_SIZE:
+                    self._responses.popitem(last=False)
+        return data
+
+    def invalidate(self, **kwargs) -> None:
+        """Drop this process's copy; connected to the model's saves and deletes."""
+        self._state = None
+        self._responses.clear()
+        if connection.in_atomic_block:
+            self._dirty = True
+            transaction.on_commit(self._clear_dirty)
+
+    def _clear_dirty(self) -> None:
+        self._state = None
+        self._dirty = False
+
+
+def _name(obj):
+    return obj.name
+
+
+def _name_ci(obj):
+    return (obj.name or "").lower()
+
+
+categories = MasterTable("catalog.ProductCategory", "category", {"name": _name})
+medicine_forms = MasterTable("catalog.MedicineForm", "form", {"name": _name})
+uoms = MasterTable("catalog.Uom", "uom", {"name_ci": _name_ci})
+payment_methods = MasterTable("settingsx.PaymentMethod", "payment_method", {"name": _name})
+rack_locations = MasterTable("inventory.RackLocation", "rack", {"name": _name})
+rack_rules = MasterTable(
+    "inventory.RackRule",
+    "rack_rule",
+    {"manufacturer_ci": lambda r: (r.location_id, r.manufacturer_name.lower()) if r.is_active else None},
+)
+locations = MasterTable("locations.Location", "locations", {"code": lambda loc: loc.code})
+
+
+def master_tables() -> dict[str, MasterTable]:
+    return dict(_tables)
+
+
+class MasterListMixin:
+    """ViewSet mixin serving ``list`` responses from the table's cache (keyed by full URL).
+
+    Filtering, ordering and pagination still run on a miss, so the payload is identical.
+    """
+
+    master_table: MasterTable
+
+    def list(self, request, *args, **kwargs):
+        data = self.master_table.cached_response(
+            request.build_absolute_uri(),
+            lambda: super(MasterListMixin, self).list(request, *args, **kwargs).data,
+        )
+        return Response(data)
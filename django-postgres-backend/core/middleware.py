@@ -1,52 +1,91 @@
 """
-Custom middleware for handling Azure App Service internal requests
+Custom middleware: host validation, query stats and the request-scoped identity map
 """
-from django.core.exceptions import DisallowedHost
+from django.core.exceptions import DisallowedHost, MiddlewareNotUsed
 from django.conf import settings
-import os
+from django.db import connection
+from django.http.request import split_domain_port
+import logging
+import time
 
+from .hosts import HostMatcher
+from .loaders import identity_scope
+from .querystats import QueryCounter, registry
 
-class AzureInternalIPMiddleware:
+logger = logging.getLogger(__name__)
+
+
+class HostValidationMiddleware:
     """
-    Middleware to allow Azure internal IP addresses (169.254.x.x) for health probes
-    and load balancer checks.
-    
-    This middleware runs before CommonMiddleware and adds Azure internal IPs to
-    ALLOWED_HOSTS if they're not already present.
+    Validates the Host header against ALLOWED_HOSTS with a matcher compiled once (see
+    core.hosts) and accepts Azure's internal probe addresses (169.254.x.x) by the ranges in
+    ALLOWED_HOST_NETWORKS, instead of appending them to settings.ALLOWED_HOSTS per request.
+
+    Django's own ALLOWED_HOSTS check stays in force; for a probe address this binds the
+    request's ``get_host`` to the validated host so later middleware accepts it.
     """
-    
+
     def __init__(self, get_response):
         self.get_response = get_response
-        # Check if we're on Azure
-        self.is_azure = bool(os.environ.get("WEBSITE_HOSTNAME"))
-    
+        patterns = settings.ALLOWED_HOSTS
+        if settings.DEBUG and not patterns:
+            patterns = [".localhost", "127.0.0.1", "[::1]"]
+        self.matcher = HostMatcher(patterns, getattr(settings, "ALLOWED_HOST_NETWORKS", ()))
+
     def __call__(self, request):
-        # Only run on Azure
-        if self.is_azure:
-            # Check if the host is an Azure internal IP (169.254.x.x)
-            host = request.get_host().split(':')[0]  # Remove port if present
-            
-            if host.startswith('169.254.'):
-                # This is an Azure internal IP - add it to ALLOWED_HOSTS if not present
-                # Convert to list if needed
-                current_hosts = list(settings.ALLOWED_HOSTS) if isinstance(settings.ALLOWED_HOSTS, (list, tuple)) else []
-                
-                if host not in current_hosts and '*' not in current_hosts:
-                    # Add the host to ALLOWED_HOSTS for this request
-                    settings.ALLOWED_HOSTS = current_hosts + [host]
-        
-        try:
+        host = request._get_raw_host()
+        domain, port = split_domain_port(host)
+        if not domain or not self.matcher(domain):
+            raise DisallowedHost(f"Invalid HTTP_HOST header: {host!r}.")
+        if self.matcher.in_networks(domain):
+            request.get_host = lambda: host
+        return self.get_response(request)
+
+
+class QueryStatsMiddleware:
+    """
+    Records query count, DB time and total time per resolved view into ``core.querystats.registry``.
+
+    Enabled with QUERY_STATS_ENABLED; when off the middleware removes itself at startup.
+    QUERY_STATS_HEADER adds the figures to each response (X-Query-Count and Server-Timing),
+    and QUERY_STATS_BUDGET logs a warning for requests issuing more queries than the budget.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_STATS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.add_header = getattr(settings, "QUERY_STATS_HEADER", False)
+        self.budget = getattr(settings, "QUERY_STATS_BUDGET", 0)
+        registry.window = getattr(settings, "QUERY_STATS_WINDOW", registry.window)
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
             response = self.get_response(request)
-        except DisallowedHost as e:
-            # If we still get DisallowedHost for an Azure IP, allow it
-            host = request.get_host().split(':')[0]
-            if self.is_azure and host.startswith('169.254.'):
-                # Re-add to ALLOWED_HOSTS and retry
-                current_hosts = list(settings.ALLOWED_HOSTS) if isinstance(settings.ALLOWED_HOSTS, (list, tuple)) else []
-                settings.ALLOWED_HOSTS = current_hosts + [host]
-                response = self.get_response(request)
-            else:
-                raise
-        
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = counter.db_seconds * 1000
+
+        match = getattr(request, "resolver_match", None)
+        if match is not None:
+            key = f"{request.method} {match.view_name or match._func_path}"
+            registry.record(key, counter.count, db_ms, total_ms)
+            if self.budget and counter.count > self.budget:
+                logger.warning("%s issued %s queries (budget %s): %s", key, counter.count, self.budget, request.path)
+
+        if self.add_header:
+            response["X-Query-Count"] = str(counter.count)
+            response["Server-Timing"] = f"db;dur={db_ms:.1f}, total;dur={total_ms:.1f}"
         return response
 
+
+class IdentityMapMiddleware:
+    """Opens a ``core.loaders.identity_scope`` per request so services share master data lookups."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_scope():
+            return self.get_response(request)
@@ -1,4 +1,8 @@
-from django.db import models
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, models
 from django.utils import timezone
 
 
@@ -42,6 +46,54 @@ class SystemLicense(models.Model):
         return max(0, (self.valid_to - today).days)
 
 
+class ChangeVersion(models.Model):
+    """Monotonic counter per data scope (e.g. ``location:3``, ``product``), bumped whenever that data changes."""
+
+    scope = models.CharField(max_length=64, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"{self.scope}@{self.version}"
+
+
 def get_current_license():
     return SystemLicense.objects.filter(status=SystemLicense.Status.ACTIVE).order_by("-valid_to").first()
 
+
+# (is_active, monotonic deadline) of the last committed license read in this process
+_license_state: tuple[bool, float] | None = None
+
+
+def license_is_active() -> bool:
+    """Whether an active license covers today, cached per process.
+
+    The cached answer is reused until the earlier of LICENSE_CACHE_SECONDS and the end of the
+    license's last valid day, and dropped on any SystemLicense save or delete. Reads made inside
+    a transaction are not cached, so uncommitted or rolled-back licenses never leak.
+    """
+    global _license_state
+    state = _license_state
+    now = time.monotonic()
+    if state is not None and now < state[1]:
+        return state[0]
+
+    license_obj = get_current_license()
+    active = bool(license_obj and license_obj.is_active)
+    if connection.in_atomic_block:
+        return active
+
+    ttl = float(getattr(settings, "LICENSE_CACHE_SECONDS", 60))
+    if license_obj is not None:
+        today = timezone.localdate()
+        boundary = license_obj.valid_to + timedelta(days=1) if active else license_obj.valid_from
+        if boundary > today:
+            until = timezone.make_aware(datetime.combine(boundary, datetime.min.time())) - timezone.now()
+            ttl = min(ttl, max(until.total_seconds(), 0.0))
+    _license_state = (active, now + ttl)
+    return active
+
+
+def invalidate_license_cache(**kwargs) -> None:
+    global _license_state
+    _license_state = None
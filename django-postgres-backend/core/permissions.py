@@ -1,6 +1,6 @@
 from rest_framework.permissions import BasePermission, IsAuthenticatedOrReadOnly as DRFIsAuthenticatedOrReadOnly
 
-from .models import get_current_license
+from .models import license_is_active
 
 
 class IsAuthenticatedOrReadOnly(DRFIsAuthenticatedOrReadOnly):
@@ -13,6 +13,7 @@ class HasActiveSystemLicense(BasePermission):
     )
 
     def has_permission(self, request, view):
-        license_obj = get_current_license()
-        return bool(license_obj and license_obj.is_active)
+        # The token's license_valid_to claim is not trusted here: refreshed tokens keep the end date
+        # from login, so it goes stale when the license is renewed. license_is_active() is cached.
+        return license_is_active()
 
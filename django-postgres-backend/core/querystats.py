@@ -0,0 +1,76 @@
+"""In-memory per-view query and timing samples, fed by ``core.middleware.QueryStatsMiddleware``.
+
+Samples live in the worker process only: each gunicorn worker reports its own window.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+
+
+class QueryCounter:
+    """``connection.execute_wrapper`` hook counting queries and the time spent in them."""
+
+    __slots__ = ("count", "db_seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.db_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.count += 1
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class QueryStatsRegistry:
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque] = {}
+        self._totals: dict[str, int] = {}
+
+    def record(self, key: str, queries: int, db_ms: float, total_ms: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append((queries, db_ms, total_ms))
+            self._totals[key] = self._totals.get(key, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            items = [(key, list(samples), self._totals[key]) for key, samples in self._samples.items()]
+        out = []
+        for key, samples, total in items:
+            row = {"view": key, "requests": total, "window": len(samples)}
+            for idx, name in enumerate(("queries", "db_ms", "total_ms")):
+                values = sorted(s[idx] for s in samples)
+                row[name] = {
+                    "p50": round(_percentile(values, 50), 2),
+                    "p95": round(_percentile(values, 95), 2),
+                    "p99": round(_percentile(values, 99), 2),
+                    "max": round(values[-1], 2),
+                }
+            out.append(row)
+        out.sort(key=lambda r: r["queries"]["p95"], reverse=True)
+        return out
+
+
+registry = QueryStatsRegistry()
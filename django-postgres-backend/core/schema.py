@@ -1,6 +1,14 @@
+import gzip
+import hashlib
+import json
+import logging
 import os
 import re
+import threading
+from pathlib import Path
 
+import drf_spectacular
+from django.conf import settings
 from drf_spectacular.generators import SchemaGenerator as BaseSchemaGenerator, AutoSchema
 from drf_spectacular.plumbing import (
     camelize_operation,
@@ -12,6 +20,8 @@ from drf_spectacular.plumbing import (
 )
 from drf_spectacular.settings import spectacular_settings
 
+logger = logging.getLogger(__name__)
+
 
 class CustomSchemaGenerator(BaseSchemaGenerator):
     """
@@ -93,3 +103,112 @@ class CustomSchemaGenerator(BaseSchemaGenerator):
             result[path][method.lower()] = operation
 
         return result
+
+
+# ---------------------------------------------------------------------------
+# Pre-built schema cache
+# ---------------------------------------------------------------------------
+# Walking every endpoint is slow on small instances, so the schema is generated once per deploy
+# (``manage.py build_openapi_schema``) into OPENAPI_SCHEMA_CACHE_DIR as plain and gzipped bytes.
+# The files carry the code version they were built from; a worker that finds a different version
+# (or no files) rebuilds them once instead of generating on every request.
+
+SCHEMA_FORMATS = ("yaml", "json")
+_SOURCE_DIRS = ("apps", "core", "pharmacy_backend")
+
+_code_version = None
+_memory: dict | None = None
+_build_lock = threading.Lock()
+
+
+def schema_cache_dir() -> Path:
+    return Path(getattr(settings, "OPENAPI_SCHEMA_CACHE_DIR", Path(settings.BASE_DIR) / "var" / "openapi"))
+
+
+def schema_version() -> str:
+    """Fingerprint of everything the schema is generated from: source files and spectacular settings."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha1()
+        digest.update(drf_spectacular.__version__.encode())
+        digest.update(repr(sorted(getattr(settings, "SPECTACULAR_SETTINGS", {}).items())).encode())
+        base = Path(settings.BASE_DIR)
+        for top in _SOURCE_DIRS:
+            for path in sorted((base / top).rglob("*.py")):
+                if "tests" in path.parts or "migrations" in path.parts:
+                    continue
+                digest.update(str(path.relative_to(base)).encode())
+                digest.update(path.read_bytes())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def _renderer(fmt):
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+    return {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}[fmt]()
+
+
+def _write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _render_schema() -> dict:
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    entries = {}
+    for fmt in SCHEMA_FORMATS:
+        body = _renderer(fmt).render(schema, renderer_context={})
+        entries[fmt] = {"etag": hashlib.md5(body).hexdigest(), "body": body, "gzip": gzip.compress(body, mtime=0)}
+    return entries
+
+
+def build_schema_cache() -> dict:
+    """Generate the schema and write every format (plain + gzip) plus meta.json; returns the entries."""
+    entries = _render_schema()
+    directory = schema_cache_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    for fmt, entry in entries.items():
+        _write(directory / f"schema.{fmt}", entry["body"])
+        _write(directory / f"schema.{fmt}.gz", entry["gzip"])
+    meta = {"version": schema_version(), "etags": {fmt: entry["etag"] for fmt, entry in entries.items()}}
+    _write(directory / "meta.json", json.dumps(meta).encode())
+    return entries
+
+
+def load_schema_cache() -> dict | None:
+    """The built entries, or None when the files are missing or were built from other code."""
+    directory = schema_cache_dir()
+    try:
+        meta = json.loads((directory / "meta.json").read_bytes())
+        if meta.get("version") != schema_version():
+            return None
+        return {
+            fmt: {
+                "etag": meta["etags"][fmt],
+                "body": (directory / f"schema.{fmt}").read_bytes(),
+                "gzip": (directory / f"schema.{fmt}.gz").read_bytes(),
+            }
+            for fmt in SCHEMA_FORMATS
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def cached_schema(fmt: str) -> dict:
+    """``{"etag", "body", "gzip"}`` for ``fmt``, regenerating only on a version mismatch."""
+    global _memory
+    if _memory is None:
+        with _build_lock:
+            if _memory is None:
+                entries = load_schema_cache()
+                if entries is None:
+                    try:
+                        entries = build_schema_cache()
+                    except OSError:
+                        logger.warning("could not write the schema cache to %s; serving from memory", schema_cache_dir())
+                        entries = _render_schema()
+                _memory = entries
+    return _memory[fmt]
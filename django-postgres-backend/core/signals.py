@@ -0,0 +1,71 @@
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
+
+from .loaders import forget_deleted, forget_saved
+from .mastercache import expire_master_check, master_tables
+from .models import invalidate_license_cache
+from .versions import bump
+
+# Master data: any change invalidates every response that renders it
+MODEL_SCOPES = {
+    "catalog.Product": "product",
+    "catalog.ProductCategory": "category",
+    "catalog.Uom": "uom",
+    "catalog.MedicineForm": "form",
+    "catalog.BatchLot": "batch",
+    "inventory.RackLocation": "rack",
+    "inventory.RackRule": "rack_rule",
+    "locations.Location": "locations",
+    "settingsx.PaymentMethod": "payment_method",
+    "settingsx.SettingKV": "settings",
+    "settingsx.AlertThresholds": "settings",
+    "settingsx.TaxBillingSettings": "settings",
+    "customers.Customer": "customer",
+    "procurement.Vendor": "vendor",
+}
+
+# Per-location high-water marks: stock movements and postings
+LOCATION_MODELS = (
+    "inventory.InventoryMovement",
+    "inventory.BatchStock",
+    "sales.SalesInvoice",
+    "procurement.GoodsReceipt",
+    "procurement.Purchase",
+)
+
+# Rows served by the request-scoped identity map (core.loaders)
+IDENTITY_MODELS = (
+    "catalog.Product",
+    "catalog.BatchLot",
+    "catalog.Uom",
+    "catalog.VendorProductCode",
+    "locations.Location",
+)
+
+
+def _bump_model_scope(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump(MODEL_SCOPES[sender._meta.label])
+
+
+def _bump_location(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump(f"location:{instance.location_id}")
+
+
+def connect():
+    post_save.connect(invalidate_license_cache, sender="core.SystemLicense", dispatch_uid="license-cache:save")
+    post_delete.connect(invalidate_license_cache, sender="core.SystemLicense", dispatch_uid="license-cache:delete")
+    for label in MODEL_SCOPES:
+        post_save.connect(_bump_model_scope, sender=label, dispatch_uid=f"versions:{label}:save")
+        post_delete.connect(_bump_model_scope, sender=label, dispatch_uid=f"versions:{label}:delete")
+    for label in LOCATION_MODELS:
+        post_save.connect(_bump_location, sender=label, dispatch_uid=f"versions:{label}:save")
+        post_delete.connect(_bump_location, sender=label, dispatch_uid=f"versions:{label}:delete")
+    for label in IDENTITY_MODELS:
+        post_save.connect(forget_saved, sender=label, dispatch_uid=f"identity-map:{label}:save")
+        post_delete.connect(forget_deleted, sender=label, dispatch_uid=f"identity-map:{label}:delete")
+    for label, table in master_tables().items():
+        post_save.connect(table.invalidate, sender=label, dispatch_uid=f"master-cache:{label}:save")
+        post_delete.connect(table.invalidate, sender=label, dispatch_uid=f"master-cache:{label}:delete")
+    request_started.connect(expire_master_check, dispatch_uid="master-cache:request")
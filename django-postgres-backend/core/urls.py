@@ -5,4 +5,5 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('api/_health', views.health, name='health'),
+    path('api/_query-stats', views.QueryStatsView.as_view(), name='query-stats'),
 ]
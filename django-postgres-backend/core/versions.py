@@ -0,0 +1,136 @@
+"""Change versions for conditional GET.
+
+Writers bump a counter per scope (see ``core.signals``); read-heavy views derive an ETag and
+Last-Modified from the counters they depend on and answer ``304 Not Modified`` before running
+their queries when the client already holds the current representation.
+"""
+from __future__ import annotations
+
+import hashlib
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.http import HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, quote_etag
+
+from .models import ChangeVersion
+
+ALL_LOCATIONS = "location:*"
+MASTER_SCOPES = ("product", "category", "uom", "form", "payment_method")
+STOCK_SCOPES = MASTER_SCOPES + ("batch", "rack", "settings")
+
+
+def location_scope(location_id) -> str:
+    """Scope for one location's stock and postings; falls back to all locations when not given."""
+    try:
+        return f"location:{int(location_id)}"
+    except (TypeError, ValueError):
+        return ALL_LOCATIONS
+
+
+def location_scopes(*extra: str, all_locations: bool = False):
+    """``scopes_func`` for stock views filtered by an optional ``location_id`` query parameter."""
+
+    def scopes(view, request):
+        location = ALL_LOCATIONS if all_locations else location_scope(request.query_params.get("location_id"))
+        return [location, *STOCK_SCOPES, *extra]
+
+    return scopes
+
+
+def _write_bumps(scopes) -> None:
+    now = timezone.now()
+    for scope in sorted(set(scopes)):
+        if ChangeVersion.objects.filter(scope=scope).update(version=F("version") + 1, updated_at=now):
+            continue
+        try:
+            with transaction.atomic():
+                ChangeVersion.objects.create(scope=scope, version=1, updated_at=now)
+        except IntegrityError:
+            ChangeVersion.objects.filter(scope=scope).update(version=F("version") + 1, updated_at=now)
+
+
+def _flush_bumps(conn) -> None:
+    pending = getattr(conn, "pending_version_bumps", None)
+    if pending:
+        conn.pending_version_bumps = set()
+        _write_bumps(pending)
+
+
+def bump(*scopes: str) -> None:
+    """Advance the scopes' counters, once the current transaction commits.
+
+    Inside a transaction the scopes are collected on the connection and written in one sorted
+    pass after commit, so writers never hold the shared rows (``product``, ``settings``, ...)
+    locked for the rest of their transaction or take them in differing orders. Scopes of a
+    rolled back transaction go out with the next commit, which only costs a revalidation.
+    """
+    conn = transaction.get_connection()
+    if not conn.in_atomic_block:
+        _write_bumps(scopes)
+        return
+    pending = getattr(conn, "pending_version_bumps", None)
+    if pending is None:
+        pending = conn.pending_version_bumps = set()
+    pending.update(scopes)
+    # Registered on every call, as a rolled back savepoint drops its callbacks; the first to run
+    # writes all pending scopes and the rest find nothing left
+    transaction.on_commit(lambda: _flush_bumps(conn))
+
+
+def current_versions(scopes) -> tuple[str, object]:
+    """Return a stable fingerprint of the given scopes and their latest change time (or None).
+
+    ``location:*`` folds in every location counter.
+    """
+    scopes = sorted(set(scopes))
+    cond = Q(scope__in=scopes)
+    if ALL_LOCATIONS in scopes:
+        cond |= Q(scope__startswith="location:")
+    rows = sorted(ChangeVersion.objects.filter(cond).values_list("scope", "version", "updated_at"))
+    fingerprint = ",".join(scopes) + "|" + ",".join(f"{scope}={version}" for scope, version, _ in rows)
+    last_modified = max((updated for _, _, updated in rows), default=None)
+    return fingerprint, last_modified
+
+
+def conditional_get(scopes_func):
+    """Decorate an APIView ``get`` with ETag/Last-Modified validation.
+
+    ``scopes_func(view, request)`` returns the scopes the response depends on, or None to skip
+    validation. Last-Modified is informational; only If-None-Match is honoured. The ETag also covers the path with query string, the user and the local date, so
+    "today" based figures roll over at midnight.
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            scopes = scopes_func(self, request)
+            if scopes is None:
+                return handler(self, request, *args, **kwargs)
+
+            fingerprint, last_modified = current_versions(scopes)
+            raw = "|".join(
+                [request.get_full_path(), str(getattr(request.user, "pk", "")), str(timezone.localdate()), fingerprint]
+            )
+            etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+            last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+            # Only the ETag is validated: If-Modified-Since has one-second resolution and no date
+            # component, so it would answer 304 for same-second writes and across midnight
+            if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+            not_modified = bool(if_none_match) and (etag in parse_etags(if_none_match) or if_none_match.strip() == "*")
+
+            response = HttpResponseNotModified() if not_modified else handler(self, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response["ETag"] = etag
+                if last_modified_ts:
+                    response["Last-Modified"] = http_date(last_modified_ts)
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -1,7 +1,16 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema, OpenApiTypes
+from drf_spectacular.views import SpectacularAPIView
+from django.conf import settings
+
+from .querystats import registry
+from .schema import cached_schema
 
 
 def home(request):
@@ -19,3 +28,51 @@ class HealthCheckView(APIView):
     def get(self, request):
         return Response({"status": "ok"})
 
+
+
+class QueryStatsView(APIView):
+    """Per-view query count and timing percentiles collected by QueryStatsMiddleware in this worker."""
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(tags=["Health"], summary="Per-view query stats", responses={200: OpenApiTypes.OBJECT})
+    def get(self, request):
+        return Response({
+            "enabled": getattr(settings, "QUERY_STATS_ENABLED", False),
+            "window": registry.window,
+            "views": registry.snapshot(),
+        })
+
+    @extend_schema(tags=["Health"], summary="Reset per-view query stats", responses={204: None})
+    def delete(self, request):
+        registry.reset()
+        return Response(status=204)
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """Serves the pre-built OpenAPI schema (``manage.py build_openapi_schema``) with an ETag.
+
+    ``?lang=`` and ``?version=`` requests fall back to generating the schema on the fly.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("lang") or request.GET.get("version"):
+            return super().get(request, *args, **kwargs)
+        renderer = request.accepted_renderer
+        entry = cached_schema(renderer.format)
+        etag = quote_etag(entry["etag"])
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match and (if_none_match.strip() == "*" or etag in parse_etags(if_none_match)):
+            response = HttpResponseNotModified()
+        elif "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", ""):
+            response = HttpResponse(entry["gzip"])
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(entry["body"])
+        if response.status_code == 200:
+            charset = f"; charset={renderer.charset}" if renderer.charset else ""
+            response["Content-Type"] = f"{renderer.media_type}{charset}"
+            response["Content-Disposition"] = f'inline; filename="{spectacular_settings.TITLE or "schema"}.{renderer.format}"'
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
@@ -0,0 +1,78 @@
+"""Worker warm-up.
+
+Run once per worker right after it boots (``gunicorn.conf.py`` calls ``warm_up`` from
+``post_worker_init``) so the first real requests do not pay for opening the DB connection,
+building the URL resolver, filling the settings, license and master-data caches and
+loading the pre-built OpenAPI schema.
+Heavy optional libraries (Excel/PDF/OCR) are imported on a daemon thread so the worker
+starts accepting requests without waiting for them.
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.urls import get_resolver
+
+from .schema import cached_schema
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMPORTS = ("openpyxl", "pdfplumber", "pytesseract", "PIL.Image")
+
+
+def _prime_caches() -> None:
+    from apps.settingsx.services import settings_snapshot
+
+    from .mastercache import master_tables
+    from .models import license_is_active
+
+    license_is_active()
+    settings_snapshot()
+    for table in master_tables().values():
+        table.all()
+
+
+def import_modules(names) -> dict[str, float]:
+    """Import each module, returning the seconds it took (-1 when it is not installed)."""
+    timings = {}
+    for name in names:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception:
+            timings[name] = -1.0
+            continue
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def warm_up(*, background_imports: bool = True) -> dict[str, float]:
+    """Open the DB connection, load the URLconf and prime process caches; returns step timings."""
+    timings: dict[str, float] = {}
+
+    def step(name, func):
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            logger.exception("warm-up step %s failed", name)
+        timings[name] = time.perf_counter() - start
+
+    step("db", connection.ensure_connection)
+    step("urls", lambda: get_resolver().url_patterns)
+    step("caches", _prime_caches)
+    step("schema", lambda: cached_schema("yaml"))
+
+    names = getattr(settings, "WARMUP_IMPORTS", DEFAULT_IMPORTS)
+    if background_imports:
+        threading.Thread(target=import_modules, args=(names,), name="warmup-imports", daemon=True).start()
+    else:
+        step("imports", lambda: import_modules(names))
+
+    logger.info("worker warm-up: %s", ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
+    return timings
@@ -0,0 +1,11 @@
+# Gunicorn settings; startup.sh passes the bind/timeout/worker flags on the command line.
+import os
+
+
+def post_worker_init(worker):
+    """Warm each worker (DB connection, URLconf, caches) before it takes traffic."""
+    if os.environ.get("WARMUP_ENABLED", "True").lower() != "true":
+        return
+    from core.warmup import warm_up
+
+    warm_up()
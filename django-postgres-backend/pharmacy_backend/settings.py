@@ -98,10 +98,16 @@ azure_indicators = [
 
 IS_AZURE = IS_AZURE or any(azure_indicators)
 
+# CIDR ranges accepted as Host besides ALLOWED_HOSTS; both are compiled once by
+# core.middleware.HostValidationMiddleware, and Django's own ALLOWED_HOSTS check still applies
+# to everything outside the ranges.
+ALLOWED_HOST_NETWORKS = []
+
 if IS_AZURE:
     # Azure: Default includes localhost and Azure internal IP ranges
     # Azure uses 169.254.x.x for internal health probes and load balancer checks
-    default_hosts = "localhost,127.0.0.1,*.azurewebsites.net"
+    # The app's own *.azurewebsites.net name comes from WEBSITE_HOSTNAME below
+    default_hosts = "localhost,127.0.0.1"
     
     # Get ALLOWED_HOSTS from environment variable or use defaults
     allowed_hosts_str = os.environ.get("ALLOWED_HOSTS", default_hosts)
@@ -121,16 +127,8 @@ if IS_AZURE:
             if plain_hostname not in ALLOWED_HOSTS:
                 ALLOWED_HOSTS.append(plain_hostname)
     
-    # Allow Azure internal IPs (169.254.x.x range for health probes)
-    # Note: Django doesn't support wildcards in IPs, so we'll use a middleware workaround
-    # But for now, add common Azure probe IPs
-    azure_probe_ips = [
-        "169.254.130.1", "169.254.130.2", "169.254.130.3", "169.254.130.4",
-        "169.254.129.1", "169.254.129.2", "169.254.129.3", "169.254.129.4",
-    ]
-    for ip in azure_probe_ips:
-        if ip not in ALLOWED_HOSTS:
-            ALLOWED_HOSTS.append(ip)
+    # Allow Azure internal IPs (169.254.x.x range for health probes and load balancer checks)
+    ALLOWED_HOST_NETWORKS = ["169.254.0.0/16"]
     
     # In Azure, if DEBUG is True and no explicit ALLOWED_HOSTS is set, allow all for easier debugging
     if DEBUG and not os.environ.get("ALLOWED_HOSTS"):
@@ -178,9 +176,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.HostValidationMiddleware',  # Must stay first: admits probe ranges before get_host() is used
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
-    'core.middleware.AzureInternalIPMiddleware',  # Handle Azure internal IPs before CommonMiddleware
+    'core.middleware.QueryStatsMiddleware',  # No-op unless QUERY_STATS_ENABLED
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -189,8 +188,21 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'apps.governance.middleware.RequestIdMiddleware',
+    'core.middleware.IdentityMapMiddleware',
 ]
 
+# Modules core.warmup imports on a background thread when a gunicorn worker boots
+WARMUP_IMPORTS = ("openpyxl", "pdfplumber", "pytesseract", "PIL.Image")
+
+# Seconds a worker trusts its cached license check (core.models.license_is_active)
+LICENSE_CACHE_SECONDS = int(os.environ.get("LICENSE_CACHE_SECONDS", "60"))
+
+# Per-view query count / timing stats (core.middleware.QueryStatsMiddleware, GET /api/_query-stats)
+QUERY_STATS_ENABLED = os.environ.get("QUERY_STATS_ENABLED", "False").lower() == "true"
+QUERY_STATS_HEADER = os.environ.get("QUERY_STATS_HEADER", "False").lower() == "true"
+QUERY_STATS_WINDOW = int(os.environ.get("QUERY_STATS_WINDOW", "500"))
+QUERY_STATS_BUDGET = int(os.environ.get("QUERY_STATS_BUDGET", "0"))
+
 ROOT_URLCONF = 'pharmacy_backend.urls'
 
 TEMPLATES = [
@@ -298,9 +310,15 @@ else:
             "http://127.0.0.1:5173",
         ])
 
+JWT_CLAIMS_AUTH = os.environ.get("JWT_CLAIMS_AUTH", "True").lower() == "true"
+# Seconds a worker trusts its cached active/staff state of a token's user
+JWT_REVOCATION_CACHE_SECONDS = int(os.environ.get("JWT_REVOCATION_CACHE_SECONDS", "30"))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Trusts the claims LoginView signs into tokens; set JWT_CLAIMS_AUTH=false to load the user every request
+        'apps.accounts.authentication.ClaimsJWTAuthentication' if JWT_CLAIMS_AUTH
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -336,6 +354,26 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Pre-built schema served by core.views.CachedSchemaView (manage.py build_openapi_schema)
+OPENAPI_SCHEMA_CACHE_DIR = Path(os.environ.get("OPENAPI_SCHEMA_CACHE_DIR", BASE_DIR / "var" / "openapi"))
+
+# Purchase file imports (apps.procurement.import_jobs): worker threads per process, and
+# whether to run jobs inside the request instead (tests, single-process debugging)
+IMPORT_JOB_WORKERS = int(os.environ.get("IMPORT_JOB_WORKERS", "2"))
+IMPORT_JOBS_INLINE = os.environ.get("IMPORT_JOBS_INLINE", "False").lower() == "true"
+# Uploads larger than this are rejected (413); accepted ones are spooled to IMPORT_SPOOL_DIR
+IMPORT_MAX_UPLOAD_MB = int(os.environ.get("IMPORT_MAX_UPLOAD_MB", "50"))
+IMPORT_SPOOL_DIR = Path(os.environ.get("IMPORT_SPOOL_DIR", BASE_DIR / "var" / "imports"))
+# Link imported lines by item name when no code matches (catalog.services_matching), and
+# the similarity (0-1) a fuzzy name match needs; unset keeps name matching exact
+IMPORT_MATCH_BY_NAME = os.environ.get("IMPORT_MATCH_BY_NAME", "False").lower() == "true"
+IMPORT_FUZZY_THRESHOLD = float(os.environ["IMPORT_FUZZY_THRESHOLD"]) if os.environ.get("IMPORT_FUZZY_THRESHOLD") else None
+
+# Scanned GRN PDFs (apps.procurement.importers_pdf): rasterization DPI and the size of each
+# server process's shared OCR pool (unset = one per core; lower it with several server workers)
+GRN_OCR_DPI = int(os.environ.get("GRN_OCR_DPI", "200"))
+GRN_OCR_WORKERS = int(os.environ["GRN_OCR_WORKERS"]) if os.environ.get("GRN_OCR_WORKERS") else None
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Pharmacy ERP API',
     'VERSION': 'v1',
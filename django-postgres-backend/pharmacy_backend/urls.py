@@ -1,11 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularSwaggerView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.conf import settings
 from django.conf.urls.static import static
 from apps.accounts.views import LoginView
-from core.views import HealthCheckView
+from core.views import CachedSchemaView, HealthCheckView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -33,7 +33,7 @@ urlpatterns = [
     path('api/v1/dashboard/', include('apps.dashboard.urls')),
     path('api/v1/masters/', include('apps.settingsx.masters_urls')),
     path('api/v1/governance/', include('apps.governance.urls')),
-    # OpenAPI schema + Swagger UI
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    # OpenAPI schema (pre-built by `manage.py build_openapi_schema`) + Swagger UI
+    path('api/schema/', CachedSchemaView.as_view(), name='schema'),
     path('api/schema/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
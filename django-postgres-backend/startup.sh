@@ -26,7 +26,12 @@ fi
 echo "Running database migrations..."
 python manage.py migrate --noinput || echo "Migration failed or not needed"
 
+# Build the OpenAPI schema once per deploy (skipped when the stored copy matches this code)
+echo "Building OpenAPI schema..."
+python manage.py build_openapi_schema --if-stale || echo "Schema build failed; it will be generated on first request"
+
 # Start gunicorn
 echo "Starting Gunicorn..."
-gunicorn pharmacy_backend.wsgi --bind=0.0.0.0 --timeout 600 --workers 2 --access-logfile - --error-logfile - --log-level info
+# gunicorn.conf.py warms every worker after boot (set WARMUP_ENABLED=False to skip)
+gunicorn pharmacy_backend.wsgi --config gunicorn.conf.py --bind=0.0.0.0 --timeout 600 --workers 2 --access-logfile - --error-logfile - --log-level info
 